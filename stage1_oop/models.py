@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)  # örnek başına __dict__ yok
 class Book:
     title: str
     author: str
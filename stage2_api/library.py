@@ -1,14 +1,15 @@
 from __future__ import annotations
 from pathlib import Path
 import json
-import httpx
 from typing import Any, Iterable, Optional, List
 from stage2_api.models import Book
+from stage2_api.openlibrary import OpenLibraryClient
 
 class Library:
     def __init__(self, filename: str = "library.json") -> None:
         self.filename = filename  # gereksinime göre dosya adı dışarıdan gelir
         self._books: list[Book] = []
+        self.openlibrary = OpenLibraryClient()
         self.load_books()
 
     # ---------- Kalıcılık ----------
@@ -65,56 +66,8 @@ class Library:
 
     # ---------- API İşlemleri ----------
     def fetch_book_from_api(self, isbn: str) -> Optional[Book]:
-        """Open Library API'sinden ISBN ile kitap bilgilerini çeker."""
-        try:
-            # ISBN ile kitap bilgilerini çek
-            response = httpx.get(f"https://openlibrary.org/isbn/{isbn}.json", timeout=10.0, follow_redirects=True)
-            
-            if response.status_code == 404:
-                return None
-                
-            response.raise_for_status()
-            
-            try:
-                data = response.json()
-            except (ValueError, Exception):
-                # JSON parsing hatası
-                return None
-            
-            title = data.get("title")
-            if not title:
-                return None
-            
-            # Yazar bilgilerini çek
-            authors: List[str] = []
-            if data.get("authors"):
-                for author_ref in data["authors"]:
-                    if isinstance(author_ref, dict) and author_ref.get("key"):
-                        try:
-                            author_response = httpx.get(f"https://openlibrary.org{author_ref['key']}.json", timeout=10.0, follow_redirects=True)
-                            author_response.raise_for_status()
-                            author_data = author_response.json()
-                            if author_data.get("name"):
-                                authors.append(author_data["name"])
-                        except (httpx.HTTPError, httpx.RequestError, ValueError, Exception):
-                            # Yazar bilgisi çekilemezse atla
-                            continue
-            
-            # Eğer yazar bulunamazsa by_statement'ı kullan
-            if not authors and data.get("by_statement"):
-                authors = [data["by_statement"]]
-            
-            return Book(isbn=isbn, title=title, authors=authors)
-            
-        except httpx.RequestError:
-            # Ağ hatası
-            return None
-        except httpx.HTTPStatusError:
-            # HTTP hatası
-            return None
-        except Exception:
-            # Diğer beklenmeyen hatalar
-            return None
+        """Open Library API'sinden ISBN ile kitap bilgilerini çeker (havuzlu istemci, yazarlar paralel)."""
+        return self.openlibrary.fetch_book_sync(isbn)
 
     # ---------- Operasyonlar ----------
     def add_book_by_isbn(self, isbn: str) -> Optional[Book]:
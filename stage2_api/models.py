@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import List, Union
 
-@dataclass
+@dataclass(slots=True)  # örnek başına __dict__ yok
 class Book:
     isbn: str  # benzersiz kimlik
     title: str
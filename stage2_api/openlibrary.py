@@ -0,0 +1,198 @@
+"""
+Open Library için asenkron istemci.
+
+httpx.AsyncClient üzerine kurulu, tembel (lazy) oluşturulur ve `aclose()` ile
+kapatılır. Stage 2 senkron olduğu için Library `fetch_book_sync` cephesini kullanır.
+Stage 3 istemcisi (önbellek, hız sınırı, toplu çözümleme) bu sınıfı genişletir;
+bağlantı havuzu, zaman aşımları, yazar çözümü ve senkron cephe tek yerdedir.
+
+Bağlantılar havuzlanır (keep-alive), böylece edition + yazar istekleri aynı
+TCP/TLS bağlantısını paylaşır. Yazarlar `asyncio.gather` ile paralel çözülür:
+4 yazarlı bir kitap 5 seri istek yerine ~2 round trip sürer.
+
+Senkron cephe her çağrıda yeni bir event loop açmaz: çağrılar süreç başına tek bir
+arka plan loop'unda (daemon thread) çalışır ve istemci başına uzun ömürlü bir ikiz
+AsyncClient kullanır; havuzdaki bağlantılar çağrılar arasında yeniden kullanılır.
+
+Zaman aşımları aşamaya göre ayarlanabilir:
+    connect_timeout -> bağlantı kurma
+    timeout         -> edition (/isbn/...) isteği
+    author_timeout  -> her bir yazar (/authors/...) isteği
+"""
+
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+import httpx
+
+from stage2_api.models import Book
+
+OPEN_LIBRARY_URL = "https://openlibrary.org"
+
+# Havuz sınırları: aynı host'a en fazla 20 eşzamanlı bağlantı, 10'u boşta canlı tutulur
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+
+T = TypeVar("T")
+
+
+class _SyncLoop:
+    """Senkron cephenin coroutine'lerini çalıştıran, süreç boyunca yaşayan event loop."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="openlibrary-sync", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Coroutine'i arka plan loop'unda çalıştırır ve sonucunu bekler (bloklar)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    async def arun(self, coro: Awaitable[T]) -> T:
+        """Coroutine'i arka plan loop'unda çalıştırır; çağıranın loop'unu bloklamadan bekler."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._get_loop()))
+
+
+_SYNC_LOOP = _SyncLoop()
+
+
+class OpenLibraryClient:
+    book_class: type = Book  # Stage 3 kendi Book modelini kullanır
+
+    def __init__(self, base_url: str = OPEN_LIBRARY_URL, timeout: float = 10.0,
+                 author_timeout: Optional[float] = None, connect_timeout: float = 5.0,
+                 limits: httpx.Limits = DEFAULT_LIMITS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.author_timeout = timeout if author_timeout is None else author_timeout
+        self.connect_timeout = connect_timeout
+        self.limits = limits
+        self._transport = transport  # testlerde httpx.MockTransport verilebilir
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[OpenLibraryClient] = None  # senkron cephenin ikizi (arka plan loop'unda)
+
+    def _phase_timeout(self, seconds: float) -> httpx.Timeout:
+        return httpx.Timeout(seconds, connect=min(self.connect_timeout, seconds))
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._phase_timeout(self.timeout),
+                limits=self.limits,
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Havuzu kapatır; senkron cephenin ikizi de (kendi loop'unda) kapatılır."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        sync_client, self._sync_client = self._sync_client, None
+        if sync_client is not None:
+            await _SYNC_LOOP.arun(sync_client.aclose())
+
+    def close(self) -> None:
+        """aclose'un senkron karşılığı (yalnızca senkron cephe kullanıldıysa yeterlidir)."""
+        sync_client, self._sync_client = self._sync_client, None
+        if sync_client is not None:
+            _SYNC_LOOP.run(sync_client.aclose())
+
+    async def _get(self, path: str, params: Optional[dict[str, str]] = None,
+                   timeout: Optional[float] = None) -> httpx.Response:
+        kwargs: dict[str, Any] = {"params": params}
+        if timeout is not None:
+            kwargs["timeout"] = self._phase_timeout(timeout)
+        return await self._get_client().get(path, **kwargs)
+
+    async def _get_json(self, path: str, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+        """GET isteği atar; 404'te None döner, diğer HTTP hatalarında exception fırlatır."""
+        return await self._fetch_json(path, timeout)
+
+    async def _fetch_json(self, path: str, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+        response = await self._get(path, timeout=timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        return data if isinstance(data, dict) else None
+
+    async def fetch_author_name(self, key: str) -> Optional[str]:
+        """'/authors/OL…A' anahtarından yazar adını çeker; hata olursa None döner."""
+        try:
+            data = await self._get_json(f"{key}.json", timeout=self.author_timeout)
+        except (httpx.HTTPError, ValueError):
+            # Yazar bilgisi çekilemezse atla
+            return None
+        if data and data.get("name"):
+            return data["name"]
+        return None
+
+    async def fetch_book(self, isbn: str) -> Optional[Book]:
+        """ISBN ile kitap bilgilerini çeker; bulunamazsa veya hata olursa None döner."""
+        try:
+            return await self.lookup_book(isbn)
+        except (httpx.HTTPError, ValueError):
+            # Ağ hatası, HTTP hatası veya JSON parsing hatası
+            return None
+
+    async def lookup_book(self, isbn: str) -> Optional[Book]:
+        """
+        fetch_book'un hataları yutmayan hali: bulunamazsa None döner, ağ / HTTP / JSON
+        hatasında exception fırlatır ("yok" ile "çekilemedi" ayırt edilmek istendiğinde).
+        """
+        data = await self._get_json(f"/isbn/{isbn}.json")
+        if not data or not data.get("title"):
+            return None
+
+        # Yazar bilgilerini paralel çek (sıra korunur, tekrar eden anahtarlar bir kez istenir)
+        keys = list(dict.fromkeys(
+            ref["key"] for ref in data.get("authors") or []
+            if isinstance(ref, dict) and ref.get("key")
+        ))
+        names = await asyncio.gather(*(self.fetch_author_name(key) for key in keys))
+        authors: List[str] = [name for name in names if name]
+
+        # Eğer yazar bulunamazsa by_statement'ı kullan
+        if not authors and data.get("by_statement"):
+            authors = [data["by_statement"]]
+
+        return self.book_class(isbn=isbn, title=data["title"], authors=authors)
+
+    # ---------- Senkron cephe ----------
+    def _settings(self) -> dict[str, Any]:
+        """İkiz istemcinin paylaştığı ayarlar (alt sınıflar genişletir)."""
+        return {"base_url": self.base_url, "timeout": self.timeout, "author_timeout": self.author_timeout,
+                "connect_timeout": self.connect_timeout, "limits": self.limits, "transport": self._transport}
+
+    def _run_sync(self, call: Callable[["OpenLibraryClient"], Awaitable[T]]) -> T:
+        """
+        call(ikiz)'i arka plan loop'unda çalıştırır. İkiz (AsyncClient o loop'a bağlı
+        olduğundan ayrı bir istemci) ilk çağrıda o loop'ta kurulur ve sonraki çağrılarda
+        havuzuyla birlikte yeniden kullanılır.
+        """
+        async def run() -> T:
+            if self._sync_client is None:
+                self._sync_client = type(self)(**self._settings())
+            return await call(self._sync_client)
+
+        return _SYNC_LOOP.run(run())
+
+    def fetch_book_sync(self, isbn: str) -> Optional[Book]:
+        """
+        fetch_book'un senkron karşılığı (CLI ve Stage 2 için).
+        Çağrılar aynı arka plan loop'unu ve aynı bağlantı havuzunu kullanır.
+        Event loop içinden çağrılırsa o loop'u bloklar (orada `await fetch_book` kullanın).
+        """
+        return self._run_sync(lambda client: client.fetch_book(isbn))
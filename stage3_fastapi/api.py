@@ -3,23 +3,54 @@ Stage 3: FastAPI Web API
 Kütüphane yönetim sistemi için REST API
 """
 
-from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from contextlib import asynccontextmanager
+from pydantic import ValidationError
+from typing import AsyncIterator, Callable, List, Optional
+import asyncio
+import base64
+import binascii
+import json
 import logging
 import os
 
-from stage3_fastapi.library import Library
+from stage3_fastapi.insertion_order import StaleCursorError
+from stage3_fastapi.library import VersionConflictError
+from stage3_fastapi.serialization import book_payload
+from stage3_fastapi.storage import create_library, describe_storage
+from stage3_fastapi.write_behind import DURABILITY_LEVELS, durability_override
 from stage3_fastapi.models import ISBNRequest, BookResponse, BookUpdateRequest, ErrorResponse, ManualBookRequest, Book, BorrowRequest
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def watch_other_workers(interval: float) -> None:
+    """Çok süreçli modda diğer worker'ların değişikliklerini düzenli uygular (SSE istemcileri için)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(library.refresh)
+        except Exception as e:
+            logger.warning(f"Refreshing shared library failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = None
+    if library.poll_interval:
+        watcher = asyncio.create_task(watch_other_workers(library.poll_interval))
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    # Kapanışta HTTP istemcisini kapat, bekleyen dosya/DB yazımlarını bitir
+    await library.aclose()
+
 # FastAPI app instance
 app = FastAPI(
+    lifespan=lifespan,
     title="Library Management API",
     description="Stage 3: Kütüphane yönetim sistemi REST API'si. Open Library entegrasyonu ile ISBN'den otomatik kitap ekleme.",
     version="3.0.0",
@@ -34,8 +65,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
+@app.middleware("http")
+async def refresh_shared_library(request: Request, call_next):
+    """
+    Çok süreçli modda (bkz. shared_library.py) diğer worker'ların değişiklikleri istekten
+    önce uygulanır. Yenileme veritabanı kilidini bekleyebileceği için thread'de çalışır;
+    tek süreçli backend'lerde (poll_interval yok) atlanır.
+    """
+    if library.poll_interval:
+        await asyncio.to_thread(library.refresh)
+    return await call_next(request)
+
+@app.middleware("http")
+async def durability_header(request: Request, call_next):
+    """
+    X-Durability: group -> write-behind modunda yanıt, mutasyon diske yazılınca döner.
+    X-Durability: async -> bellekte uygulanınca döner. Diğer backend'ler yok sayar.
+    """
+    level = request.headers.get("X-Durability", "").lower()
+    if level not in DURABILITY_LEVELS:
+        return await call_next(request)
+    token = durability_override.set(level)
+    try:
+        return await call_next(request)
+    finally:
+        durability_override.reset(token)
+
 # Mount static files (HTML/CSS/JS frontend)
 # Get the static directory path relative to the current working directory
 static_path = os.path.join("stage3_fastapi", "static")
@@ -45,7 +103,10 @@ else:
     logger.warning(f"Static directory not found: {static_path}")
 
 # Global library instance
-library = Library("library.json")  # library_api.json yerine
+# Depolama LIBRARY_URL / LIBRARY_FILE / LIBRARY_BACKEND ortam değişkenlerinden seçilir
+# (bkz. stage3_fastapi/storage.py); hiçbiri yoksa modül yanındaki library.json kullanılır
+library = create_library()
+logger.info(f"Library storage: {describe_storage(library)}")
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -66,18 +127,153 @@ async def root():
     
     return response_data
 
+class RawJSONResponse(Response):
+    """Önceden kodlanmış JSON byte'larını olduğu gibi gönderir (response_model doğrulaması atlanır)."""
+    media_type = "application/json"
+
+def book_json(book: Book, status_code: int = status.HTTP_200_OK) -> RawJSONResponse:
+    """Tek kitabı Library'nin JSON parça önbelleğinden, güncel ETag'iyle yanıtlar."""
+    etag = book_etag(book.isbn)
+    headers = {"ETag": etag, **CACHE_HEADERS} if etag is not None else None
+    return RawJSONResponse(library.fragments.get(book), status_code=status_code, headers=headers)
+
+# ---------- ETag / koşullu istekler ----------
+# Katalog ve kitap sürümleri Library'de her mutasyonda artar; ETag bu sayılardan
+# üretildiği için 304 kararı katalog okunmadan verilir. Cache-Control: no-cache
+# tarayıcının her seferinde If-None-Match ile yeniden doğrulamasını sağlar.
+CACHE_HEADERS = {"Cache-Control": "no-cache"}
+
+def catalog_etag() -> str:
+    return f'"{library.epoch}-{library.catalog_version}"'
+
+def version_etag(version: int) -> str:
+    return f'"{library.epoch}-{version}"'
+
+def book_etag(isbn: str) -> Optional[str]:
+    version = library.book_version(isbn)
+    return None if version is None else version_etag(version)
+
+def etag_matches(header: Optional[str], etag: Optional[str], weak: bool = True) -> bool:
+    """If-None-Match (zayıf karşılaştırma) / If-Match (güçlü) değerini ETag ile karşılaştırır."""
+    if header is None or etag is None:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """İstemcideki kopya güncelse gövdesiz 304 yanıtı."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **CACHE_HEADERS})
+    return None
+
+def if_match(request: Request) -> Optional[Callable[[int], bool]]:
+    """
+    If-Match verilmişse kitap sürümünü header'la karşılaştıran koşul (iyimser eşzamanlılık).
+    Library bunu mutasyon kilidi altında, güncel sürümle çağırır; tutmazsa
+    VersionConflictError fırlatır ve handler 412 döner.
+    """
+    header = request.headers.get("if-match")
+    if header is None:
+        return None
+    return lambda version: etag_matches(header, version_etag(version), weak=False)
+
+def precondition_failed(isbn: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail=f"Book with ISBN {isbn} has been modified"
+    )
+
+def encode_cursor(data: dict) -> str:
+    """Sayfalama cursor'ını opak bir URL-safe string'e çevirir."""
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """encode_cursor'ın tersi; bozuk cursor için 400 döner."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        assert isinstance(data, dict)
+        return data
+    except (ValueError, AssertionError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
 @app.get("/books", response_model=List[BookResponse], tags=["Books"])
-async def list_books():
+async def list_books(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Sayfa boyutu (verilmezse tüm kitaplar)"),
+    offset: int = Query(0, ge=0, description="Atlanacak kitap sayısı"),
+    cursor: Optional[str] = Query(None, description="Önceki yanıttaki X-Next-Cursor değeri"),
+    sort: Optional[str] = Query(None, pattern="^(title|author|isbn)$", description="Sıralama alanı (varsayılan: ekleme sırası)"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sıralama yönü"),
+    book_type: Optional[str] = Query(None, pattern="^(Physical|Digital|Audio)$", description="Kitap tipi filtresi"),
+    is_borrowed: Optional[bool] = Query(None, description="Ödünç durumu filtresi"),
+):
     """
-    Kütüphanedeki tüm kitapları listele
+    Kütüphanedeki kitapları sayfalı olarak listele
+    
+    Toplam (filtreli) kitap sayısı `X-Total-Count`, sonraki sayfanın cursor'ı
+    `X-Next-Cursor` header'ında döner. Cursor verilirse offset yerine kullanılır.
+    ETag katalog sürümüdür; `If-None-Match` eşleşirse 304 döner.
     
     Returns:
-        List[BookResponse]: Tüm kitapların listesi
+        List[BookResponse]: İstenen sayfadaki kitaplar
     """
     try:
-        books = list(library.list_books())
+        etag = catalog_etag()
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        descending = order == "desc"
+        after = None
+        if cursor:
+            data = decode_cursor(cursor)
+            if data.get("sort") != sort or data.get("order") != order:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor does not match the requested sort order"
+                )
+            try:
+                # Son görülen kitabın sıralama anahtarı ve ISBN'i; ekleme sırasında anahtar
+                # [indeks token'ı, ekleme numarası] çiftidir ve Library tarafından doğrulanır
+                key, last_isbn = data["after"]
+                after = (key if sort is None else str(key), str(last_isbn))
+            except (KeyError, TypeError, ValueError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        
+        try:
+            books = library.query_books(
+                sort=sort, descending=descending, after=after, offset=offset,
+                limit=limit, book_type=book_type, is_borrowed=is_borrowed,
+            )
+        except StaleCursorError:
+            # Katalog yeniden yüklendi ya da istek başka bir worker'a düştü: baştan başlanmalı
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor is no longer valid; restart from the first page"
+            )
+        
+        response.headers["X-Total-Count"] = str(library.count_books(book_type=book_type, is_borrowed=is_borrowed))
+        response.headers["ETag"] = etag
+        response.headers.update(CACHE_HEADERS)
+        if limit is not None and len(books) == limit:
+            last = books[-1]
+            next_cursor = {"sort": sort, "order": order, "after": [library.order_key(last, sort), last.isbn]}
+            response.headers["X-Next-Cursor"] = encode_cursor(next_cursor)
+        
         logger.info(f"Listed {len(books)} books")
-        return [BookResponse(**vars(book)) for book in books]
+        # Hazır JSON parçaları birleştirilir; BookResponse şeması OpenAPI için response_model'de kalır
+        return RawJSONResponse(library.fragments.encode_list(books), headers=dict(response.headers))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing books: {e}")
         raise HTTPException(
@@ -85,6 +281,133 @@ async def list_books():
             detail="Failed to retrieve books"
         )
 
+@app.get("/books/search", tags=["Books"])
+async def search_books(
+    response: Response,
+    query: str = Query(..., min_length=1, description="Başlık, yazar veya ISBN (kelime önekleri eşleşir)"),
+    book_type: Optional[str] = Query(None, pattern="^(Physical|Digital|Audio)$", description="Kitap tipi filtresi"),
+    limit: int = Query(50, ge=1, le=1000, description="Sayfa boyutu"),
+    offset: int = Query(0, ge=0, description="Atlanacak sonuç sayısı"),
+):
+    """
+    Kitap arama
+    
+    Library'nin ters token indeksini kullanır: sorgudaki her kelime başlık, yazar
+    veya ISBN kelimelerinin önekiyle eşleşmelidir. Sonuçlar alaka sırasına göre
+    döner; toplam eşleşme sayısı `X-Total-Count` header'ındadır.
+    
+    Args:
+        query (str): Arama terimi
+        book_type (str, optional): Kitap tipi filtresi
+        
+    Returns:
+        list: Arama sonuçları
+    """
+    try:
+        books, total = library.search_books(query, book_type=book_type, offset=offset, limit=limit)
+        response.headers["X-Total-Count"] = str(total)
+        
+        # BookResponse alanları + stage1 uyumluluğu için author
+        return RawJSONResponse(library.fragments.encode_list(books, extra="author"),
+                               headers=dict(response.headers))
+    except Exception as e:
+        logger.error(f"Search error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Search failed"
+        )
+
+# ---------- Değişiklik akışı (SSE) ----------
+KEEPALIVE_SECONDS = 15.0
+
+def parse_event_id(value: Optional[str]) -> Optional[int]:
+    """Event id ya da ETag'den ("<epoch>-<sürüm>") sürüm; başka bir sürece aitse None."""
+    if not value:
+        return None
+    epoch, _, version = value.strip().strip('"').rpartition("-")
+    if epoch != library.epoch or not version.isdigit():
+        return None
+    return int(version)
+
+def sse_event(event: str, version: int, data: bytes) -> bytes:
+    return f"id: {library.epoch}-{version}\nevent: {event}\ndata: ".encode("ascii") + data + b"\n\n"
+
+def change_events(changes: list) -> list[bytes]:
+    """
+    Kayıtları SSE olaylarına çevirir. Aynı kitabın ardışık kayıtlarından yalnızca
+    sonuncusu gönderilir; kitabın güncel hali parça önbelleğinden okunur.
+    """
+    last = {isbn: version for version, _, isbn in changes}
+    events = []
+    for version, op, isbn in changes:
+        if last[isbn] != version:
+            continue
+        prefix = b'{"version":%d,"isbn":' % version + json.dumps(isbn, ensure_ascii=False).encode("utf-8")
+        if op == "remove":
+            events.append(sse_event("remove", version, prefix + b"}"))
+            continue
+        book = library.find_book(isbn)
+        if book is not None:
+            events.append(sse_event(op, version, prefix + b',"book":' + library.fragments.get(book) + b"}"))
+    return events
+
+async def change_stream(last_event_id: Optional[str]) -> AsyncIterator[bytes]:
+    """
+    Katalog değişikliklerini SSE olarak akıtır. `last_event_id` verilmişse o sürümden
+    sonrası gönderilir; kayıt artık yoksa "reset" (istemci listeyi yeniden çekmeli),
+    hiç verilmemişse güncel sürümle "ready" ile başlar.
+    """
+    feed = library.changes
+    version = parse_event_id(last_event_id)
+    yield b"retry: 3000\n\n"
+    if version is None or feed.since(version) is None:
+        version = feed.version
+        event = "ready" if last_event_id is None else "reset"
+        yield sse_event(event, version, b'{"version":%d}' % version)
+    while True:
+        latest = feed.version
+        changes = feed.since(version)
+        if changes is None:
+            version = feed.version
+            yield sse_event("reset", version, b'{"version":%d}' % version)
+            continue
+        for event in change_events(changes):
+            yield event
+        # Sürüm kayıt olmadan da ilerleyebilir (bkz. ChangeFeed.advance)
+        version = max(latest, changes[-1][0]) if changes else latest
+        if not changes and not await feed.wait(version, KEEPALIVE_SECONDS):
+            yield b": keepalive\n\n"
+
+@app.get("/books/changes", tags=["Books"])
+async def book_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="Başlangıç sürümü: son /books yanıtının ETag'i"),
+):
+    """
+    Katalog değişiklik akışı (Server-Sent Events)
+    
+    Her mutasyon bir olay üretir: `add` / `update` (güncel kitapla), `remove` (ISBN).
+    Olay id'si katalog sürümüdür; bağlantı koparsa tarayıcı `Last-Event-ID` ile
+    kaldığı yerden devam eder. Devam edilemiyorsa `reset` gelir ve istemci listeyi
+    yeniden çeker. İstemci ilk bağlantıda `since` ile elindeki listenin ETag'ini
+    verirse liste ile bağlantı arasındaki değişiklikleri de alır.
+    """
+    last_event_id = request.headers.get("last-event-id") or since
+    return StreamingResponse(
+        change_stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def extra_fields(payload: ISBNRequest) -> dict:
+    """ISBNRequest'teki tipe özel (dolu) alanlar."""
+    fields = {}
+    for field in ("shelf_location", "file_size_mb", "file_format", "duration_minutes", "narrator"):
+        value = getattr(payload, field)
+        if value:
+            fields[field] = value
+    return fields
+
 @app.post("/books", response_model=BookResponse, status_code=status.HTTP_201_CREATED, tags=["Books"])
 async def add_book(payload: ISBNRequest):
     """
@@ -102,21 +425,8 @@ async def add_book(payload: ISBNRequest):
     try:
         logger.info(f"Adding book with ISBN: {payload.isbn}, Type: {payload.book_type}")
         
-        # Extra fields'i hazırla
-        extra_fields = {}
-        if payload.shelf_location:
-            extra_fields['shelf_location'] = payload.shelf_location
-        if payload.file_size_mb:
-            extra_fields['file_size_mb'] = payload.file_size_mb
-        if payload.file_format:
-            extra_fields['file_format'] = payload.file_format
-        if payload.duration_minutes:
-            extra_fields['duration_minutes'] = payload.duration_minutes
-        if payload.narrator:
-            extra_fields['narrator'] = payload.narrator
-        
         # ISBN ile kitap ekleme (güncellenmiş fonksiyon)
-        result = library.add_book_by_isbn(payload.isbn, payload.book_type or "Physical", **extra_fields)
+        result = await library.aadd_book_by_isbn(payload.isbn, payload.book_type or "Physical", **extra_fields(payload))
         
         if not result:
             logger.warning(f"Failed to add book with ISBN: {payload.isbn}")
@@ -135,7 +445,7 @@ async def add_book(payload: ISBNRequest):
             )
         
         logger.info(f"Successfully added book: {book.title}")
-        return BookResponse(**vars(book))
+        return book_json(book, status.HTTP_201_CREATED)
         
     except HTTPException:
         raise
@@ -146,6 +456,90 @@ async def add_book(payload: ISBNRequest):
             detail="An unexpected error occurred while adding the book"
         )
 
+MAX_BULK_ITEMS = 10000
+
+def parse_bulk_body(body: bytes, content_type: str) -> tuple[list[ISBNRequest], list[dict]]:
+    """
+    Toplu istek gövdesini ayrıştırır: JSON dizi ya da NDJSON (satır başına bir obje).
+    Geçerli öğeleri ve geçersiz öğeler için hazır sonuç satırlarını döndürür.
+    """
+    try:
+        text = body.decode("utf-8")
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            raw_items = [json.loads(line) for line in text.splitlines() if line.strip()]
+        else:
+            raw_items = json.loads(text)
+    except (UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(raw_items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+    if len(raw_items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+    valid, invalid = [], []
+    for raw in raw_items:
+        # Düz string de kabul edilir: ["978...", "978..."]
+        if isinstance(raw, str):
+            raw = {"isbn": raw}
+        try:
+            valid.append(ISBNRequest.model_validate(raw))
+        except ValidationError as e:
+            isbn = raw.get("isbn") if isinstance(raw, dict) else None
+            invalid.append({"isbn": isbn, "status": "invalid", "error": e.errors(include_url=False)[0]["msg"]})
+    return valid, invalid
+
+@app.post("/books/bulk", tags=["Books"])
+async def add_books_bulk(
+    request: Request,
+    concurrency: int = Query(8, ge=1, le=32, description="Eşzamanlı Open Library isteği sayısı"),
+    stream: bool = Query(True, description="Sonuçları NDJSON olarak akıt (false: tek JSON yanıtı)"),
+):
+    """
+    Çok sayıda ISBN'i tek istekte ekle
+
+    Gövde: ISBNRequest listesi (JSON dizi) ya da `application/x-ndjson` ile satır
+    başına bir ISBNRequest. Metadata sınırlı sayıda eşzamanlı istekle çekilir,
+    eklenen kitaplar parça başına (en fazla 50 ISBN) tek bir toplu commit ile
+    kaydedilir; "added" satırı o commit bittikten sonra gönderilir.
+
+    Returns:
+        stream=true: her öğe tamamlandıkça bir NDJSON satırı
+            {"isbn", "status": added|exists|not_found|invalid|error, "book"?},
+            en sonda {"summary": {...}}
+        stream=false: {"results": [...], "summary": {...}}
+    """
+    items, invalid = parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    logger.info(f"Bulk import: {len(items)} items, {len(invalid)} invalid, concurrency={concurrency}")
+    work = [(item.isbn, item.book_type or "Physical", extra_fields(item)) for item in items]
+
+    async def results():
+        for result in invalid:
+            yield result
+        async for result in library.aimport_isbns(work, concurrency=concurrency):
+            if "book" in result:
+                result["book"] = book_payload(result["book"])
+            yield result
+
+    def summarize(counts: dict) -> dict:
+        return {"summary": {"total": len(items) + len(invalid), **counts}}
+
+    if not stream:
+        collected = [result async for result in results()]
+        counts: dict = {}
+        for result in collected:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return {"results": collected, **summarize(counts)}
+
+    async def ndjson():
+        counts: dict = {}
+        async for result in results():
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        yield json.dumps(summarize(counts), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 @app.post("/books/manual", response_model=BookResponse, status_code=status.HTTP_201_CREATED, tags=["Books"])
 async def add_manual_book(payload: ManualBookRequest):
     """
@@ -206,8 +600,8 @@ async def add_manual_book(payload: ManualBookRequest):
         
         book = Book(**book_data)
         
-        # Kitabı kütüphaneye ekle (Library.add_book metodunu kullan)
-        success = library.add_book(book)
+        # Kitabı kütüphaneye ekle (Library.aadd_book metodunu kullan)
+        success = await library.aadd_book(book)
         if not success:
             logger.warning(f"Failed to add book to library: {book.title}")
             raise HTTPException(
@@ -216,7 +610,7 @@ async def add_manual_book(payload: ManualBookRequest):
             )
         
         logger.info(f"Successfully added manual book: {book.title}")
-        return BookResponse(**vars(book))
+        return book_json(book, status.HTTP_201_CREATED)
         
     except HTTPException:
         raise
@@ -242,7 +636,7 @@ async def delete_book(isbn: str):
         logger.info(f"Deleting book with ISBN: {isbn}")
         
         # Kitabı sil
-        result = library.remove_book(isbn)
+        result = await library.aremove_book(isbn)
         
         if not result:
             logger.warning(f"Book not found for deletion: {isbn}")
@@ -264,10 +658,12 @@ async def delete_book(isbn: str):
         )
 
 @app.get("/books/{isbn}", response_model=BookResponse, tags=["Books"])
-async def get_book(isbn: str):
+async def get_book(isbn: str, request: Request):
     """
     Belirtilen ISBN'e sahip kitabı getir
     
+    ETag kitabın sürümüdür; `If-None-Match` eşleşirse 304 döner.
+    
     Args:
         isbn (str): Aranacak kitabın ISBN'i
         
@@ -280,6 +676,11 @@ async def get_book(isbn: str):
     try:
         logger.info(f"Getting book with ISBN: {isbn}")
         
+        etag = book_etag(isbn)
+        cached = not_modified(request, etag) if etag is not None else None
+        if cached is not None:
+            return cached
+        
         book = library.find_book(isbn)
         
         if not book:
@@ -290,7 +691,7 @@ async def get_book(isbn: str):
             )
         
         logger.info(f"Found book: {book.title}")
-        return BookResponse(**vars(book))
+        return book_json(book)
         
     except HTTPException:
         raise
@@ -302,10 +703,12 @@ async def get_book(isbn: str):
         )
 
 @app.put("/books/{isbn}", response_model=BookResponse, tags=["Books"])
-async def update_book(isbn: str, payload: BookUpdateRequest):
+async def update_book(isbn: str, payload: BookUpdateRequest, request: Request):
     """
     Belirtilen ISBN'e sahip kitabın bilgilerini güncelle
     
+    `If-Match` verilirse kitap o ETag'den beri değişmemiş olmalıdır (aksi halde 412).
+    
     Args:
         isbn (str): Güncellenecek kitabın ISBN'i
         payload (BookUpdateRequest): Güncellenecek alanlar
@@ -329,50 +732,25 @@ async def update_book(isbn: str, payload: BookUpdateRequest):
             )
         
         # Sadece belirtilen alanları güncelle
-        if payload.title is not None:
-            book.title = payload.title
-            logger.info(f"Updated title to: {payload.title}")
-            
-        if payload.authors is not None:
-            book.authors = payload.authors
-            logger.info(f"Updated authors to: {payload.authors}")
-            
-        if payload.is_borrowed is not None:
-            book.is_borrowed = payload.is_borrowed
-            logger.info(f"Updated borrowed status to: {payload.is_borrowed}")
-            
-        if payload.book_type is not None:
-            book.book_type = payload.book_type
-            logger.info(f"Updated book type to: {payload.book_type}")
-            
-        # Physical book fields
-        if payload.shelf_location is not None:
-            book.shelf_location = payload.shelf_location
-            logger.info(f"Updated shelf location to: {payload.shelf_location}")
-            
-        # Digital book fields
-        if payload.file_size_mb is not None:
-            book.file_size_mb = payload.file_size_mb
-            logger.info(f"Updated file size to: {payload.file_size_mb}")
-            
-        if payload.file_format is not None:
-            book.file_format = payload.file_format
-            logger.info(f"Updated file format to: {payload.file_format}")
-            
-        # Audio book fields
-        if payload.duration_minutes is not None:
-            book.duration_minutes = payload.duration_minutes
-            logger.info(f"Updated duration to: {payload.duration_minutes}")
-            
-        if payload.narrator is not None:
-            book.narrator = payload.narrator
-            logger.info(f"Updated narrator to: {payload.narrator}")
-        
-        # Değişiklikleri kaydet
-        library.save_books()
+        updates = payload.model_dump(exclude_none=True)
+        for field, value in updates.items():
+            logger.info(f"Updated {field} to: {value}")
+        
+        # Değişiklikleri uygula ve kaydet (ISBN indeksi Library içinde tutulur).
+        # Library kitabı yerinde değiştirmez; güncel nesne dönen değerdir
+        # If-Match, diğer worker'ların değişiklikleri uygulandıktan sonra kilit altında denetlenir
+        try:
+            book = await library.aupdate_book(isbn, if_match(request), **updates)
+        except VersionConflictError:
+            raise precondition_failed(isbn)
+        if book is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Book with ISBN {isbn} not found"
+            )
         
         logger.info(f"Successfully updated book: {book.title}")
-        return BookResponse(**vars(book))
+        return book_json(book)
         
     except HTTPException:
         raise
@@ -384,10 +762,12 @@ async def update_book(isbn: str, payload: BookUpdateRequest):
         )
 
 @app.post("/books/{isbn}/borrow", response_model=BookResponse, tags=["Books"])
-async def borrow_return_book(isbn: str, payload: BorrowRequest):
+async def borrow_return_book(isbn: str, payload: BorrowRequest, request: Request):
     """
     Kitap ödünç alma/iade işlemi
     
+    `If-Match` verilirse kitap o ETag'den beri değişmemiş olmalıdır (aksi halde 412).
+    
     Args:
         isbn (str): Kitabın ISBN'i
         payload (BorrowRequest): Action payload containing 'borrow' or 'return'
@@ -411,35 +791,41 @@ async def borrow_return_book(isbn: str, payload: BorrowRequest):
                 detail=f"Book with ISBN {isbn} not found"
             )
         
-        # İşlemi gerçekleştir
-        if action == "borrow":
-            if book.is_borrowed:
+        # İşlemi gerçekleştir (If-Match kilit altında, güncel sürümle denetlenir)
+        precondition = if_match(request)
+        try:
+            if action == "borrow":
+                if book.is_borrowed:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Book '{book.title}' is already borrowed"
+                    )
+                book = await library.aborrow_book(isbn, precondition)
+                
+            elif action == "return":
+                if not book.is_borrowed:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Book '{book.title}' was not borrowed"
+                    )
+                book = await library.areturn_book(isbn, precondition)
+                
+            else:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Book '{book.title}' is already borrowed"
+                    detail="Invalid action. Use 'borrow' or 'return'"
                 )
-            book.borrow_book()
-            logger.info(f"Book borrowed: {book.title}")
-            
-        elif action == "return":
-            if not book.is_borrowed:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Book '{book.title}' was not borrowed"
-                )
-            book.return_book()
-            logger.info(f"Book returned: {book.title}")
-            
-        else:
+        except VersionConflictError:
+            raise precondition_failed(isbn)
+        
+        # Kitap bu arada başka bir worker'da silinmiş olabilir
+        if book is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid action. Use 'borrow' or 'return'"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Book with ISBN {isbn} not found"
             )
-        
-        # Değişiklikleri kaydet
-        library.save_books()
-        
-        return BookResponse(**vars(book))
+        logger.info(f"Book {'borrowed' if action == 'borrow' else 'returned'}: {book.title}")
+        return book_json(book)
         
     except HTTPException:
         raise
@@ -465,11 +851,17 @@ async def health_check():
         dict: API durumu ve istatistikleri
     """
     try:
-        book_count = len(list(library.list_books()))
+        # Sayaçtan okunur: yük dengeleyici sık sorgular, katalog kopyalanmaz
+        book_count = library.count_books()
         return {
             "status": "healthy",
             "api_version": "3.0.0",
             "total_books": book_count,
+            "storage": describe_storage(library)["backend"],
+            "metadata_cache": library.openlibrary.cache.stats(),
+            "response_cache": library.fragments.stats(),
+            "change_feed": library.changes.stats(),
+            "open_library": library.openlibrary.stats(),
             "features": {
                 "open_library_integration": True,
                 "isbn_support": True,
@@ -484,23 +876,33 @@ async def health_check():
         )
 
 @app.get("/statistics", tags=["System"])
-async def get_statistics():
+async def get_statistics(request: Request, response: Response):
     """
     Kütüphane istatistiklerini getir
     
+    ETag katalog sürümüdür; `If-None-Match` eşleşirse 304 döner.
+    
     Returns:
         dict: Kütüphane istatistikleri
     """
     try:
-        books = list(library.list_books())
-        total_books = len(books)
-        available_books = len([book for book in books if not book.is_borrowed])
-        borrowed_books = total_books - available_books
+        etag = catalog_etag()
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response.headers["ETag"] = etag
+        response.headers.update(CACHE_HEADERS)
+        
+        # Artımlı sayaçlardan O(1)
+        counts = library.book_counts()
+        total_books = counts["total"]
+        borrowed_books = counts["borrowed"]
+        available_books = total_books - borrowed_books
         
         # Book types
-        physical_books = len([book for book in books if getattr(book, 'book_type', 'Physical') == 'Physical'])
-        digital_books = len([book for book in books if getattr(book, 'book_type', 'Physical') == 'Digital'])
-        audio_books = len([book for book in books if getattr(book, 'book_type', 'Physical') == 'Audio'])
+        physical_books = counts["book_type"].get("Physical", 0)
+        digital_books = counts["book_type"].get("Digital", 0)
+        audio_books = counts["book_type"].get("Audio", 0)
         
         return {
             "total_books": total_books,
@@ -508,7 +910,9 @@ async def get_statistics():
             "borrowed_books": borrowed_books,
             "physical_books": physical_books,
             "digital_books": digital_books,
-            "audio_books": audio_books
+            "audio_books": audio_books,
+            "by_shelf_location": counts["shelf_location"],
+            "by_file_format": counts["file_format"],
         }
     except Exception as e:
         logger.error(f"Statistics error: {e}")
@@ -517,61 +921,6 @@ async def get_statistics():
             detail="Failed to get statistics"
         )
 
-@app.get("/books/search", tags=["Books"])
-async def search_books(query: str, book_type: str = None):
-    """
-    Kitap arama
-    
-    Args:
-        query (str): Arama terimi
-        book_type (str, optional): Kitap tipi filtresi
-        
-    Returns:
-        list: Arama sonuçları
-    """
-    try:
-        books = list(library.list_books())
-        results = []
-        
-        query_lower = query.lower()
-        for book in books:
-            # Convert book to dict for response
-            book_dict = {
-                "isbn": book.isbn,
-                "title": book.title,
-                "authors": book.authors,
-                "author": book.author,
-                "is_borrowed": book.is_borrowed,
-                "book_type": getattr(book, 'book_type', 'Physical')
-            }
-            
-            # Add optional fields
-            optional_fields = ['shelf_location', 'file_size_mb', 'file_format', 'duration_minutes', 'narrator']
-            for field in optional_fields:
-                if hasattr(book, field):
-                    book_dict[field] = getattr(book, field)
-            
-            # Check if matches search criteria
-            matches_query = (
-                query_lower in book.title.lower() or
-                query_lower in book.author.lower() or
-                query_lower in book.isbn.lower() or
-                any(query_lower in author.lower() for author in book.authors)
-            )
-            
-            matches_type = book_type is None or book_dict.get("book_type") == book_type
-            
-            if matches_query and matches_type:
-                results.append(book_dict)
-        
-        return results
-    except Exception as e:
-        logger.error(f"Search error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Search failed"
-        )
-
 # Exception handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
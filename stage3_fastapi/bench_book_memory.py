@@ -0,0 +1,111 @@
+"""
+Book modelinin bellek kullanımı: eski dataclass (her örnekte __dict__, beş
+opsiyonel alan, ayrı yazar listesi) ile __slots__'lu güncel model karşılaştırılır.
+
+Kullanım (kök dizinde):
+    python -m stage3_fastapi.bench_book_memory            # 1.000.000 kitap
+    python -m stage3_fastapi.bench_book_memory --count 200000
+
+Satırlar JSON'dan yüklenmiş gibi üretilir (her satırda yeni string nesneleri);
+ölçülen değer, kitaplar oluşturulduktan sonra tutulan toplam bellek / kitap sayısıdır
+(ISBN ve başlık string'leri her iki modelde de dahildir).
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import random
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional
+
+from stage3_fastapi.library import book_from_row
+
+
+@dataclass
+class LegacyBook:
+    """Karşılaştırma için eski stage3 Book (dataclass + custom __init__)."""
+    isbn: str
+    title: str
+    authors: List[str]
+    is_borrowed: bool = False
+    book_type: str = "Physical"
+    shelf_location: Optional[str] = None
+    file_size_mb: Optional[float] = None
+    file_format: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    narrator: Optional[str] = None
+
+    def __init__(self, isbn, title, authors, is_borrowed=False, book_type="Physical", **kwargs):
+        self.isbn = isbn
+        self.title = title
+        self.is_borrowed = is_borrowed
+        self.book_type = book_type
+        self.authors = [authors] if isinstance(authors, str) else (authors if authors else [])
+        self.shelf_location = kwargs.get('shelf_location', None)
+        self.file_size_mb = kwargs.get('file_size_mb', None)
+        self.file_format = kwargs.get('file_format', None)
+        self.duration_minutes = kwargs.get('duration_minutes', None)
+        self.narrator = kwargs.get('narrator', None)
+
+
+def legacy_from_row(row: dict[str, Any]) -> LegacyBook:
+    return LegacyBook(**row)
+
+
+def generate_rows(count: int, authors: int = 50000, seed: int = 7) -> Iterator[dict[str, Any]]:
+    """Gerçekçi dağılım: %60 Physical, %25 Digital, %15 Audio; yazarlar tekrar eder."""
+    rng = random.Random(seed)
+    for i in range(count):
+        # "".join(...) her satırda yeni bir string nesnesi üretir (JSON parser gibi)
+        row: dict[str, Any] = {
+            "isbn": f"978{i:010d}",
+            "title": f"Title {i}",
+            "authors": ["".join(("Author ", str(rng.randrange(authors))))],
+            "is_borrowed": rng.random() < 0.2,
+        }
+        kind = rng.random()
+        if kind < 0.6:
+            row["book_type"] = "".join(("Phys", "ical"))
+            row["shelf_location"] = "".join(("A-", str(rng.randrange(200))))
+        elif kind < 0.85:
+            row["book_type"] = "".join(("Digi", "tal"))
+            row["file_size_mb"] = round(rng.uniform(0.5, 20), 1)
+            row["file_format"] = "".join(("PD", "F"))
+        else:
+            row["book_type"] = "".join(("Aud", "io"))
+            row["duration_minutes"] = rng.randrange(60, 1200)
+            row["narrator"] = "".join(("Narrator ", str(rng.randrange(500))))
+        yield row
+
+
+def measure(factory: Callable[[dict[str, Any]], Any], count: int) -> float:
+    """`count` kitap için kitap başına tutulan bayt."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        books = [factory(row) for row in generate_rows(count)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del books
+    return used / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure bytes per Book for the legacy and slotted models")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of books (default: 1M)")
+    args = parser.parse_args()
+
+    before = measure(legacy_from_row, args.count)
+    after = measure(book_from_row, args.count)
+    print(f"{args.count} books")
+    print(f"  dataclass (before): {before:8.1f} bytes/book  {before * args.count / 2**20:8.1f} MiB")
+    print(f"  slotted   (after) : {after:8.1f} bytes/book  {after * args.count / 2**20:8.1f} MiB")
+    print(f"  saving            : {100 * (1 - after / before):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+/books yanıtının serileştirme maliyeti: eski yol (her kitap için BookResponse
+oluşturup FastAPI'nin response_model doğrulaması + JSON modunda dump + json.dumps)
+ile önbellekli JSON parçalarının birleştirilmesi (serialization.FragmentCache)
+karşılaştırılır.
+
+Kullanım (kök dizinde):
+    python -m stage3_fastapi.bench_serialization                 # 10.000 ve 100.000 kitap
+    python -m stage3_fastapi.bench_serialization --count 50000 --repeat 5
+
+"cold" ilk istektir (parçalar henüz önbellekte değil), "warm" sonraki
+isteklerdir (yalnızca birleştirme).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+
+from stage3_fastapi.bench_book_memory import generate_rows
+from stage3_fastapi.library import book_from_row
+from stage3_fastapi.models import Book, BookResponse
+from stage3_fastapi.serialization import FragmentCache
+
+_LIST_ADAPTER = TypeAdapter(List[BookResponse])
+
+
+def legacy_encode(books: list[Book]) -> bytes:
+    """Eski endpoint yolu: model listesi -> response_model doğrulaması -> JSON."""
+    models = [BookResponse(**book.to_dict()) for book in books]
+    validated = _LIST_ADAPTER.validate_python([m.model_dump() for m in models])
+    content = _LIST_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def best_of(func: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(count: int, repeat: int) -> None:
+    books = [book_from_row(row) for row in generate_rows(count)]
+    cache = FragmentCache()
+    assert json.loads(legacy_encode(books[:100])) == json.loads(cache.encode_list(books[:100]))
+    cache.clear()
+
+    legacy = best_of(lambda: legacy_encode(books), repeat)
+    started = time.perf_counter()
+    cache.encode_list(books)
+    cold = time.perf_counter() - started
+    warm = best_of(lambda: cache.encode_list(books), repeat)
+
+    print(f"{count} books")
+    print(f"  pydantic (before)   : {legacy * 1000:9.1f} ms")
+    print(f"  fragments cold      : {cold * 1000:9.1f} ms  ({legacy / cold:5.1f}x)")
+    print(f"  fragments warm      : {warm * 1000:9.1f} ms  ({legacy / warm:5.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare /books serialization paths")
+    parser.add_argument("--count", type=int, action="append", help="Number of books (repeatable; default: 10k and 100k)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path, best is reported (default: 3)")
+    args = parser.parse_args()
+    for count in args.count or [10_000, 100_000]:
+        run(count, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+İkili snapshot (bkz. binary_snapshot.py) üzerinde tembel (lazy) yüklenen Library.
+
+Açılışta dosya yalnızca mmap edilir; ISBN indeksi snapshot'taki sıralı ISBN
+tablosuna bakan LazyBookIndex'tir ve bir Book ancak erişildiğinde (find_book,
+list_books sayfası) çözülüp saklanır. Sıralı indeksler ve arama indeksi ilk
+sıralı listeleme / arama isteğinde kurulur.
+
+Mutasyonlar bellekte uygulanır; her commit kataloğu yeni bir ikili snapshot
+olarak atomik yazar ve indeks yeni dosyaya taşınır.
+"""
+
+from __future__ import annotations
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from stage3_fastapi.binary_snapshot import BinarySnapshot, write_binary_snapshot
+from stage3_fastapi.counters import CatalogCounters
+from stage3_fastapi.insertion_order import InsertionOrder
+from stage3_fastapi.library import Library, SORT_KEYS, book_to_row, sort_key
+from stage3_fastapi.models import Book
+from stage3_fastapi.search import SearchIndex
+
+
+class _LazyValues:
+    """LazyBookIndex.values(): ekleme sırasında (ve tersinde) gezilebilen görünüm."""
+
+    def __init__(self, index: "LazyBookIndex") -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[Book]:
+        index = self._index
+        for position in range(index.snapshot_size):
+            if position not in index._removed:
+                yield index._book_at(position)
+        yield from list(index._added.values())
+
+    def __reversed__(self) -> Iterator[Book]:
+        index = self._index
+        yield from reversed(list(index._added.values()))
+        for position in range(index.snapshot_size - 1, -1, -1):
+            if position not in index._removed:
+                yield index._book_at(position)
+
+
+class LazyBookIndex:
+    """
+    ISBN -> Book eşlemesi (Library._index'in kullandığı dict arayüzü).
+    Snapshot'taki kitaplar ilk erişimde çözülür; yeni eklenenler ve silinenler
+    snapshot'ın üzerinde ayrı tutulur.
+    """
+
+    def __init__(self, snapshot: Optional[BinarySnapshot] = None,
+                 decoded: Optional[dict[int, Book]] = None) -> None:
+        self._snapshot = snapshot
+        self.snapshot_size = len(snapshot) if snapshot is not None else 0
+        self._decoded: dict[int, Book] = decoded or {}   # kayıt numarası -> çözülmüş Book
+        self._removed: set[int] = set()                  # silinen snapshot kayıtları
+        self._added: dict[str, Book] = {}                # snapshot'tan sonra eklenenler
+        self.version = 0                                 # her mutasyonda artar
+
+    def _position(self, isbn: str) -> Optional[int]:
+        if self._snapshot is None:
+            return None
+        position = self._snapshot.find(isbn)
+        if position is None or position in self._removed:
+            return None
+        return position
+
+    def _book_at(self, position: int) -> Book:
+        book = self._decoded.get(position)
+        if book is None:
+            book = self._decoded[position] = self._snapshot.book(position)
+        return book
+
+    def __len__(self) -> int:
+        return self.snapshot_size - len(self._removed) + len(self._added)
+
+    def __contains__(self, isbn: object) -> bool:
+        return isinstance(isbn, str) and (isbn in self._added or self._position(isbn) is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        """ISBN'ler ekleme sırasında (kitaplar çözülmez)."""
+        for position in range(self.snapshot_size):
+            if position not in self._removed:
+                yield self._snapshot.isbn(position)
+        yield from list(self._added)
+
+    def get(self, isbn: str, default: Optional[Book] = None) -> Optional[Book]:
+        book = self._added.get(isbn)
+        if book is not None:
+            return book
+        position = self._position(isbn)
+        return default if position is None else self._book_at(position)
+
+    def __getitem__(self, isbn: str) -> Book:
+        book = self.get(isbn)
+        if book is None:
+            raise KeyError(isbn)
+        return book
+
+    def __setitem__(self, isbn: str, book: Book) -> None:
+        position = self._position(isbn)
+        if position is None:
+            self._added[isbn] = book
+        else:
+            self._decoded[position] = book
+        self.version += 1
+
+    def pop(self, isbn: str, default: Optional[Book] = None) -> Optional[Book]:
+        if isbn in self._added:
+            self.version += 1
+            return self._added.pop(isbn)
+        position = self._position(isbn)
+        if position is None:
+            return default
+        book = self._book_at(position)
+        self._removed.add(position)
+        self._decoded.pop(position, None)
+        self.version += 1
+        return book
+
+    def values(self) -> _LazyValues:
+        return _LazyValues(self)
+
+    def peek_values(self) -> Iterator[Book]:
+        """Kitapları saklamadan gezer (indeks kurulumu için; dönen nesneleri değiştirmeyin)."""
+        for position in range(self.snapshot_size):
+            if position in self._removed:
+                continue
+            book = self._decoded.get(position)
+            yield book if book is not None else self._snapshot.book(position)
+        yield from list(self._added.values())
+
+    def page(self, offset: int, limit: Optional[int], descending: bool = False) -> list[Book]:
+        """Ekleme sırasında bir sayfa; atlanan kayıtlar çözülmez."""
+        added = list(self._added.values())
+        positions = [p for p in range(self.snapshot_size) if p not in self._removed] if self._removed \
+            else range(self.snapshot_size)
+        total = len(positions) + len(added)
+        end = total if limit is None else min(total, offset + limit)
+        page = []
+        for i in range(offset, end):
+            j = total - 1 - i if descending else i
+            page.append(self._book_at(positions[j]) if j < len(positions) else added[j - len(positions)])
+        return page
+
+    def export(self) -> tuple[list[dict[str, Any]], dict[int, Book]]:
+        """
+        Yazım için satırlar ve çözülmüş kitapların yeni dosyadaki kayıt numaraları.
+        Dokunulmamış kayıtlar Book'a çevrilmeden doğrudan snapshot'tan okunur.
+        """
+        rows: list[dict[str, Any]] = []
+        decoded: dict[int, Book] = {}
+        for position in range(self.snapshot_size):
+            if position in self._removed:
+                continue
+            book = self._decoded.get(position)
+            if book is None:
+                rows.append(self._snapshot.row(position))
+            else:
+                decoded[len(rows)] = book
+                rows.append(book_to_row(book))
+        for book in list(self._added.values()):
+            decoded[len(rows)] = book
+            rows.append(book_to_row(book))
+        return rows, decoded
+
+
+class BinaryLibrary(Library):
+    """Kataloğu mmap edilmiş ikili snapshot'tan tembel yükleyen Library."""
+
+    def __init__(self, filename: str = "library.bin") -> None:
+        self._indexes_built = True
+        super().__init__(filename)
+
+    # ---------- Kalıcılık ----------
+    def load_books(self) -> None:
+        """Dosyayı mmap eder; kitaplar erişildikçe çözülür (açılış katalog boyutundan bağımsız)."""
+        started = time.perf_counter()
+        path = self._db_path
+        snapshot = BinarySnapshot(path) if path.exists() else None
+        with self._writing():
+            self._index = LazyBookIndex(snapshot)
+            self._sorted = {}
+            self._order = None  # ilk cursor'lı / filtreli listelemede kurulur
+            self._search = SearchIndex()
+            self._indexes_built = False
+            self._counters = None  # ilk istatistik isteğinde kurulur
+            self.fragments.clear()
+            self._rebuild_columns()
+            self._touch_all()
+        elapsed = time.perf_counter() - started
+        self.load_stats = {"rows": len(self._index), "seconds": round(elapsed, 3), "lazy": True}
+
+    def save_books(self) -> None:
+        """Kataloğu yeni bir ikili snapshot olarak yazar ve indeksi yeni dosyaya taşır."""
+        index = self._index
+        if not isinstance(index, LazyBookIndex):
+            write_binary_snapshot(self._db_path, [book_to_row(b) for b in list(index.values())])
+            return
+        version = index.version
+        rows, decoded = index.export()
+        write_binary_snapshot(self._db_path, rows)
+        # Yazım sürerken (writer thread'i) yeni mutasyon geldiyse eski eşleme kalır; POSIX'te
+        # rename edilen eski dosyanın mmap'i geçerliliğini korur, bir sonraki yazım taşır
+        moved = LazyBookIndex(BinarySnapshot(self._db_path), decoded)
+        with self._writing():
+            if self._index is index and index.version == version:
+                self._index = moved
+
+    # ---------- İndeksler ----------
+    def _reset_index(self, books=()) -> None:
+        super()._reset_index(books)
+        self._indexes_built = True
+
+    def _get_counters(self) -> CatalogCounters:
+        if self._counters is None:
+            with self._writing():
+                if self._counters is None:
+                    self._counters = CatalogCounters(self._index.peek_values())
+        return self._counters
+
+    def _rebuild_columns(self) -> None:
+        # Sütun deposu kitapları saklamadan kurulur
+        if self._columns is not None and isinstance(self._index, LazyBookIndex):
+            self._columns = type(self._columns)(self._index.peek_values())
+        else:
+            super()._rebuild_columns()
+
+    def _ensure_indexes(self) -> None:
+        """Sıralı indeksleri ve arama indeksini ilk ihtiyaçta kurar."""
+        if self._indexes_built:
+            return
+        with self._writing():
+            if self._indexes_built:
+                return
+            books = list(self._index.peek_values())
+            self._sorted = {sort: sorted((sort_key(b, sort), b.isbn) for b in books) for sort in SORT_KEYS}
+            self._search.rebuild(books)
+            self._indexes_built = True
+
+    def _ensure_order(self) -> InsertionOrder:
+        if self._order is None:
+            with self._writing():
+                if self._order is None:
+                    self._order = InsertionOrder(self._index)
+        return self._order
+
+    def _ordered_positions(self, sort: Optional[str], descending: bool,
+                           after: Optional[tuple[Any, str]]) -> tuple[range, Callable[[int], str]]:
+        if sort is not None:
+            self._ensure_indexes()
+        return super()._ordered_positions(sort, descending, after)
+
+    def query_books(self, sort: Optional[str] = None, descending: bool = False,
+                    after: Optional[tuple[Any, str]] = None, offset: int = 0,
+                    limit: Optional[int] = None, book_type: Optional[str] = None,
+                    is_borrowed: Optional[bool] = None) -> list[Book]:
+        # Filtresiz ekleme sırası: yalnızca sayfadaki kitaplar çözülür
+        index = self._index
+        if sort is None and after is None and book_type is None and is_borrowed is None \
+                and isinstance(index, LazyBookIndex):
+            return self._read(lambda: index.page(offset, limit, descending))
+        return super().query_books(sort, descending, after, offset, limit, book_type, is_borrowed)
+
+    def search_books(self, query: str, book_type: Optional[str] = None,
+                     offset: int = 0, limit: Optional[int] = None) -> tuple[list[Book], int]:
+        self._ensure_indexes()
+        return super().search_books(query, book_type, offset, limit)
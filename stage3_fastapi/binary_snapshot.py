@@ -0,0 +1,273 @@
+"""
+Kompakt ikili (binary) katalog snapshot'ı ve JSON <-> ikili dönüştürücü.
+
+Dosya düzeni (little-endian):
+    başlık   : MAGIC, sürüm, kitap sayısı, bölüm ofsetleri, CRC32
+    kayıtlar : kitap başına sabit genişlikli kayıt (RECORD); string alanlar için
+               (ofset, uzunluk) çiftleri, yazar sayısı, bayraklar, sayısal alanlar
+    isbn     : ISBN'e göre sıralı uint32 kayıt numaraları (ikili arama için)
+    heap     : UTF-8 string tablosu; aynı string (yazar, kitap tipi, format...)
+               yalnızca bir kez saklanır
+
+Dosya mmap ile açılır; açılış yalnızca başlığı okur, bir kitap ancak istendiğinde
+(`book(i)`, `find(isbn)`) çözülür. CRC32 açılışta değil `verify()` ile kontrol edilir.
+
+Kullanım (kök dizinde):
+    python -m stage3_fastapi.binary_snapshot library.json library.bin   # JSON -> ikili
+    python -m stage3_fastapi.binary_snapshot library.bin library.json   # ikili -> JSON
+"""
+
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from stage3_fastapi.library import book_from_row, book_to_row
+from stage3_fastapi.models import Book
+from stage3_fastapi.snapshot import _fsync_dir, load_snapshot, write_snapshot
+
+MAGIC = b"LIBSNAPB"
+VERSION = 1
+
+# magic, sürüm, kitap sayısı, kayıt / isbn / heap bölüm ofsetleri, heap boyutu, CRC32
+HEADER = struct.Struct("<8sHxxIQQQQI4x")
+
+# Kayıttaki string alanlar (authors, AUTHOR_SEP ile birleştirilir)
+STRING_FIELDS = ("isbn", "title", "authors", "book_type", "shelf_location", "file_format", "narrator")
+# 7 x (heap ofseti, uzunluk), yazar sayısı, bayraklar, file_size_mb, duration_minutes
+RECORD = struct.Struct("<7Q7IHBxdq")
+POSITION = struct.Struct("<I")
+
+AUTHOR_SEP = "\x1f"
+NONE_LENGTH = 0xFFFFFFFF   # string alan None
+
+FLAG_BORROWED = 1
+FLAG_FILE_SIZE = 2
+FLAG_DURATION = 4
+
+
+def is_binary_snapshot(path: Path) -> bool:
+    """Dosya ikili snapshot biçiminde mi (magic ile)?"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _string_values(row: dict[str, Any]) -> tuple[Optional[str], ...]:
+    authors = row.get("authors")
+    if authors is None:
+        authors = [row["author"]] if "author" in row else []
+    return (
+        str(row.get("isbn", "")),
+        str(row.get("title", "")),
+        AUTHOR_SEP.join(authors),
+        str(row.get("book_type", "Physical")),
+    ) + tuple(row.get(field) or None for field in ("shelf_location", "file_format", "narrator"))
+
+
+def write_binary_snapshot(path: Path, rows: Iterable[dict[str, Any]]) -> int:
+    """
+    Satırları ikili snapshot olarak atomik yazar (geçici dosya, fsync, rename).
+    Satırlar library.json düzenindedir (stage1 `author` anahtarı dahil); yazılan kitap sayısını döndürür.
+    """
+    path = Path(path)
+    heap = bytearray()
+    strings: dict[str, tuple[int, int]] = {}   # string -> (ofset, uzunluk), tekrarlar paylaşılır
+    records = bytearray()
+    isbns: list[tuple[bytes, int]] = []
+
+    def intern(value: Optional[str]) -> tuple[int, int]:
+        if value is None:
+            return 0, NONE_LENGTH
+        ref = strings.get(value)
+        if ref is None:
+            data = value.encode("utf-8")
+            ref = strings[value] = (len(heap), len(data))
+            heap.extend(data)
+        return ref
+
+    count = 0
+    for row in rows:
+        values = _string_values(row)
+        refs = [intern(value) for value in values]
+        authors = row.get("authors")
+        author_count = len(authors) if authors is not None else int("author" in row)
+        flags = FLAG_BORROWED if row.get("is_borrowed") else 0
+        file_size = row.get("file_size_mb")
+        duration = row.get("duration_minutes")
+        if file_size:
+            flags |= FLAG_FILE_SIZE
+        if duration:
+            flags |= FLAG_DURATION
+        records += RECORD.pack(*(offset for offset, _ in refs), *(length for _, length in refs),
+                               author_count, flags, float(file_size or 0), int(duration or 0))
+        isbns.append((values[0].encode("utf-8"), count))
+        count += 1
+
+    isbns.sort()
+    index = b"".join(POSITION.pack(position) for _, position in isbns)
+    records_offset = HEADER.size
+    isbn_offset = records_offset + len(records)
+    heap_offset = isbn_offset + len(index)
+    crc = zlib.crc32(heap, zlib.crc32(index, zlib.crc32(records)))
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, records_offset, isbn_offset, heap_offset, len(heap), crc))
+        f.write(records)
+        f.write(index)
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+    return count
+
+
+class BinarySnapshot:
+    """mmap ile açılmış ikili snapshot; kitapları istendiğinde çözer."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < HEADER.size:
+                raise ValueError(f"{self.path} is not a binary library snapshot")
+            (magic, version, self._count, self._records, self._isbns,
+             self._heap, heap_size, self._crc) = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a binary library snapshot")
+            if version != VERSION:
+                raise ValueError(f"Unsupported binary snapshot version {version} in {self.path}")
+            if (self._isbns != self._records + self._count * RECORD.size
+                    or self._heap != self._isbns + self._count * POSITION.size
+                    or len(self._mm) != self._heap + heap_size):
+                raise ValueError(f"Truncated binary snapshot {self.path}")
+        except ValueError:
+            self._mm.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def verify(self) -> None:
+        """Tüm veri bölümlerinin CRC32'sini doğrular; uyuşmazsa ValueError fırlatır."""
+        if zlib.crc32(self._mm[self._records:]) != self._crc:
+            raise ValueError(f"Checksum mismatch in {self.path}")
+
+    # ---------- Ham erişim ----------
+    def _record(self, i: int) -> tuple:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return RECORD.unpack_from(self._mm, self._records + i * RECORD.size)
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if length == NONE_LENGTH:
+            return None
+        start = self._heap + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _field(self, record: tuple, n: int) -> Optional[str]:
+        return self._string(record[n], record[7 + n])
+
+    def isbn(self, i: int) -> str:
+        record = self._record(i)
+        return self._field(record, 0) or ""
+
+    def find(self, isbn: str) -> Optional[int]:
+        """ISBN'in kayıt numarası (sıralı ISBN tablosunda ikili arama)."""
+        target = isbn.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            position = POSITION.unpack_from(self._mm, self._isbns + mid * POSITION.size)[0]
+            record = self._record(position)
+            start = self._heap + record[0]
+            key = self._mm[start:start + record[7]]
+            if key < target:
+                lo = mid + 1
+            elif key > target:
+                hi = mid
+            else:
+                return position
+        return None
+
+    # ---------- Çözme ----------
+    def row(self, i: int) -> dict[str, Any]:
+        """i. kaydı library.json satırına çevirir (book_to_row ile aynı anahtarlar)."""
+        record = self._record(i)
+        author_count, flags, file_size, duration = record[14:]
+        authors_text = self._field(record, 2) or ""
+        authors = authors_text.split(AUTHOR_SEP) if author_count else []
+        row: dict[str, Any] = {
+            "isbn": self._field(record, 0),
+            "title": self._field(record, 1),
+            "authors": authors,
+            "author": authors[0] if authors else "Unknown Author",
+            "is_borrowed": bool(flags & FLAG_BORROWED),
+            "book_type": self._field(record, 3),
+        }
+        for n, field in ((4, "shelf_location"), (5, "file_format"), (6, "narrator")):
+            value = self._field(record, n)
+            if value:
+                row[field] = value
+        if flags & FLAG_FILE_SIZE:
+            row["file_size_mb"] = file_size
+        if flags & FLAG_DURATION:
+            row["duration_minutes"] = duration
+        return row
+
+    def book(self, i: int) -> Book:
+        return book_from_row(self.row(i))
+
+    def rows(self) -> Iterable[dict[str, Any]]:
+        for i in range(self._count):
+            yield self.row(i)
+
+
+# ---------- Dönüştürücü ----------
+def json_to_binary(source: Path, target: Path) -> int:
+    """library.json (düz liste, stage1 `author` ya da checksum'lı snapshot) -> ikili snapshot."""
+    rows = load_snapshot(Path(source))
+    # book_from_row / book_to_row: eksik alanlar ve `author` anahtarı normalize edilir
+    return write_binary_snapshot(target, (book_to_row(book_from_row(row)) for row in rows if isinstance(row, dict)))
+
+
+def binary_to_json(source: Path, target: Path) -> int:
+    """İkili snapshot -> checksum'lı library.json snapshot'ı (stage1 `author` anahtarı dahil)."""
+    snapshot = BinarySnapshot(source)
+    try:
+        snapshot.verify()
+        rows = list(snapshot.rows())
+    finally:
+        snapshot.close()
+    write_snapshot(Path(target), rows)
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert between library.json and the binary snapshot format")
+    parser.add_argument("source", type=Path, help="library.json or binary snapshot")
+    parser.add_argument("target", type=Path, help="Output file (format is the opposite of the source)")
+    args = parser.parse_args()
+
+    if is_binary_snapshot(args.source):
+        count = binary_to_json(args.source, args.target)
+        print(f"{args.source} -> {args.target}: {count} book(s) written as JSON")
+    else:
+        count = json_to_binary(args.source, args.target)
+        print(f"{args.source} -> {args.target}: {count} book(s) written as binary snapshot")
+
+
+if __name__ == "__main__":
+    main()
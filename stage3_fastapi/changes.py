@@ -0,0 +1,94 @@
+"""
+Katalog değişiklik akışı (GET /books/changes için).
+
+Library her mutasyonda katalog sürümünü bir artırır ve ChangeFeed'e
+(sürüm, işlem, ISBN) kaydı ekler; kitabın kendisi tutulmaz, akış gönderilirken
+güncel hali okunur. Sürümler artan sıradadır ama ardışık olmak zorunda değildir
+(paylaşımlı backend başka süreçlerin değişikliklerini birleştirerek uygular).
+Son `maxlen` kayıt saklanır; daha eskisinden devam etmek isteyen ya da katalog
+baştan yüklendikten sonra bağlanan istemciye "reset" gönderilir (istemci listeyi
+yeniden çeker).
+
+Bekleyenler asyncio.Event ile uyandırılır; mutasyon başka bir thread'den
+gelebileceği için uyandırma call_soon_threadsafe ile yapılır.
+"""
+
+from __future__ import annotations
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import Optional
+
+# İşlemler: add / update / remove; reset = katalog baştan yüklendi
+Change = tuple[int, str, Optional[str]]
+
+
+class ChangeFeed:
+    def __init__(self, maxlen: int = 10000) -> None:
+        self._changes: deque[Change] = deque()
+        self._maxlen = maxlen
+        self._version = 0
+        self._floor = 0  # son reset'in ya da atılan en yeni kaydın sürümü; daha eskisinden devam edilemez
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def record(self, version: int, op: str, isbn: Optional[str] = None) -> None:
+        if len(self._changes) >= self._maxlen:
+            self._floor = self._changes.popleft()[0]
+        self._changes.append((version, op, isbn))
+        self._version = version
+        self._notify()
+
+    def advance(self, version: int) -> None:
+        """Kayıt eklemeden sürümü ilerletir (arada gönderilecek değişiklik yok)."""
+        self._version = max(self._version, version)
+
+    def reset(self, version: int) -> None:
+        """Katalog baştan kuruldu: eski kayıtlar geçersiz."""
+        self._changes.clear()
+        self._version = self._floor = version
+        self._notify()
+
+    def since(self, version: int) -> Optional[list[Change]]:
+        """
+        `version`'dan sonraki kayıtlar; aradaki kayıtlar artık saklanmıyorsa
+        (ya da sürüm bu akışa ait değilse) None -> istemci baştan yüklemeli.
+        """
+        if version == self._version:
+            return []
+        if version > self._version or version < self._floor:
+            return None
+        # Yeni kayıtlar sondadır; sondan geriye taranır
+        start = len(self._changes)
+        while start and self._changes[start - 1][0] > version:
+            start -= 1
+        return list(islice(self._changes, start, None))
+
+    def _notify(self) -> None:
+        for loop, event in list(self._waiters):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # loop kapanmış
+                self._waiters.discard((loop, event))
+
+    async def wait(self, version: int, timeout: Optional[float] = None) -> bool:
+        """Sürüm `version`'ı geçene kadar (en fazla `timeout` saniye) bekler."""
+        if self.version != version:
+            return True
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        self._waiters.add(waiter)
+        try:
+            if self.version != version:  # kayıt ile ekleme arasında değişmiş olabilir
+                return True
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+    def stats(self) -> dict[str, int]:
+        return {"version": self.version, "retained": len(self._changes), "subscribers": len(self._waiters)}
@@ -0,0 +1,149 @@
+"""
+Sütun tabanlı (struct-of-arrays) kitap deposu: filtreli, ekleme sıralı sayfalar için.
+
+Library'nin nesne indeksinin yanında isteğe bağlı olarak tutulur
+(`Library.enable_columnar()`, `?columnar=true` ya da LIBRARY_COLUMNAR=1) ve her
+ekleme / silme / güncellemede senkronize edilir. Sütunlar:
+
+    is_borrowed  -> numpy bool dizisi
+    book_type    -> int16 kod dizisi (sözlük kodlu)
+    alive        -> silinen satırlar için bayrak (satırlar ekleme sırasında kalır)
+
+Filtreler Python döngüsü yerine vektörel maske işlemleriyle yapılır. Sayımlar bu
+depodan değil O(1) güncellenen CatalogCounters'tan (counters.py) okunur.
+Silinen satırlar yarıdan fazla olunca dizi sıkıştırılır.
+"""
+
+from __future__ import annotations
+from typing import Iterable, Optional
+
+import numpy as np
+
+from stage3_fastapi.models import Book
+
+INITIAL_CAPACITY = 1024
+
+
+class _Dictionary:
+    """Değer <-> tamsayı kod eşlemesi; 0 kodu None içindir."""
+
+    def __init__(self) -> None:
+        self.values: list[Optional[str]] = [None]
+        self._codes: dict[Optional[str], int] = {None: 0}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value: Optional[str]) -> Optional[int]:
+        """Değerin kodu; sözlükte hiç görülmemişse None (eşleşen satır yok)."""
+        return self._codes.get(value)
+
+
+class BookStore:
+    """Kitapların filtrelenebilir alanlarını numpy dizilerinde tutan sütun deposu."""
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        self._isbns: list[Optional[str]] = []      # satır -> ISBN (silinmişse None)
+        self._rows: dict[str, int] = {}            # ISBN -> satır
+        self._size = 0                             # kullanılan satır sayısı (silinenler dahil)
+        self._dead = 0
+        self._types = _Dictionary()
+        self.alive = np.zeros(INITIAL_CAPACITY, dtype=np.bool_)
+        self.is_borrowed = np.zeros(INITIAL_CAPACITY, dtype=np.bool_)
+        self.book_type = np.zeros(INITIAL_CAPACITY, dtype=np.int16)
+        for book in books:
+            self.add(book)
+
+    def _grow(self) -> None:
+        """Kapasiteyi ikiye katlar."""
+        capacity = len(self.alive) * 2
+
+        def grow(old: np.ndarray) -> np.ndarray:
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            return new
+
+        self.alive = grow(self.alive)
+        self.is_borrowed = grow(self.is_borrowed)
+        self.book_type = grow(self.book_type)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, isbn: object) -> bool:
+        return isbn in self._rows
+
+    # ---------- Senkronizasyon ----------
+    def _write(self, row: int, book: Book) -> None:
+        self.is_borrowed[row] = bool(book.is_borrowed)
+        self.book_type[row] = self._types.encode(book.book_type)
+
+    def add(self, book: Book) -> None:
+        if book.isbn in self._rows:
+            self.update(book)
+            return
+        if self._size == len(self.alive):
+            self._grow()
+        row = self._size
+        self._size += 1
+        self._isbns.append(book.isbn)
+        self._rows[book.isbn] = row
+        self.alive[row] = True
+        self._write(row, book)
+
+    def update(self, book: Book) -> None:
+        row = self._rows.get(book.isbn)
+        if row is not None:
+            self._write(row, book)
+
+    def remove(self, isbn: str) -> None:
+        row = self._rows.pop(isbn, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self._isbns[row] = None
+        self._dead += 1
+        if self._dead > INITIAL_CAPACITY and self._dead * 2 > self._size:
+            self.compact()
+
+    def compact(self) -> None:
+        """Silinen satırları atar (ekleme sırası korunur)."""
+        keep = np.flatnonzero(self.alive[:self._size])
+        self.is_borrowed[:len(keep)] = self.is_borrowed[keep]
+        self.book_type[:len(keep)] = self.book_type[keep]
+        self._isbns = [self._isbns[i] for i in keep]
+        self._rows = {isbn: row for row, isbn in enumerate(self._isbns)}
+        self.alive[:] = False
+        self.alive[:len(keep)] = True
+        self._size = len(keep)
+        self._dead = 0
+
+    # ---------- Sorgular ----------
+    def mask(self, book_type: Optional[str] = None, is_borrowed: Optional[bool] = None) -> np.ndarray:
+        """Filtreye uyan canlı satırlar için bool maske."""
+        mask = self.alive[:self._size].copy()
+        if is_borrowed is not None:
+            mask &= self.is_borrowed[:self._size] == bool(is_borrowed)
+        if book_type is not None:
+            code = self._types.code(book_type)
+            if code is None:
+                return np.zeros(self._size, dtype=np.bool_)
+            mask &= self.book_type[:self._size] == code
+        return mask
+
+    def isbns(self, mask: np.ndarray, descending: bool = False, offset: int = 0,
+              limit: Optional[int] = None) -> list[str]:
+        """
+        Maskedeki satırların ISBN'leri (ekleme sırasıyla, descending ise tersten).
+        Satır numaraları numpy'de dilimlenir (ters çevirme bir görünümdür); Python
+        listesine yalnızca [offset:offset+limit] sayfasındaki ISBN'ler çevrilir.
+        """
+        rows = np.flatnonzero(mask)
+        if descending:
+            rows = rows[::-1]
+        end = None if limit is None else offset + limit
+        return [self._isbns[i] for i in rows[offset:end].tolist()]
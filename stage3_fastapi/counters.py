@@ -0,0 +1,73 @@
+"""
+Artımlı güncellenen katalog sayaçları (/statistics ve /health için).
+
+Library her ekleme / silme / güncelleme / ödünç işleminde sayaçları düzeltir;
+istatistikler katalog taranmadan O(1) okunur. Sayılan alanlar: toplam,
+(kitap tipi, ödünç durumu) çiftleri, raf konumu ve dosya formatı.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from stage3_fastapi.models import Book
+
+# Değişince sayaçları etkileyen Book alanları
+COUNTED_FIELDS = {"is_borrowed", "book_type", "shelf_location", "file_format"}
+
+
+class CatalogCounters:
+    """Kitap tipi / ödünç durumu / raf / format sayaçları."""
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        self.total = 0
+        self.borrowed = 0
+        self.by_state: Counter[tuple[str, bool]] = Counter()   # (book_type, is_borrowed) -> adet
+        self.shelves: Counter[str] = Counter()
+        self.formats: Counter[str] = Counter()
+        for book in books:
+            self.add(book)
+
+    @staticmethod
+    def _bump(counter: Counter, key: Any, delta: int) -> None:
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    def add(self, book: Book, delta: int = 1) -> None:
+        borrowed = bool(book.is_borrowed)
+        self.total += delta
+        self.borrowed += delta if borrowed else 0
+        self._bump(self.by_state, (book.book_type, borrowed), delta)
+        if book.shelf_location:
+            self._bump(self.shelves, book.shelf_location, delta)
+        if book.file_format:
+            self._bump(self.formats, book.file_format, delta)
+
+    def remove(self, book: Book) -> None:
+        self.add(book, -1)
+
+    def count(self, book_type: Optional[str] = None, is_borrowed: Optional[bool] = None) -> int:
+        """Filtreye uyan kitap sayısı (kitap tipi sayısı kadar adım)."""
+        if book_type is None and is_borrowed is None:
+            return self.total
+        if book_type is not None and is_borrowed is not None:
+            return self.by_state[(book_type, bool(is_borrowed))]
+        if book_type is not None:
+            return self.by_state[(book_type, True)] + self.by_state[(book_type, False)]
+        return self.borrowed if is_borrowed else self.total - self.borrowed
+
+    def by_type(self) -> dict[str, int]:
+        types: dict[str, int] = {}
+        for (book_type, _), n in self.by_state.items():
+            types[book_type] = types.get(book_type, 0) + n
+        return types
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "borrowed": self.borrowed,
+            "book_type": self.by_type(),
+            "shelf_location": dict(self.shelves),
+            "file_format": dict(self.formats),
+        }
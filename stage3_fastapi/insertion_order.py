@@ -0,0 +1,92 @@
+"""
+Ekleme sırası indeksi (sort=None listeleme ve cursor'ı için).
+
+Her kitaba eklendiğinde artan bir sıra numarası (seq) verilir ve ISBN'ler seq'e
+göre sıralı iki paralel dizide tutulur (seq hep arttığı için ekleme sona yapılır).
+Böylece:
+
+- offset'li bir sayfa dilimlenir: baştan yürünmez, maliyet sayfa boyutu kadardır;
+- cursor son görülen kitabın (seq, isbn) çiftidir. O kitap sonradan silinse de
+  bisect ile sonraki kayıttan devam edilir; araya giren silme / eklemeler satır
+  atlatmaz ya da tekrarlatmaz (offset cursor'ının aksine).
+
+Sıra numaraları yalnızca bu indeks için geçerlidir: katalog baştan yüklenince (ya da
+başka bir worker'da) yeniden verilir. Bu yüzden cursor anahtarı indeksin rastgele
+token'ıyla birlikte yazılır; başka bir indeksten gelen cursor yanlış konumdan sayfa
+döndürmek yerine StaleCursorError ile reddedilir.
+"""
+
+from __future__ import annotations
+import secrets
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Optional
+
+
+class StaleCursorError(ValueError):
+    """Cursor başka bir ekleme sırası indeksinden (önceki yükleme / başka worker) geliyor."""
+
+
+class InsertionOrder:
+    """ISBN'lerin ekleme sırası: seq ile konum arama, konumdan ISBN okuma."""
+
+    def __init__(self, isbns: Iterable[str] = ()) -> None:
+        self._seqs: dict[str, int] = {}      # ISBN -> seq
+        self._order = array("q")             # konum -> seq (artan)
+        self._isbns: list[str] = []          # konum -> ISBN
+        self._next = 0
+        self.token = secrets.token_hex(4)    # cursor'ların bu indekse ait olduğunu gösterir
+        for isbn in isbns:
+            self.add(isbn)
+
+    def __len__(self) -> int:
+        return len(self._isbns)
+
+    def add(self, isbn: str) -> None:
+        if isbn in self._seqs:
+            return
+        seq = self._seqs[isbn] = self._next
+        self._next += 1
+        self._order.append(seq)
+        self._isbns.append(isbn)
+
+    def remove(self, isbn: str) -> None:
+        seq = self._seqs.pop(isbn, None)
+        if seq is None:
+            return
+        position = bisect_left(self._order, seq)
+        del self._order[position]
+        del self._isbns[position]
+
+    def key(self, isbn: str) -> Optional[list[Any]]:
+        """Kitabın cursor anahtarı: [token, seq]; kitap yoksa None."""
+        seq = self._seqs.get(isbn)
+        return None if seq is None else [self.token, seq]
+
+    def resume(self, key: Any, isbn: str) -> int:
+        """
+        Cursor anahtarını (key'in döndürdüğü [token, seq]) seq'e çevirir. Token bu
+        indeksin değilse ya da seq kitapla tutmuyorsa StaleCursorError fırlatır.
+        Kitap sonradan silinmişse seq'i yine geçerlidir; yeniden eklendiyse daha büyük
+        bir seq almıştır.
+        """
+        try:
+            token, seq = key
+            seq = int(seq)
+        except (TypeError, ValueError):
+            raise StaleCursorError("Malformed insertion-order cursor") from None
+        current = self._seqs.get(isbn)
+        if token != self.token or not 0 <= seq < self._next or (current is not None and current < seq):
+            raise StaleCursorError("Cursor belongs to an earlier load of the catalog")
+        return seq
+
+    def isbn_at(self, position: int) -> str:
+        return self._isbns[position]
+
+    def positions(self, descending: bool = False, after: Optional[int] = None) -> range:
+        """Gezilecek konumlar; after verilirse o seq'ten sonrası (azalan sırada öncesi)."""
+        if descending:
+            end = bisect_left(self._order, after) if after is not None else len(self._isbns)
+            return range(end - 1, -1, -1)
+        start = bisect_right(self._order, after) if after is not None else 0
+        return range(start, len(self._isbns))
@@ -0,0 +1,170 @@
+"""
+Append-only journal (write-ahead log) ile kalıcılık.
+
+Her mutasyon `library.json.journal` dosyasına tek satırlık kompakt bir kayıt
+(add / remove / patch) olarak eklenir ve fsync edilir; katalog her seferinde
+baştan yazılmaz. Açılışta snapshot (library.json) + journal yeniden oynatılır.
+Journal belirlenen boyutu geçince arka planda yeni bir snapshot'a katlanır.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from stage3_fastapi.library import Library, book_to_row
+from stage3_fastapi.snapshot import write_snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPACT_THRESHOLD = 4 * 1024 * 1024  # 4 MiB
+
+
+class JournalLibrary(Library):
+    """Mutasyonları journal'a ekleyen, snapshot'ı yalnızca compaction'da yazan Library."""
+
+    def __init__(self, filename: str = "library.json",
+                 compact_threshold: int = DEFAULT_COMPACT_THRESHOLD) -> None:
+        self.compact_threshold = compact_threshold
+        self._journal_lock = threading.Lock()      # append ve journal döndürme
+        self._compaction_lock = threading.Lock()   # aynı anda tek compaction
+        self._journal_file: Optional[BinaryIO] = None
+        self._journal_file_path: Optional[Path] = None
+        self._compactor: Optional[threading.Thread] = None
+        super().__init__(filename)
+
+    # ---------- Dosya yolları ----------
+    @property
+    def _journal_path(self) -> Path:
+        path = self._db_path
+        return path.with_name(path.name + ".journal")
+
+    @property
+    def _rotated_journal_path(self) -> Path:
+        # Compaction sırasında snapshot'a katlanmakta olan eski journal
+        path = self._db_path
+        return path.with_name(path.name + ".journal.old")
+
+    # ---------- Yükleme / replay ----------
+    def load_books(self) -> None:
+        """Snapshot'ı yükler, ardından eski ve aktif journal kayıtlarını sırayla oynatır."""
+        with self._journal_lock:
+            self._close_journal()
+            super().load_books()
+            for path in (self._rotated_journal_path, self._journal_path):
+                self._replay(path)
+
+    def _replay(self, path: Path) -> None:
+        if not path.exists():
+            return
+        good_offset = 0
+        with open(path, "r+b") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._apply_change(record["op"], record["isbn"], record.get("data"))
+                except (ValueError, KeyError):
+                    # Çökme sırasında yarım kalmış kayıt: buradan sonrasını at ki
+                    # yeni kayıtlar bozuk satırın arkasına eklenmesin
+                    logger.warning(f"Truncating corrupt journal tail in {path} at byte {good_offset}")
+                    f.truncate(good_offset)
+                    break
+                good_offset += len(line)
+
+    # ---------- Yazma ----------
+    def _open_journal(self) -> BinaryIO:
+        path = self._journal_path
+        if self._journal_file is None or self._journal_file_path != path:
+            self._close_journal()
+            self._journal_file = open(path, "ab")
+            self._journal_file_path = path
+        return self._journal_file
+
+    def _close_journal(self) -> None:
+        if self._journal_file is not None:
+            self._journal_file.close()
+        self._journal_file = None
+        self._journal_file_path = None
+
+    def _commit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        """Tek kaydı journal'a ekler ve fsync eder; eşik aşılırsa compaction başlatır."""
+        self._commit_many([(op, isbn, payload)])
+
+    def _commit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        """Kayıtları tek write + tek fsync ile journal'a ekler."""
+        if not changes:
+            return
+        lines = []
+        for op, isbn, payload in changes:
+            record: dict[str, Any] = {"op": op, "isbn": isbn}
+            if payload is not None:
+                record["data"] = payload
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        with self._journal_lock:
+            f = self._open_journal()
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        if size >= self.compact_threshold:
+            self._start_compaction()
+
+    def save_books(self) -> None:
+        """Tam kayıt istenirse journal'ı hemen snapshot'a katlar."""
+        self.compact()
+
+    # ---------- Compaction ----------
+    def _start_compaction(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_in_background,
+                                           name="journal-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Journal compaction failed: {e}")
+
+    def compact(self) -> None:
+        """
+        Journal'ı yeni bir snapshot'a katlar.
+        Kayıt ekleme yalnızca döndürme anında beklenir; snapshot yazımı kilitsiz yapılır.
+        """
+        with self._compaction_lock:
+            with self._journal_lock:
+                books = list(self._index.values())
+                self._close_journal()
+                self._rotate_journal()
+            write_snapshot(self._db_path, [book_to_row(b) for b in books], self.snapshot_generations)
+            self._rotated_journal_path.unlink(missing_ok=True)
+
+    def _rotate_journal(self) -> None:
+        journal, rotated = self._journal_path, self._rotated_journal_path
+        if not journal.exists():
+            return
+        if rotated.exists():
+            # Önceki compaction yarıda kalmış: eski kayıtları kaybetmemek için arkasına ekle
+            with open(rotated, "ab") as dst, open(journal, "rb") as src:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            journal.unlink()
+        else:
+            os.replace(journal, rotated)
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        """Arka planda çalışan compaction (varsa) bitene kadar bekler."""
+        if self._compactor is not None:
+            self._compactor.join(timeout)
+
+    def close(self) -> None:
+        """Compaction'ı bekler ve journal dosyasını kapatır."""
+        self.wait_for_compaction()
+        with self._journal_lock:
+            self._close_journal()
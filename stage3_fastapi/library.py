@@ -1,20 +1,167 @@
 from __future__ import annotations
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
 from pathlib import Path
-import json
-import httpx
-from typing import Any, Iterable, Optional, List
+import asyncio
+import copy
+import logging
+import secrets
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, List, TypeVar
+from stage3_fastapi.changes import ChangeFeed
+from stage3_fastapi.counters import COUNTED_FIELDS, CatalogCounters
+from stage3_fastapi.insertion_order import InsertionOrder
 from stage3_fastapi.models import Book
+from stage3_fastapi.openlibrary import BATCH_SIZE, OpenLibraryClient
+from stage3_fastapi.search import SearchIndex
+from stage3_fastapi.serialization import FragmentCache
+from stage3_fastapi.singleflight import KeyedLock
+from stage3_fastapi.snapshot import DEFAULT_GENERATIONS, load_snapshot_with, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+OPTIONAL_FIELDS = ("shelf_location", "file_size_mb", "file_format", "duration_minutes", "narrator")
+
+# Sıralı indeks tutulan alanlar ve sıralamayı etkileyen Book alanları
+SORT_KEYS = ("title", "author", "isbn")
+SORT_FIELDS = {"title": {"title"}, "author": {"authors"}, "isbn": {"isbn"}}
+# Arama indeksini etkileyen alanlar
+SEARCH_FIELDS = {"title", "authors", "isbn"}
+# Sütun deposunda (columnar.BookStore) tutulan alanlar
+COLUMN_FIELDS = {"is_borrowed", "book_type"}
+# Kilitsiz okumanın, yazımla çakıştığında kilide düşmeden önce kaç kez deneneceği
+READ_ATTEMPTS = 8
+
+T = TypeVar("T")
+
+
+class VersionConflictError(Exception):
+    """Kitap, değişikliği isteyenin beklediği sürümden beri değişmiş (If-Match / 412)."""
+
+
+def sort_key(book: Book, sort: str) -> str:
+    """Sıralı indekslerde kullanılan anahtar (başlık/yazar büyük-küçük harf duyarsız)."""
+    if sort == "isbn":
+        return book.isbn
+    value = book.title if sort == "title" else book.author
+    return value.casefold()
+
+
+def book_from_row(row: dict[str, Any]) -> Book:
+    """JSON satırından Book üretir (stage1 `author` anahtarı dahil)."""
+    # Stage 1 uyumluluğu: author ve authors alanlarını destekle
+    if "authors" in row:
+        authors = row["authors"]
+    elif "author" in row:
+        authors = [row["author"]]
+    else:
+        authors = []
+
+    # Book type ve ek alanları hazırla
+    book_kwargs = {
+        'isbn': row.get("isbn", ""),
+        'title': row.get("title", ""),
+        'authors': authors,
+        'is_borrowed': row.get("is_borrowed", False),
+        'book_type': row.get("book_type", "Physical"),
+    }
+
+    # Optional fields - varsa ekle
+    for field in OPTIONAL_FIELDS:
+        if field in row:
+            book_kwargs[field] = row[field]
+
+    return Book(**book_kwargs)
+
+
+def book_to_row(b: Book) -> dict[str, Any]:
+    """Book'u JSON'a yazılacak satıra çevirir."""
+    row = {
+        "isbn": b.isbn,
+        "title": b.title,
+        "authors": b.authors,
+        "author": b.author,  # Stage 1 uyumluluğu için
+        "is_borrowed": b.is_borrowed,
+        "book_type": getattr(b, 'book_type', 'Physical'),
+    }
+
+    # Optional fields - sadece varsa ekle
+    for field in OPTIONAL_FIELDS:
+        value = getattr(b, field, None)
+        if value:
+            row[field] = value
+
+    return row
+
+
+def optimistic_read(method: Callable[..., T]) -> Callable[..., T]:
+    """Okuma metodunu Library._read içinde çalıştırır (kilitsiz, çakışırsa yeniden dener)."""
+    @wraps(method)
+    def wrapper(self: "Library", *args: Any, **kwargs: Any) -> T:
+        return self._read(lambda: method(self, *args, **kwargs))
+    return wrapper
+
 
 class Library:
+    # Kaç snapshot nesli saklanacağı (library.json, library.json.1, ...)
+    snapshot_generations = DEFAULT_GENERATIONS
+    # Başka süreçlerin değişikliklerini kaç saniyede bir kontrol etmeli (None: tek süreç)
+    poll_interval: Optional[float] = None
+
     def __init__(self, filename: str = "library.json") -> None:
         self.filename = filename  # gereksinime göre dosya adı dışarıdan gelir
-        self._books: list[Book] = []
+        # ISBN -> Book indeksi; dict ekleme sırasını koruduğu için liste yerine de geçer
+        self._index: dict[str, Book] = {}
+        # sort -> [(anahtar, isbn), ...] sıralı listeleri (sayfalama / cursor için)
+        self._sorted: dict[str, list[tuple[str, str]]] = {}
+        # Ekleme sırası (sort=None sayfalaması ve cursor'ı için; bkz. insertion_order.py)
+        self._order: Optional[InsertionOrder] = InsertionOrder()
+        # Başlık / yazar / ISBN üzerinde ters token indeksi (arama için)
+        self._search = SearchIndex()
+        self.openlibrary = OpenLibraryClient()
+        self._writer: Optional[ThreadPoolExecutor] = None  # tembel oluşturulan tek yazıcı thread
+        self._adding = KeyedLock()  # aynı ISBN'in eşzamanlı eklenmesini sıraya koyar
+        self.load_stats: dict[str, Any] = {}  # son yüklemenin satır sayısı / süresi / hızı
+        self._columns = None  # isteğe bağlı sütun deposu (bkz. enable_columnar)
+        self._counters: Optional[CatalogCounters] = CatalogCounters()  # istatistik sayaçları
+        self.fragments = FragmentCache()  # kitap başına kodlanmış JSON (API yanıtları için)
+        # Sürümler (ETag'ler için): her mutasyonda artan katalog sürümü ve kitabın son
+        # değiştiği katalog sürümü. epoch süreç başına rastgeledir; yeniden başlatmadan
+        # sonra aynı numaralar farklı içerikle eşleşmez
+        self.epoch = secrets.token_hex(4)
+        self.catalog_version = 0
+        self._book_versions: dict[str, int] = {}
+        self._base_version = 0  # son toplu yüklemenin sürümü (o andan beri dokunulmamış kitaplar)
+        self.changes = ChangeFeed()  # sürüm başına değişiklik kaydı (SSE akışı için)
+        # Eşzamanlılık: yazarlar _mutation içinde _lock ile sıraya girer (kontrol + değişiklik
+        # + commit'in sıraya konması atomik). İndeks değişiklikleri ayrıca _memory_lock altında
+        # ve _writes tekken yapılır; okumalar kilit almaz (bkz. _read). Kitaplar yerinde
+        # değiştirilmez, güncel kopya indekse konur (bkz. _patch)
+        self._lock = threading.RLock()
+        self._memory_lock = threading.RLock()
+        self._writes = 0
+        self._reset_index()
         self.load_books()
 
     # ---------- Kalıcılık ----------
     @property
     def _db_path(self) -> Path:
-        return Path(__file__).with_name(self.filename)
+        # Göreli isimler modülün yanında çözülür; mutlak yol verilirse aynen kullanılır
+        return Path(__file__).parent / self.filename
+
+    @property
+    def _books(self) -> list[Book]:
+        """Kitapların ekleme sırasıyla listesi (ISBN indeksinden türetilir)."""
+        return list(self._index.values())
+
+    @_books.setter
+    def _books(self, books: Iterable[Book]) -> None:
+        # Liste doğrudan atanırsa indeksleri yeniden kur
+        self._reset_index(books)
 
     @property
     def books(self) -> list[Book]:
@@ -22,141 +169,276 @@ class Library:
         return self._books
 
     def load_books(self) -> None:
-        """library.json dosyasından kitapları yükler."""
-        path = self._db_path
-        if not path.exists():
-            self._books = []
-            return
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            assert isinstance(data, list)
-        except Exception:
-            data = []
-        
-        self._books = []
-        for row in data:
-            # Stage 1 uyumluluğu: author ve authors alanlarını destekle
-            if "authors" in row:
-                authors = row["authors"]
-            elif "author" in row:
-                authors = [row["author"]]
-            else:
-                authors = []
-            
-            # Book type ve ek alanları hazırla
-            book_kwargs = {
-                'isbn': row.get("isbn", ""),
-                'title': row.get("title", ""),
-                'authors': authors,
-                'is_borrowed': row.get("is_borrowed", False),
-                'book_type': row.get("book_type", "Physical"),
-            }
-            
-            # Optional fields - varsa ekle
-            if "shelf_location" in row:
-                book_kwargs['shelf_location'] = row["shelf_location"]
-            if "file_size_mb" in row:
-                book_kwargs['file_size_mb'] = row["file_size_mb"]
-            if "file_format" in row:
-                book_kwargs['file_format'] = row["file_format"]
-            if "duration_minutes" in row:
-                book_kwargs['duration_minutes'] = row["duration_minutes"]
-            if "narrator" in row:
-                book_kwargs['narrator'] = row["narrator"]
-            
-            book = Book(**book_kwargs)
-            self._books.append(book)
+        """
+        library.json dosyasından kitapları yükler.
+        Checksum'ı geçerli en yeni snapshot nesli kullanılır (bkz. snapshot.py); hiçbir
+        nesil okunamıyorsa SnapshotError fırlatılır, katalog sessizce boşaltılmaz.
+        Büyük dosyalar akış halinde okunur: satırlar tek tek Book'a çevrilir, dosya
+        metni ve satır listesi bir arada tutulmaz. Yükleme hızı `load_stats`'a yazılır.
+        """
+        started = time.perf_counter()
+        load_snapshot_with(self._db_path, lambda rows: self._reset_index(
+            book_from_row(row) for row in rows if isinstance(row, dict)))
+        elapsed = time.perf_counter() - started
+        count = len(self._index)
+        self.load_stats = {
+            "rows": count,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(count / elapsed) if elapsed > 0 else count,
+        }
+        logger.info(f"Loaded {count} books from {self._db_path.name} in {elapsed:.2f}s "
+                    f"({self.load_stats['rows_per_sec']} rows/s)")
 
     def save_books(self) -> None:
-        """Mevcut kitap listesini JSON'a yazar."""
-        rows: list[dict[str, Any]] = []
-        for b in self._books:
-            row = {
-                "isbn": b.isbn,
-                "title": b.title,
-                "authors": b.authors,
-                "author": b.author,  # Stage 1 uyumluluğu için
-                "is_borrowed": b.is_borrowed,
-                "book_type": getattr(b, 'book_type', 'Physical'),
+        """Mevcut kitap listesini atomik bir snapshot olarak yazar (eski nesiller saklanır)."""
+        # list(...) anlık kopya alır; writer thread'i yazarken event loop kitap ekleyebilir
+        rows: list[dict[str, Any]] = [book_to_row(b) for b in list(self._index.values())]
+        write_snapshot(self._db_path, rows, self.snapshot_generations)
+
+    def _commit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        """
+        Her mutasyondan sonra çağrılır.
+        op: "add" (payload = satır), "remove" veya "patch" (payload = değişen alanlar).
+        Varsayılan davranış tüm dosyayı yeniden yazmaktır; alt sınıflar daha ucuz
+        kalıcılık (journal, SQLite) için bunu ezer.
+        """
+        self.save_books()
+
+    def _commit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        """
+        Birden fazla değişikliği tek seferde kalıcılaştırır (toplu içe aktarma).
+        Varsayılan: dosyayı bir kez yeniden yazar; backend'ler tek fsync / tek
+        transaction için ezer.
+        """
+        if changes:
+            self.save_books()
+
+    @contextmanager
+    def _mutation(self) -> Iterator[None]:
+        """
+        Bir mutasyonun bellek içi uygulanması ve commit'i (ya da writer thread'ine
+        sıraya konması) bu blok içinde yapılır. Blok _lock'u tutar: "ödünçte mi?"
+        kontrolü ile ödünç verme arasına başka bir thread giremez ve commit sırası
+        bellekteki değişiklik sırasıyla aynıdır. Asenkron yollar yazımın bitmesini
+        bloktan çıktıktan sonra bekler. Çok süreçli backend'ler (bkz. shared_library.py)
+        burada süreçler arası kilidi de alır ve önce diğer süreçlerin değişikliklerini uygular.
+        """
+        with self._lock:
+            yield
+
+    def _run_commit(self, commit: Callable[..., None], *args: Any) -> None:
+        """
+        Senkron yolların commit'i (_mutation içinde çağrılır). Writer thread'inde bekleyen
+        asenkron commit'ler olabileceği için o varsa işi onun sırasına koyup bekler.
+        """
+        if self._writer is None:
+            commit(*args)
+        else:
+            self._writer.submit(commit, *args).result()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Bellek içi indeksleri değiştiren blok. _writes blok boyunca tektir; kilitsiz
+        okuyan taraf sayacın okuma boyunca değişip değişmediğine bakar (seqlock).
+        """
+        with self._memory_lock:
+            if self._writes % 2:  # iç içe blok: sayaç dıştaki blokta
+                yield
+                return
+            self._writes += 1
+            try:
+                yield
+            finally:
+                self._writes += 1
+
+    def _read(self, read: Callable[[], T]) -> T:
+        """
+        Birden fazla indekse bakan okumayı kilit almadan yapar. Okuma sırasında bir yazım
+        başladıysa ya da bittiyse sonuç atılıp yeniden okunur (yarım bir değişikliğin
+        yol açtığı KeyError vb. de yeniden denenir); art arda çakışırsa kilit alınır.
+        """
+        for _ in range(READ_ATTEMPTS):
+            start = self._writes
+            if not start % 2:
+                try:
+                    result = read()
+                except (KeyError, IndexError, RuntimeError):
+                    if self._writes == start:
+                        raise
+                    continue
+                if self._writes == start:
+                    return result
+            time.sleep(0)  # yazan thread'e sıra ver
+        with self._memory_lock:
+            return read()
+
+    def refresh(self) -> bool:
+        """Başka süreçlerin yaptığı değişiklikleri uygular; bir şey değiştiyse True."""
+        return False
+
+    def _apply_change(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        """Kaydedilmiş bir değişikliği (ör. journal kaydı) kalıcılığa dokunmadan uygular."""
+        if op == "add":
+            self._insert(book_from_row(payload or {}))
+        elif op == "remove":
+            self._delete(isbn)
+        elif op == "patch":
+            book = self._index.get(isbn)
+            if book is not None:
+                self._patch(book, payload or {})
+
+    # ---------- Bellek içi indeksler ----------
+    def _reset_index(self, books: Iterable[Book] = ()) -> None:
+        """Tüm indeksleri verilen kitaplardan baştan kurar (aynı ISBN'de ilk gelen kazanır)."""
+        # Önce yerel sözlüğe kurulur: akış yarıda hata verirse mevcut indeks bozulmaz
+        index: dict[str, Book] = {}
+        for book in books:
+            index.setdefault(book.isbn, book)
+        with self._writing():
+            self._index = index
+            self._sorted = {
+                sort: sorted((sort_key(b, sort), b.isbn) for b in self._index.values())
+                for sort in SORT_KEYS
             }
-            
-            # Optional fields - sadece varsa ekle
-            if hasattr(b, 'shelf_location') and b.shelf_location:
-                row["shelf_location"] = b.shelf_location
-            if hasattr(b, 'file_size_mb') and b.file_size_mb:
-                row["file_size_mb"] = b.file_size_mb
-            if hasattr(b, 'file_format') and b.file_format:
-                row["file_format"] = b.file_format
-            if hasattr(b, 'duration_minutes') and b.duration_minutes:
-                row["duration_minutes"] = b.duration_minutes
-            if hasattr(b, 'narrator') and b.narrator:
-                row["narrator"] = b.narrator
-                
-            rows.append(row)
-            
-        self._db_path.write_text(
-            json.dumps(rows, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+            self._order = InsertionOrder(self._index)
+            self._search.rebuild(self._index.values())
+            self._counters = CatalogCounters(self._index.values())
+            self.fragments.clear()
+            self._rebuild_columns()
+            self._touch_all()
+
+    def _touch_all(self) -> None:
+        """Katalog baştan yüklendi: tüm kitapların sürümü yeni katalog sürümü olur."""
+        self.catalog_version += 1
+        self._base_version = self.catalog_version
+        self._book_versions = {}
+        self.changes.reset(self.catalog_version)
+
+    def _touch(self, isbn: str, op: str) -> None:
+        self.catalog_version += 1
+        self._book_versions[isbn] = self.catalog_version
+        self.changes.record(self.catalog_version, op, isbn)
+
+    def book_version(self, isbn: str) -> Optional[int]:
+        """Kitabın son değiştiği katalog sürümü; kitap yoksa None."""
+        if isbn not in self._index:
+            return None
+        return self._book_versions.get(isbn, self._base_version)
+
+    def enable_columnar(self) -> None:
+        """
+        Filtreler için numpy sütun deposunu (columnar.BookStore) açar.
+        Depo her mutasyonda güncellenir; ekleme sıralı filtreli query_books vektörel
+        maskeyle çalışır. Sayımlar her modda CatalogCounters'tan okunur.
+        """
+        from stage3_fastapi.columnar import BookStore  # numpy yalnızca bu modda gerekir
+        with self._writing():
+            self._columns = BookStore()
+            self._rebuild_columns()
+
+    def _rebuild_columns(self) -> None:
+        if self._columns is not None:
+            self._columns = type(self._columns)(self._index.values())
+
+    def _insert(self, book: Book) -> bool:
+        """Kitabı indekslere ekler; ISBN zaten varsa False döner."""
+        with self._writing():
+            if book.isbn in self._index:
+                return False
+            self._index[book.isbn] = book
+            self.fragments.invalidate(book.isbn)
+            self._touch(book.isbn, "add")
+            for sort, entries in self._sorted.items():
+                insort(entries, (sort_key(book, sort), book.isbn))
+            if self._order is not None:
+                self._order.add(book.isbn)
+            self._search.add(book)
+            if self._counters is not None:
+                self._counters.add(book)
+            if self._columns is not None:
+                self._columns.add(book)
+            return True
+
+    def _delete(self, isbn: str) -> Optional[Book]:
+        """Kitabı indekslerden çıkarır ve döndürür."""
+        with self._writing():
+            book = self._index.pop(isbn, None)
+            if book is not None:
+                for sort, entries in self._sorted.items():
+                    self._discard_entry(entries, (sort_key(book, sort), isbn))
+                if self._order is not None:
+                    self._order.remove(isbn)
+                self._search.remove(isbn)
+                self.fragments.invalidate(isbn)
+                self._touch(isbn, "remove")
+                del self._book_versions[isbn]
+                if self._counters is not None:
+                    self._counters.remove(book)
+                if self._columns is not None:
+                    self._columns.remove(isbn)
+            return book
+
+    def _patch(self, book: Book, fields: dict[str, Any]) -> dict[str, Any]:
+        """
+        Alanları günceller, etkilenen sıralı indeksleri düzeltir; değişen alanları döndürür.
+        Kitap yerinde değiştirilmez: alanlar bir kopyaya yazılır ve kopya indekste eskisinin
+        yerini alır. Kilitsiz okuyan (ya da dosyaya yazan) taraf kitabın ya eski ya yeni
+        halini görür, yarım güncellenmişini değil. Güncel nesne self._index[isbn]'dir.
+        """
+        changed = {field: value for field, value in fields.items() if hasattr(book, field)}
+        if not changed:
+            return changed
+        with self._writing():
+            # Yalnızca kurulmuş sıralı indeksler düzeltilir (tembel backend'lerde henüz olmayabilir)
+            resort = [sort for sort in self._sorted if SORT_FIELDS[sort] & changed.keys()]
+            for sort in resort:
+                self._discard_entry(self._sorted[sort], (sort_key(book, sort), book.isbn))
+            updated = copy.copy(book)
+            for field, value in changed.items():
+                setattr(updated, field, value)
+            if self._counters is not None and not COUNTED_FIELDS.isdisjoint(changed):
+                self._counters.remove(book)
+                self._counters.add(updated)
+            self._index[book.isbn] = updated
+            self.fragments.invalidate(book.isbn)
+            self._touch(book.isbn, "update")
+            for sort in resort:
+                insort(self._sorted[sort], (sort_key(updated, sort), book.isbn))
+            if SEARCH_FIELDS & changed.keys():
+                self._search.add(updated)
+            if self._columns is not None and not COLUMN_FIELDS.isdisjoint(changed):
+                self._columns.update(updated)
+        return changed
+
+    @staticmethod
+    def _discard_entry(entries: list[tuple[str, str]], entry: tuple[str, str]) -> None:
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
 
     # ---------- API İşlemleri ----------
     def fetch_book_from_api(self, isbn: str) -> Optional[Book]:
-        """Open Library API'sinden ISBN ile kitap bilgilerini çeker."""
-        try:
-            # ISBN ile kitap bilgilerini çek
-            response = httpx.get(f"https://openlibrary.org/isbn/{isbn}.json", timeout=10.0, follow_redirects=True)
-            
-            if response.status_code == 404:
-                return None
-                
-            response.raise_for_status()
-            
-            try:
-                data = response.json()
-            except (ValueError, Exception):
-                # JSON parsing hatası
-                return None
-            
-            title = data.get("title")
-            if not title:
-                return None
-            
-            # Yazar bilgilerini çek
-            authors: List[str] = []
-            if data.get("authors"):
-                for author_ref in data["authors"]:
-                    if isinstance(author_ref, dict) and author_ref.get("key"):
-                        try:
-                            author_response = httpx.get(f"https://openlibrary.org{author_ref['key']}.json", timeout=10.0, follow_redirects=True)
-                            author_response.raise_for_status()
-                            author_data = author_response.json()
-                            if author_data.get("name"):
-                                authors.append(author_data["name"])
-                        except (httpx.HTTPError, httpx.RequestError, ValueError, Exception):
-                            # Yazar bilgisi çekilemezse atla
-                            continue
-            
-            # Eğer yazar bulunamazsa by_statement'ı kullan
-            if not authors and data.get("by_statement"):
-                authors = [data["by_statement"]]
-            
-            return Book(isbn=isbn, title=title, authors=authors)
-            
-        except httpx.RequestError:
-            # Ağ hatası
-            return None
-        except httpx.HTTPStatusError:
-            # HTTP hatası
-            return None
-        except Exception:
-            # Diğer beklenmeyen hatalar
-            return None
+        """Open Library API'sinden ISBN ile kitap bilgilerini çeker (havuzlu istemci, yazarlar paralel)."""
+        return self.openlibrary.fetch_book_sync(isbn)
+
+    def fetch_books_from_api(self, isbns: list[str]) -> dict[str, Optional[Book]]:
+        """Birden fazla ISBN'i Open Library toplu Books API'si ile çeker ({isbn: Book | None})."""
+        return self.openlibrary.fetch_books_sync(isbns)
 
     # ---------- Operasyonlar ----------
+    @staticmethod
+    def _apply_type_fields(book: Book, book_type: str, extra_fields: dict[str, Any]) -> None:
+        # Book type'ı ve extra fields'i ayarla
+        book.book_type = book_type
+        for field, value in extra_fields.items():
+            if hasattr(book, field):
+                setattr(book, field, value)
+
     def add_book_by_isbn(self, isbn: str, book_type: str = "Physical", **extra_fields) -> Optional[Book]:
         """ISBN ile kitap ekler - API'den bilgileri çeker (Stage 2 özelliği)."""
         # Kitap zaten var mı kontrol et
-        if any(b.isbn == isbn for b in self._books):
+        if isbn in self._index:
             print("Book with this ISBN already exists.")
             return None
         
@@ -166,16 +448,12 @@ class Library:
             print("Book not found.")
             return None
         
-        # Book type'ı ayarla
-        book.book_type = book_type
-        
-        # Extra fields'i ayarla
-        for field, value in extra_fields.items():
-            if hasattr(book, field):
-                setattr(book, field, value)
-        
-        self._books.append(book)
-        self.save_books()
+        self._apply_type_fields(book, book_type, extra_fields)
+        with self._mutation():
+            if not self._insert(book):
+                print("Book with this ISBN already exists.")
+                return None
+            self._run_commit(self._commit, "add", book.isbn, book_to_row(book))
         print(f"Book added: {book}")
         return book
 
@@ -191,28 +469,396 @@ class Library:
         else:
             # Stage 1: Book object
             book = book_or_isbn
-            if any(b.isbn == book.isbn for b in self._books):
-                return False
-            self._books.append(book)
-            self.save_books()
+            with self._mutation():
+                if not self._insert(book):
+                    return False
+                self._run_commit(self._commit, "add", book.isbn, book_to_row(book))
             return True
 
+    def add_books_by_isbn(self, isbns: list[str], book_type: str = "Physical") -> list[Book]:
+        """Birden fazla ISBN'i toplu API ile çözüp tek commit ile ekler; eklenenleri döndürür."""
+        new_isbns = [isbn for isbn in dict.fromkeys(isbns) if isbn not in self._index]
+        added: list[Book] = []
+        fetched = self.fetch_books_from_api(new_isbns)
+        with self._mutation():
+            for isbn, book in fetched.items():
+                if book is None:
+                    print(f"Book not found: {isbn}")
+                    continue
+                self._apply_type_fields(book, book_type, {})
+                if self._insert(book):
+                    added.append(book)
+            self._run_commit(self._commit_many, [("add", b.isbn, book_to_row(b)) for b in added])
+        return added
+
     def remove_book(self, isbn: str) -> bool:
         """ISBN'e göre kitabı siler ve dosyayı günceller."""
-        for i, b in enumerate(self._books):
-            if b.isbn == isbn:
-                self._books.pop(i)
-                self.save_books()
-                return True
-        return False
+        with self._mutation():
+            if self._delete(isbn) is None:
+                return False
+            self._run_commit(self._commit, "remove", isbn)
+        return True
+
+    def _update_in_memory(self, isbn: str, fields: dict[str, Any]) -> tuple[Optional[Book], dict[str, Any]]:
+        book = self._index.get(isbn)
+        if book is None:
+            return None, {}
+        fields.pop("isbn", None)  # ISBN indeks anahtarıdır, değiştirilemez
+        changed = self._patch(book, fields)
+        return self._index[isbn], changed
+
+    def update_book(self, isbn: str, **fields: Any) -> Optional[Book]:
+        """Kitabın verilen alanlarını günceller ve dosyayı kaydeder (ISBN değişmez)."""
+        with self._mutation():
+            book, changed = self._update_in_memory(isbn, fields)
+            if book is not None:
+                self._run_commit(self._commit, "patch", isbn, changed)
+        return book
+
+    def _set_borrowed(self, isbn: str, borrowed: bool) -> Optional[Book]:
+        book = self._index.get(isbn)
+        if book is None:
+            return None
+        if book.is_borrowed == borrowed:
+            # Book.borrow_book / return_book ile aynı ValueError mesajları
+            (book.borrow_book if borrowed else book.return_book)()
+        self._patch(book, {"is_borrowed": borrowed})
+        return self._index[isbn]
+
+    def borrow_book(self, isbn: str) -> Optional[Book]:
+        """Kitabı ödünç verir; zaten ödünçteyse ValueError fırlatır."""
+        with self._mutation():
+            book = self._set_borrowed(isbn, True)
+            if book is not None:
+                self._run_commit(self._commit, "patch", isbn, {"is_borrowed": True})
+        return book
 
+    def return_book(self, isbn: str) -> Optional[Book]:
+        """Kitabı iade alır; ödünçte değilse ValueError fırlatır."""
+        with self._mutation():
+            book = self._set_borrowed(isbn, False)
+            if book is not None:
+                self._run_commit(self._commit, "patch", isbn, {"is_borrowed": False})
+        return book
+
+    # ---------- Asenkron API (FastAPI handler'ları için) ----------
+    # Bellek içi değişiklik event loop'ta yapılır (hızlı); dosya/DB yazımı tek bir
+    # writer thread'ine, Open Library çağrıları AsyncClient'a devredilir. Böylece
+    # yavaş bir ekleme sürerken okuma istekleri beklemez. Commit _mutation bloğu
+    # içinde sıraya konur, bloktan çıktıktan sonra beklenir (kilit await boyunca tutulmaz).
+    def _writer_executor(self) -> ThreadPoolExecutor:
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="library-writer")
+        return self._writer
+
+    def _acommit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> Awaitable[None]:
+        """
+        _commit'i writer thread'inde çalıştırır; iş çağrı anında sıraya konur (dönen
+        future sonra beklenir). Tek thread olduğu için yazım sırası korunur.
+        """
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._writer_executor(), self._commit, op, isbn, payload)
+
+    def _acommit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> Awaitable[None]:
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._writer_executor(), self._commit_many, changes)
+
+    async def _amutate(self, apply: Callable[[], T]) -> T:
+        """
+        Asenkron yolların _mutation bloğu: apply() blok içinde çalışır ve commit'i sıraya
+        koyup döndürür (beklemek çağıranın işidir). Bellek içi değişiklik hızlı olduğu için
+        varsayılan event loop'ta çalıştırmaktır; kilidi beklemesi gerekebilen backend'ler
+        (bkz. shared_library.py) bloğu bir thread'e taşır.
+        """
+        with self._mutation():
+            return apply()
+
+    async def afetch_book_from_api(self, isbn: str) -> Optional[Book]:
+        """fetch_book_from_api'nin event loop'u bloklamayan karşılığı."""
+        return await self.openlibrary.fetch_book(isbn)
+
+    async def afetch_books_from_api(self, isbns: list[str], concurrency: int = 8,
+                                    semaphore: Optional[asyncio.Semaphore] = None,
+                                    return_exceptions: bool = False) -> dict[str, Any]:
+        """fetch_books_from_api'nin asenkron karşılığı (parametreler için bkz. OpenLibraryClient.fetch_books)."""
+        return await self.openlibrary.fetch_books(isbns, concurrency=concurrency, semaphore=semaphore,
+                                                  return_exceptions=return_exceptions)
+
+    async def aadd_book_by_isbn(self, isbn: str, book_type: str = "Physical", **extra_fields) -> Optional[Book]:
+        """
+        add_book_by_isbn'in asenkron karşılığı.
+        Aynı ISBN için eşzamanlı çağrılar sıraya girer: ilki çeker ve yazar, sonrakiler
+        onun commit'i bittikten sonra "zaten var" görür (tek upstream istek, tek yazım).
+        """
+        async with self._adding.hold(isbn):
+            if isbn in self._index:
+                print("Book with this ISBN already exists.")
+                return None
+
+            book = await self.afetch_book_from_api(isbn)
+            if book is None:
+                print("Book not found.")
+                return None
+
+            self._apply_type_fields(book, book_type, extra_fields)
+            # Fetch beklenirken aynı ISBN başka bir yoldan (ör. manuel/toplu) eklenmiş olabilir
+            if not await self._ainsert(book):
+                print("Book with this ISBN already exists.")
+                return None
+        print(f"Book added: {book}")
+        return book
+
+    async def aadd_book(self, book: Book) -> bool:
+        async with self._adding.hold(book.isbn):
+            return await self._ainsert(book)
+
+    async def _ainsert(self, book: Book) -> bool:
+        """Kitabı ekler ve commit'ini bekler; ISBN zaten varsa False."""
+        def apply() -> Optional[Awaitable[None]]:
+            if not self._insert(book):
+                return None
+            return self._acommit("add", book.isbn, book_to_row(book))
+
+        commit = await self._amutate(apply)
+        if commit is None:
+            return False
+        await commit
+        return True
+
+    async def aremove_book(self, isbn: str) -> bool:
+        def apply() -> Optional[Awaitable[None]]:
+            if self._delete(isbn) is None:
+                return None
+            return self._acommit("remove", isbn)
+
+        commit = await self._amutate(apply)
+        if commit is None:
+            return False
+        await commit
+        return True
+
+    async def _apatch(self, isbn: str, update: Callable[[], tuple[Optional[Book], dict[str, Any]]],
+                      precondition: Optional[Callable[[int], bool]] = None) -> Optional[Book]:
+        """
+        update() ile kitabı bellekte değiştirir ve değişen alanları commit eder.
+        precondition verilirse kitabın güncel sürümüyle mutasyon bloğu içinde çağrılır
+        (paylaşılan backend'de diğer worker'ların değişiklikleri uygulandıktan sonra);
+        False dönerse VersionConflictError fırlatılır ve hiçbir şey değişmez.
+        """
+        def apply() -> tuple[Optional[Book], Optional[Awaitable[None]]]:
+            version = self.book_version(isbn)
+            if precondition is not None and version is not None and not precondition(version):
+                raise VersionConflictError(f"Book with ISBN {isbn} has been modified")
+            book, changed = update()
+            if book is None:
+                return None, None
+            return book, self._acommit("patch", isbn, changed)
+
+        book, commit = await self._amutate(apply)
+        if commit is not None:
+            await commit
+        return book
+
+    async def aupdate_book(self, isbn: str, precondition: Optional[Callable[[int], bool]] = None,
+                           **fields: Any) -> Optional[Book]:
+        return await self._apatch(isbn, lambda: self._update_in_memory(isbn, fields), precondition)
+
+    async def aborrow_book(self, isbn: str,
+                           precondition: Optional[Callable[[int], bool]] = None) -> Optional[Book]:
+        return await self._apatch(isbn, lambda: (self._set_borrowed(isbn, True), {"is_borrowed": True}),
+                                  precondition)
+
+    async def areturn_book(self, isbn: str,
+                           precondition: Optional[Callable[[int], bool]] = None) -> Optional[Book]:
+        return await self._apatch(isbn, lambda: (self._set_borrowed(isbn, False), {"is_borrowed": False}),
+                                  precondition)
+
+    async def aimport_isbns(self, items: list[tuple[str, str, dict[str, Any]]],
+                            concurrency: int = 8,
+                            batch_size: int = BATCH_SIZE) -> AsyncIterator[dict[str, Any]]:
+        """
+        Toplu ISBN içe aktarma: (isbn, book_type, extra_fields) listesini `batch_size`'lık
+        parçalar halinde toplu Books API ile çözer ve her öğenin sonucunu parçası
+        tamamlandıkça üretir: {"isbn", "status": added|exists|not_found|error, "book"?}.
+        Tüm içe aktarma tek bir `concurrency` bütçesini paylaşır: toplu ve tekil (yedek)
+        istekler dahil en fazla `concurrency` upstream istek aynı anda uçuştadır.
+        Bulunamayan ISBN "not_found", çekilemeyen (ağ hatası, zaman aşımı, açık devre)
+        ISBN "error" olur.
+        Her parçanın kitapları eklendikleri _mutation bloğunda tek bir toplu commit'e
+        sıraya konur ve parçanın sonuçları bu yazım bittikten sonra üretilir: "added"
+        dönen kitap kalıcıdır, araya giren mutasyonlarla yazım sırası karışmaz. Bir
+        parça hata verirse o parçanın öğeleri "error" olarak döner; akış her durumda
+        her öğe için bir sonuçla biter.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        seen: set[str] = set()
+        pending: list[tuple[str, str, dict[str, Any]]] = []
+        for item in items:
+            isbn = item[0]
+            if isbn in seen or isbn in self._index:
+                results.put_nowait({"isbn": isbn, "status": "exists"})
+            else:
+                seen.add(isbn)
+                pending.append(item)
+        for i in range(0, len(pending), batch_size):
+            queue.put_nowait(pending[i:i + batch_size])
+        budget = asyncio.Semaphore(max(concurrency, 1))  # tüm parçaların ortak istek bütçesi
+
+        async def import_chunk(chunk: list[tuple[str, str, dict[str, Any]]]) -> list[dict[str, Any]]:
+            fetched = await self.afetch_books_from_api([isbn for isbn, _, _ in chunk], concurrency,
+                                                       semaphore=budget, return_exceptions=True)
+            outcome = []
+            added: list[Book] = []
+
+            def apply() -> Awaitable[None]:
+                for isbn, book_type, extra_fields in chunk:
+                    book = fetched.get(isbn)
+                    if book is None:
+                        outcome.append({"isbn": isbn, "status": "not_found"})
+                        continue
+                    if isinstance(book, Exception):
+                        outcome.append({"isbn": isbn, "status": "error", "error": str(book)})
+                        continue
+                    self._apply_type_fields(book, book_type, extra_fields)
+                    if not self._insert(book):
+                        outcome.append({"isbn": isbn, "status": "exists"})
+                        continue
+                    added.append(book)
+                    outcome.append({"isbn": isbn, "status": "added", "book": book})
+                return self._acommit_many([("add", b.isbn, book_to_row(b)) for b in added])
+
+            await (await self._amutate(apply))
+            return outcome
+
+        async def worker() -> None:
+            while True:
+                try:
+                    chunk = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    outcome = await import_chunk(chunk)
+                except Exception as e:
+                    logger.error(f"Bulk import chunk failed: {e}")
+                    outcome = [{"isbn": isbn, "status": "error", "error": str(e)} for isbn, _, _ in chunk]
+                for result in outcome:
+                    await results.put(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(max(concurrency, 1), queue.qsize()))]
+        try:
+            for _ in range(len(items)):
+                yield await results.get()
+        finally:
+            # Tüketici erken bıraktıysa kalan parçalar işlenmez; sıraya konmuş commit'ler yine yazılır
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """HTTP istemcisini kapatır ve bekleyen yazımların bitmesini bekler."""
+        await self.openlibrary.aclose()
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            await asyncio.to_thread(writer.shutdown, wait=True)
+
+    # ---------- Okuma ----------
+    # list_books ve find_book kilit almaz: tek bir sözlük okumasıdır ve kitaplar yerinde
+    # değiştirilmediği için dönen nesne tutarlıdır. Birden fazla indekse bakan okumalar
+    # optimistic_read ile yazımla çakışırsa yeniden yapılır.
     def list_books(self) -> Iterable[Book]:
         """Tüm kitapları listeler."""
-        return list(self._books)
+        return list(self._index.values())
 
     def find_book(self, isbn: str) -> Optional[Book]:
         """ISBN ile belirli kitabı döndürür."""
-        for b in self._books:
-            if b.isbn == isbn:
-                return b
-        return None
+        return self._index.get(isbn)
+
+    @optimistic_read
+    def query_books(self, sort: Optional[str] = None, descending: bool = False,
+                    after: Optional[tuple[Any, str]] = None, offset: int = 0,
+                    limit: Optional[int] = None, book_type: Optional[str] = None,
+                    is_borrowed: Optional[bool] = None) -> list[Book]:
+        """
+        Sayfalı / sıralı listeleme.
+        sort None ise ekleme sırası kullanılır; aksi halde sıralı indeksten okunur.
+        after: önceki sayfanın son kitabının order_key'i ve ISBN'i (cursor); offset'ten
+        önce uygulanır. Ekleme sırası cursor'ı başka bir yüklemeden geliyorsa
+        StaleCursorError fırlatılır. Filtresiz sayfa sıralı listeden dilimlenir (O(log n + sayfa));
+        filtre varsa maliyet atlanan + döndürülen kayıt sayısına bağlıdır.
+        """
+        filtered = book_type is not None or is_borrowed is not None
+        if self._columns is not None and sort is None and after is None and filtered:
+            # Filtre sütun deposunda maskeyle uygulanır; satırlar numpy'de dilimlenir ve
+            # yalnızca sayfadaki kitaplar okunur
+            mask = self._columns.mask(book_type, is_borrowed)
+            return [self._index[isbn] for isbn in self._columns.isbns(mask, descending, offset, limit)]
+        positions, isbn_at = self._ordered_positions(sort, descending, after)
+        if not filtered:
+            end = None if limit is None else offset + limit
+            return [self._index[isbn_at(i)] for i in positions[offset:end]]
+        books = (self._index[isbn_at(i)] for i in positions)
+        books = (b for b in books
+                 if (book_type is None or b.book_type == book_type)
+                 and (is_borrowed is None or b.is_borrowed == is_borrowed))
+        stop = None if limit is None else offset + limit
+        return list(islice(books, offset, stop))
+
+    def order_key(self, book: Book, sort: Optional[str]) -> Any:
+        """Kitabın listeleme sırasındaki anahtarı (cursor'a yazılır; bkz. query_books after)."""
+        if sort is None:
+            return self._ensure_order().key(book.isbn)
+        return sort_key(book, sort)
+
+    @optimistic_read
+    def search_books(self, query: str, book_type: Optional[str] = None,
+                     offset: int = 0, limit: Optional[int] = None) -> tuple[list[Book], int]:
+        """
+        Başlık, yazar ve ISBN üzerinde önek araması (ters indeks üzerinden).
+        Sonuçlar alaka skoruna göre sıralanır; (sayfa, toplam eşleşme) döner.
+        """
+        accept = None
+        if book_type is not None:
+            accept = lambda isbn: self._index[isbn].book_type == book_type
+        hits = self._search.search(query, accept)
+        end = None if limit is None else offset + limit
+        return [self._index[isbn] for _, isbn in hits[offset:end]], len(hits)
+
+    @optimistic_read
+    def count_books(self, book_type: Optional[str] = None, is_borrowed: Optional[bool] = None) -> int:
+        """Filtreye uyan kitap sayısı (artımlı sayaçlardan, katalog taranmaz)."""
+        return self._get_counters().count(book_type, is_borrowed)
+
+    def _get_counters(self) -> CatalogCounters:
+        """Sayaçlar; tembel yüklenen backend'ler ilk ihtiyaçta kurmak için ezer."""
+        return self._counters
+
+    @optimistic_read
+    def book_counts(self) -> dict[str, Any]:
+        """
+        İstatistikler: toplam, ödünçteki, kitap tipine / rafa / formata göre sayılar.
+        Her mutasyonda güncellenen sayaçlardan okunur (O(1), liste kopyası yok).
+        """
+        return self._get_counters().snapshot()
+
+    def _ensure_order(self) -> InsertionOrder:
+        """Ekleme sırası indeksi; tembel yüklenen backend'ler ilk ihtiyaçta kurmak için ezer."""
+        return self._order
+
+    def _ordered_positions(self, sort: Optional[str], descending: bool,
+                           after: Optional[tuple[Any, str]]) -> tuple[range, Callable[[int], str]]:
+        """İstenen sırada gezilecek konumlar ve konumdan ISBN okuyan fonksiyon."""
+        if sort is None:
+            order = self._ensure_order()
+            seq = None if after is None else order.resume(*after)
+            return order.positions(descending, seq), order.isbn_at
+        if sort not in self._sorted:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        entries = self._sorted[sort]
+        if descending:
+            end = bisect_left(entries, after) if after is not None else len(entries)
+            positions = range(end - 1, -1, -1)
+        else:
+            start = bisect_right(entries, after) if after is not None else 0
+            positions = range(start, len(entries))
+        return positions, lambda i: entries[i][1]
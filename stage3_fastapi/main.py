@@ -33,6 +33,18 @@ def add_flow_api(lib: Library) -> None:
         print(f"Book successfully added: {book}")
     # Error messages are already printed by lib.add_book
 
+def add_flow_bulk(lib: Library) -> None:
+    """Several ISBNs at once via the Open Library batch API (one save at the end)."""
+    raw = prompt("ISBNs (comma or space separated): ")
+    isbns = [part for part in raw.replace(",", " ").split() if part]
+    if not isbns:
+        print("No ISBNs given.")
+        return
+    added = lib.add_books_by_isbn(isbns)
+    for book in added:
+        print(f"Added: {book}")
+    print(f"{len(added)} of {len(isbns)} book(s) added.")
+
 def remove_flow(lib: Library) -> None:
     isbn = prompt("ISBN to remove: ")
     ok = lib.remove_book(isbn)
@@ -61,6 +73,7 @@ def main() -> None:
 [3] Remove
 [4] List
 [5] Find by ISBN
+[6] Add several books by ISBN (batch API)
 [0] Exit
 """
     while True:
@@ -71,6 +84,7 @@ def main() -> None:
         elif c == "3": remove_flow(lib)
         elif c == "4": list_flow(lib)
         elif c == "5": search_flow(lib)
+        elif c == "6": add_flow_bulk(lib)
         elif c == "0": break
         else: print("Invalid.")
 
@@ -0,0 +1,240 @@
+"""
+Open Library yanıtları için iki katmanlı metadata önbelleği.
+
+    1. Bellek içi LRU (OrderedDict) -> süreç içinde tekrar eden istekler
+    2. (İsteğe bağlı) SQLite dosyası  -> yeniden başlatmalar arasında kalıcı;
+       değerler zlib ile sıkıştırılmış JSON olarak saklanır
+
+Anahtarlar Open Library yollarıdır: "/isbn/<isbn>" (edition kaydı) ve
+"/authors/OL…A" (yazar kaydı). Her kayıt kendi TTL'i ile saklanır; yazar adları
+neredeyse hiç değişmediği için varsayılan TTL'leri çok uzundur. 404 yanıtları
+da (negatif önbellek) daha kısa bir TTL ile saklanır. Ağ / 5xx hataları saklanmaz.
+
+Disk katmanı `OPENLIBRARY_CACHE=/app/data/openlibrary-cache.db` ile açılır.
+Asenkron yollar (`aget` / `aput` / `amissing`) yalnızca bellek katmanına event
+loop'ta bakar; SQLite okuma / yazma / commit'leri `asyncio.to_thread` ile bir
+thread'de yapılır. Bellek ve disk ayrı kilitlerle korunur: disk I/O'su sürerken
+bellekten okuyan istekler beklemez.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+DAY = 24 * 60 * 60
+
+EDITION_TTL = 30 * DAY
+AUTHOR_TTL = 365 * DAY
+NEGATIVE_TTL = 1 * DAY
+
+# get() bulunamayan anahtar için MISSING, negatif kayıt için None döndürür
+MISSING: Any = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key        TEXT PRIMARY KEY,
+    value      BLOB,            -- zlib(JSON); negatif kayıtta NULL
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class MetadataCache:
+    def __init__(self, path: Optional[str | Path] = None, max_entries: int = 4096,
+                 edition_ttl: float = EDITION_TTL, author_ttl: float = AUTHOR_TTL,
+                 negative_ttl: float = NEGATIVE_TTL,
+                 clock: Callable[[], float] = time.time) -> None:
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.edition_ttl = edition_ttl
+        self.author_ttl = author_ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[Optional[dict], float]] = OrderedDict()
+        self._lock = threading.Lock()       # bellek katmanı ve sayaçlar
+        self._disk_lock = threading.Lock()  # SQLite bağlantısı
+        self._conn: Optional[sqlite3.Connection] = None
+        self.counters = {"hits": 0, "disk_hits": 0, "negative_hits": 0, "misses": 0,
+                         "stores": 0, "evictions": 0}
+
+    @classmethod
+    def from_env(cls, env=None) -> "MetadataCache":
+        """OPENLIBRARY_CACHE tanımlıysa disk katmanı o dosyada açılır; yoksa yalnızca bellek."""
+        env = os.environ if env is None else env
+        return cls(env.get("OPENLIBRARY_CACHE") or None)
+
+    # ---------- Disk katmanı ----------
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- Bellek katmanı ----------
+    def _remember(self, key: str, value: Optional[dict], expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def ttl_for(self, key: str, value: Optional[dict]) -> float:
+        if value is None:
+            return self.negative_ttl
+        return self.author_ttl if key.startswith("/authors/") else self.edition_ttl
+
+    # ---------- Public API ----------
+    def get(self, key: str) -> Any:
+        """Önbellekteki değeri döndürür: dict, negatif kayıt için None, yoksa MISSING."""
+        now = self._clock()
+        entry = self._memory_get(key, now)
+        if entry is not None:
+            return entry[0]
+        return self._disk_found(key, self._disk_get(key, now))
+
+    async def aget(self, key: str) -> Any:
+        """get'in asenkron karşılığı: bellekte yoksa disk katmanı bir thread'de okunur."""
+        now = self._clock()
+        entry = self._memory_get(key, now)
+        if entry is not None:
+            return entry[0]
+        if self.path is None:
+            return self._disk_found(key, None)
+        return self._disk_found(key, await asyncio.to_thread(self._disk_get, key, now))
+
+    def contains(self, key: str) -> bool:
+        """Anahtar için geçerli (pozitif ya da negatif) kayıt var mı; sayaçları etkilemez."""
+        now = self._clock()
+        return self._memory_has(key, now) or self._disk_get(key, now) is not None
+
+    async def amissing(self, keys: Iterable[str]) -> list[str]:
+        """Geçerli kaydı olmayan anahtarlar (girdi sırası); diske tek thread çağrısıyla bakılır."""
+        now = self._clock()
+        missing = [key for key in keys if not self._memory_has(key, now)]
+        if not missing or self.path is None:
+            return missing
+
+        def on_disk() -> list[str]:
+            return [key for key in missing if self._disk_get(key, now) is None]
+
+        return await asyncio.to_thread(on_disk)
+
+    def put(self, key: str, value: Optional[dict]) -> None:
+        """Değeri (404 için None) anahtarın TTL'i ile iki katmana da yazar."""
+        rows = self._memory_put([(key, value)])
+        if self.path is not None:
+            self._disk_put(rows)
+
+    async def aput(self, key: str, value: Optional[dict]) -> None:
+        """put'un asenkron karşılığı."""
+        await self.aput_many([(key, value)])
+
+    async def aput_many(self, items: Iterable[tuple[str, Optional[dict]]]) -> None:
+        """Birden fazla kaydı yazar; bellek hemen güncellenir, disk tek transaction'da (thread'de)."""
+        rows = self._memory_put(items)
+        if self.path is not None and rows:
+            await asyncio.to_thread(self._disk_put, rows)
+
+    # ---------- Katman yardımcıları ----------
+    def _count_hit(self, entry: tuple[Optional[dict], float]) -> None:
+        self.counters["hits"] += 1
+        if entry[0] is None:
+            self.counters["negative_hits"] += 1
+
+    def _memory_get(self, key: str, now: float) -> Optional[tuple[Optional[dict], float]]:
+        """Bellekteki geçerli kayıt (isabet sayılır); yoksa None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._memory[key]
+                return None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._count_hit(entry)
+            return entry
+
+    def _memory_has(self, key: str, now: float) -> bool:
+        with self._lock:
+            entry = self._memory.get(key)
+            return entry is not None and entry[1] > now
+
+    def _disk_found(self, key: str, entry: Optional[tuple[Optional[dict], float]]) -> Any:
+        """Disk katmanının sonucunu sayar ve bulunan kaydı belleğe alır."""
+        with self._lock:
+            if entry is None:
+                self.counters["misses"] += 1
+                return MISSING
+            self.counters["disk_hits"] += 1
+            self._remember(key, *entry)
+            self._count_hit(entry)
+            return entry[0]
+
+    def _memory_put(self, items: Iterable[tuple[str, Optional[dict]]]) -> list[tuple[str, Optional[bytes], float]]:
+        """Kayıtları belleğe yazar; diske yazılacak satırları döndürür."""
+        now = self._clock()
+        rows = []
+        with self._lock:
+            for key, value in items:
+                expires_at = now + self.ttl_for(key, value)
+                self._remember(key, value, expires_at)
+                self.counters["stores"] += 1
+                rows.append((key, value, expires_at))
+        if self.path is None:
+            return []
+        return [(key, None if value is None else zlib.compress(
+                    json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")), expires_at)
+                for key, value, expires_at in rows]
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple[Optional[dict], float]]:
+        with self._disk_lock:
+            conn = self._disk()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT value, expires_at FROM metadata WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            blob, expires_at = row
+            if expires_at <= now:
+                with conn:
+                    conn.execute("DELETE FROM metadata WHERE key = ?", (key,))
+                return None
+        value = None if blob is None else json.loads(zlib.decompress(blob))
+        return value, expires_at
+
+    def _disk_put(self, rows: list[tuple[str, Optional[bytes], float]]) -> None:
+        with self._disk_lock:
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO metadata (key, value, expires_at) VALUES (?, ?, ?)",
+                                     rows)
+
+    def stats(self) -> dict[str, Any]:
+        """Sayaçlar + katman boyutları (health/metrics için)."""
+        with self._lock:
+            stats: dict[str, Any] = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk"] = str(self.path) if self.path else None
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
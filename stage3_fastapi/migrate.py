@@ -0,0 +1,59 @@
+"""
+Mevcut library.json dosyalarını (stage1 / stage2 / stage3) SQLite veritabanına aktarır.
+
+Kullanım (kök dizinde):
+    python -m stage3_fastapi.migrate                      # varsayılan üç dosya -> stage3_fastapi/library.db
+    python -m stage3_fastapi.migrate --db data/library.db a.json b.json
+
+Aynı ISBN birden fazla dosyada varsa ilk görülen kazanır; tekrar çalıştırmak güvenlidir.
+"""
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from typing import Iterable
+
+from stage3_fastapi.library import book_from_row
+from stage3_fastapi.snapshot import load_snapshot
+from stage3_fastapi.sqlite_library import SQLiteLibrary
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SOURCES = [
+    ROOT / "stage1_oop" / "library.json",
+    ROOT / "stage2_api" / "library.json",
+    ROOT / "stage3_fastapi" / "library.json",
+]
+
+
+def migrate_json_files(db_path: Path, sources: Iterable[Path]) -> dict[str, int]:
+    """Her kaynak dosyadan kaç kitabın eklendiğini döndürür (bulunamayan dosyalar atlanır)."""
+    lib = SQLiteLibrary(str(Path(db_path).resolve()))
+    imported: dict[str, int] = {}
+    try:
+        for source in sources:
+            source = Path(source)
+            if not source.exists():
+                continue
+            # Düz JSON listesi ya da checksum'lı snapshot (geçerli en yeni nesil)
+            rows = load_snapshot(source)
+            imported[str(source)] = lib.import_books(book_from_row(row) for row in rows)
+    finally:
+        lib.close()
+    return imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import library.json files into SQLite")
+    parser.add_argument("sources", nargs="*", type=Path, help="JSON files (default: stage1/2/3 library.json)")
+    parser.add_argument("--db", type=Path, default=ROOT / "stage3_fastapi" / "library.db",
+                        help="Target SQLite database")
+    args = parser.parse_args()
+
+    results = migrate_json_files(args.db, args.sources or DEFAULT_SOURCES)
+    for source, count in results.items():
+        print(f"{source}: {count} book(s) imported")
+    print(f"Total: {sum(results.values())} -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
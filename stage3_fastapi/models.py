@@ -1,26 +1,87 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Union, Optional
+import sys
+import threading
+import weakref
+from typing import Any, List, Union, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
-@dataclass
+# Tipe özel opsiyonel alanlar (Book._extra içinde yalnızca dolu olanlar tutulur)
+EXTRA_FIELDS = ("shelf_location", "file_size_mb", "file_format", "duration_minutes", "narrator")
+
+class AuthorList:
+    """
+    Kitaplar arasında paylaşılan yazar listesi. Tuple'lar weakref desteklemediği için
+    interned tuple bu küçük sarmalayıcıda tutulur; tablo sarmalayıcıya zayıf referans
+    verir ve onu kullanan son kitap gidince kayıt kendiliğinden düşer.
+    """
+    __slots__ = ("names", "__weakref__")
+
+    def __init__(self, names: tuple[str, ...]) -> None:
+        self.names = names
+
+
+# Aynı yazar listesine sahip kitaplar tek bir AuthorList'i paylaşır. Tablo yalnızca canlı
+# listeleri tutar (kitap ekleyip silen uzun ömürlü süreçte birikmez); sarmalayıcı
+# API istekleri, senkron cephe loop'u ve to_thread mutasyonları gibi farklı thread'lerden
+# oluşturulabildiği için arama + ekleme kilit altındadır
+_AUTHOR_LISTS: "weakref.WeakValueDictionary[tuple[str, ...], AuthorList]" = weakref.WeakValueDictionary()
+_AUTHOR_LISTS_LOCK = threading.Lock()
+
+
+def intern_authors(authors: Union[str, List[str], tuple, None]) -> AuthorList:
+    """Yazar listesini interned string'lerden oluşan, paylaşılan bir AuthorList'e çevirir."""
+    if isinstance(authors, str):
+        authors = [authors]
+    key = tuple(sys.intern(a) if type(a) is str else a for a in (authors or ()))
+    with _AUTHOR_LISTS_LOCK:
+        shared = _AUTHOR_LISTS.get(key)
+        if shared is None:
+            shared = _AUTHOR_LISTS[key] = AuthorList(key)
+    return shared
+
+
+class _ExtraField:
+    """Book._extra içindeki (alan, değer, alan, değer, ...) düzlüğüne bakan özellik."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, book: Optional["Book"], owner: type) -> Any:
+        if book is None:
+            return self
+        extra = book._extra
+        for i in range(0, len(extra), 2):
+            if extra[i] == self.name:
+                return extra[i + 1]
+        return None
+
+    def __set__(self, book: "Book", value: Any) -> None:
+        extra = book._extra
+        pairs = [(extra[i], extra[i + 1]) for i in range(0, len(extra), 2) if extra[i] != self.name]
+        if value is not None:
+            pairs.append((self.name, sys.intern(value) if type(value) is str else value))
+        book._extra = tuple(item for pair in pairs for item in pair)
+
+
 class Book:
-    isbn: str  # benzersiz kimlik
-    title: str
-    authors: List[str]  # API'den gelen yazar listesi
-    is_borrowed: bool = False  # Stage 1'de şart değil ama dursun (ileriye dönük)
-    book_type: str = "Physical"  # Physical, Digital, Audio
-    
+    """
+    Bellek dostu kitap modeli: __dict__ yok (__slots__), yazarlar interned ve
+    kitaplar arasında paylaşılan bir AuthorList'te, tipe özel alanlar yalnızca doluysa
+    tek bir düz tuple'da (_extra) tutulur. Kurucu ve `author` özelliği önceki
+    dataclass ile aynıdır; `authors` her okunuşta yeni bir liste döndürür.
+    """
+    __slots__ = ("isbn", "title", "_authors", "is_borrowed", "book_type", "_extra")
+
     # Physical book fields
-    shelf_location: Optional[str] = None
-    
+    shelf_location = _ExtraField("shelf_location")
+
     # Digital book fields
-    file_size_mb: Optional[float] = None
-    file_format: Optional[str] = None
-    
+    file_size_mb = _ExtraField("file_size_mb")
+    file_format = _ExtraField("file_format")
+
     # Audio book fields
-    duration_minutes: Optional[int] = None
-    narrator: Optional[str] = None
+    duration_minutes = _ExtraField("duration_minutes")
+    narrator = _ExtraField("narrator")
 
     def __init__(self, isbn: str, title: str, authors: Union[str, List[str]], 
                  is_borrowed: bool = False, book_type: str = "Physical", **kwargs):
@@ -28,34 +89,59 @@ class Book:
         Stage 1 uyumluluğu için author (string) ve authors (list) destekler
         Enhanced with book types and additional fields
         """
-        self.isbn = isbn
+        self.isbn = isbn  # benzersiz kimlik
         self.title = title
         self.is_borrowed = is_borrowed
-        self.book_type = book_type
+        self.book_type = sys.intern(book_type) if type(book_type) is str else book_type
         
-        # Handle authors (backward compatibility)
-        if isinstance(authors, str):
-            # Stage 1 uyumluluğu: tek string author
-            self.authors = [authors]
-        else:
-            # Stage 2: authors listesi
-            self.authors = authors if authors else []
+        # Handle authors (backward compatibility): tek string author da kabul edilir
+        self._authors = intern_authors(authors)
         
-        # Set optional fields from kwargs
-        self.shelf_location = kwargs.get('shelf_location', None)
-        self.file_size_mb = kwargs.get('file_size_mb', None)
-        self.file_format = kwargs.get('file_format', None)
-        self.duration_minutes = kwargs.get('duration_minutes', None)
-        self.narrator = kwargs.get('narrator', None)
+        # Set optional fields from kwargs (yalnızca dolu olanlar saklanır)
+        self._extra: tuple = ()
+        for field in EXTRA_FIELDS:
+            value = kwargs.get(field)
+            if value is not None:
+                setattr(self, field, value)
+
+    @property
+    def authors(self) -> List[str]:
+        """API'den gelen yazar listesi (kopya; değiştirmek için yeni liste atayın)"""
+        return list(self._authors.names)
+
+    @authors.setter
+    def authors(self, authors: Union[str, List[str]]) -> None:
+        self._authors = intern_authors(authors)
 
     @property
     def author(self) -> str:
         """Stage 1 uyumluluğu için author property"""
-        return self.authors[0] if self.authors else "Unknown Author"
+        names = self._authors.names
+        return names[0] if names else "Unknown Author"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Tüm alanlar (eski dataclass'taki vars(book) karşılığı)."""
+        data = {"isbn": self.isbn, "title": self.title, "authors": list(self._authors.names),
+                "is_borrowed": self.is_borrowed, "book_type": self.book_type}
+        for field in EXTRA_FIELDS:
+            data[field] = getattr(self, field)
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None  # dataclass(eq=True) ile aynı: değiştirilebilir nesne
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"Book({fields})"
 
     def __str__(self) -> str:
         # "Ulysses by James Joyce (ISBN: 978-0199535675)" formatı
-        authors_str = ", ".join(self.authors) if self.authors else "Unknown Author"
+        names = self._authors.names
+        authors_str = ", ".join(names) if names else "Unknown Author"
         return f"{self.title} by {authors_str} (ISBN: {self.isbn})"
 
     def borrow_book(self) -> None:
@@ -0,0 +1,240 @@
+"""
+Open Library için asenkron istemci.
+
+FastAPI handler'ları event loop'u bloklamadan ISBN'den kitap bilgisi çekebilsin
+diye httpx.AsyncClient kullanır. Havuzlu istemci, aşamalı zaman aşımları, paralel
+yazar çözümü ve senkron cephe (`fetch_book_sync`, kalıcı arka plan loop'u) Stage 2
+istemcisinden gelir (bkz. stage2_api/openlibrary.py); bu modül onu genişletir.
+
+Birden fazla ISBN için `fetch_books` Open Library'nin toplu Books API'sini
+(`/api/books?bibkeys=ISBN:a,ISBN:b&jscmd=data&format=json`) kullanır: tek yanıtta
+başlık ve yazar adları gelir. Girdi `batch_size`'lık parçalara bölünür; toplu
+yanıtta olmayan ISBN'ler için tekil yola (edition + yazar) düşülür.
+
+Her upstream GET hız sınırından (token bucket) ve devre kesiciden geçer; geçici
+hatalar (ağ, zaman aşımı, 429/502/503/504) jitter'lı üstel geri çekilmeyle yeniden
+denenir. Devre açıkken çağrılar beklemeden düşer (bkz. resilience.py).
+`OPENLIBRARY_RATE_LIMIT` saniyedeki istek sayısını ayarlar (0: sınırsız).
+
+Tüm GET'ler `MetadataCache` (bellek LRU + isteğe bağlı SQLite) üzerinden geçer;
+bkz. metadata_cache.py.
+"""
+
+from __future__ import annotations
+import asyncio
+import os
+import re
+from typing import Any, Optional
+
+import httpx
+
+from stage2_api.openlibrary import DEFAULT_LIMITS
+from stage2_api.openlibrary import OpenLibraryClient as BaseOpenLibraryClient
+from stage3_fastapi.metadata_cache import MISSING, MetadataCache
+from stage3_fastapi.models import Book
+from stage3_fastapi.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, TokenBucket
+from stage3_fastapi.singleflight import SingleFlight
+
+# OPENLIBRARY_URL ile farklı bir sunucuya (ör. testlerde yerel stub) yönlendirilebilir
+OPEN_LIBRARY_URL = os.environ.get("OPENLIBRARY_URL", "https://openlibrary.org")
+
+# İstemci taraflı hız sınırı (istek/sn); ani yük için iki katı kadar token birikebilir
+DEFAULT_RATE_LIMIT = float(os.environ.get("OPENLIBRARY_RATE_LIMIT", "5"))
+
+# Toplu Books API'de tek istekte sorgulanan ISBN sayısı (URL uzunluğu sınırı için)
+BATCH_SIZE = 50
+
+# Toplu yanıttaki yazar URL'sinden anahtar: https://openlibrary.org/authors/OL23919A/J._K._Rowling
+AUTHOR_KEY_RE = re.compile(r"/authors/OL\w+A")
+
+# Önbelleğe yalnızca kullandığımız alanlar yazılır (edition kayıtları onlarca alan içerir)
+CACHED_FIELDS = ("title", "authors", "by_statement", "name")
+
+
+def _slim(data: dict[str, Any]) -> dict[str, Any]:
+    return {field: data[field] for field in CACHED_FIELDS if field in data}
+
+
+class OpenLibraryClient(BaseOpenLibraryClient):
+    book_class = Book
+
+    def __init__(self, base_url: str = OPEN_LIBRARY_URL, timeout: float = 10.0,
+                 author_timeout: Optional[float] = None, connect_timeout: float = 5.0,
+                 limits: httpx.Limits = DEFAULT_LIMITS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[MetadataCache] = None,
+                 limiter: Optional[TokenBucket] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 retry: Optional[RetryPolicy] = None) -> None:
+        super().__init__(base_url, timeout=timeout, author_timeout=author_timeout,
+                         connect_timeout=connect_timeout, limits=limits, transport=transport)
+        self.cache = MetadataCache.from_env() if cache is None else cache
+        if limiter is None and DEFAULT_RATE_LIMIT > 0:
+            limiter = TokenBucket(DEFAULT_RATE_LIMIT, burst=int(DEFAULT_RATE_LIMIT * 2))
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.retry = retry or RetryPolicy()
+        # Aynı edition / yazar anahtarı için eşzamanlı istekler tek istekte birleşir
+        self._flights = SingleFlight()
+
+    async def _get_json(self, path: str, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+        """
+        GET isteği atar; 404'te None döner, diğer HTTP hatalarında exception fırlatır.
+        Başarılı yanıtlar ve 404'ler önbelleğe alınır; hatalar alınmaz. Aynı anahtar
+        için uçuşta bir istek varsa yeni istek atılmaz, onun sonucu beklenir.
+        """
+        key = path.removesuffix(".json")
+        cached = await self.cache.aget(key)
+        if cached is not MISSING:
+            return cached
+
+        async def load() -> Optional[dict[str, Any]]:
+            data = await self._fetch_json(path, timeout)
+            await self.cache.aput(key, data)
+            return data
+
+        return await self._flights.do(key, load)
+
+    async def _get(self, path: str, params: Optional[dict[str, str]] = None,
+                   timeout: Optional[float] = None) -> httpx.Response:
+        """
+        Korumalı GET: devre kesici -> hız sınırı -> istek; geçici hatalarda yeniden dener.
+        Devre açıksa CircuitOpenError; denemeler tükenirse son hata / yanıt döner.
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Open Library circuit is open, skipping {path}")
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            success = False
+            retry_after = None
+            try:
+                response = await super()._get(path, params=params, timeout=timeout)
+                success = response.status_code < 500 and response.status_code != 429
+                if response.status_code not in RetryPolicy.RETRY_STATUSES or attempt >= self.retry.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TransportError:
+                if attempt >= self.retry.max_retries:
+                    raise
+            finally:
+                # İptal edilen istek de (half-open denemesi dahil) sonuçlanmış sayılır
+                self.breaker.record(success)
+            self.retry.retries += 1
+            await asyncio.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Upstream koruma metrikleri (health için)."""
+        return {
+            "rate_limiter": self.limiter.stats() if self.limiter else None,
+            "circuit": self.breaker.stats(),
+            "retries": self.retry.retries,
+            "coalesced": self._flights.coalesced,
+        }
+
+    async def _fetch_json(self, path: str, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+        data = await super()._fetch_json(path, timeout)
+        return None if data is None else _slim(data)
+
+    # ---------- Toplu çözümleme ----------
+    @staticmethod
+    def _batch_cache_entries(isbn: str, entry: dict[str, Any],
+                             authors: list[dict[str, Any]]) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Toplu yanıttaki kaydın tekil yolun önbellek biçimindeki karşılığı ("/isbn/<isbn>" +
+        "/authors/OL…A"); böylece sonraki fetch_book çağrıları da ağa çıkmaz.
+        Yazar anahtarı çıkarılamayan kayıtlar saklanmaz (boş liste).
+        """
+        entries = []
+        for author in authors:
+            match = AUTHOR_KEY_RE.search(author.get("url") or author.get("key") or "")
+            if not match:
+                return []
+            entries.append((match.group(0), {"name": author["name"]}))
+        edition: dict[str, Any] = {"title": entry["title"], "authors": [{"key": key} for key, _ in entries]}
+        if entry.get("by_statement"):
+            edition["by_statement"] = entry["by_statement"]
+        entries.append((f"/isbn/{isbn}", edition))
+        return entries
+
+    async def _fetch_batch(self, isbns: list[str]) -> dict[str, Book]:
+        """Tek bir toplu Books API isteği; yanıtta bulunan ISBN'ler için Book döndürür."""
+        params = {"bibkeys": ",".join(f"ISBN:{isbn}" for isbn in isbns), "jscmd": "data", "format": "json"}
+        response = await self._get("/api/books", params=params)
+        response.raise_for_status()
+        data = response.json()
+        books: dict[str, Book] = {}
+        cached: list[tuple[str, dict[str, Any]]] = []
+        if not isinstance(data, dict):
+            return books
+        for isbn in isbns:
+            entry = data.get(f"ISBN:{isbn}")
+            if not isinstance(entry, dict) or not entry.get("title"):
+                continue
+            refs = [a for a in entry.get("authors") or [] if isinstance(a, dict) and a.get("name")]
+            authors = [a["name"] for a in refs]
+            if not authors and entry.get("by_statement"):
+                authors = [entry["by_statement"]]
+            cached.extend(self._batch_cache_entries(isbn, entry, refs))
+            books[isbn] = Book(isbn=isbn, title=entry["title"], authors=authors)
+        await self.cache.aput_many(cached)
+        return books
+
+    async def fetch_books(self, isbns: list[str], batch_size: int = BATCH_SIZE,
+                          concurrency: int = 8, semaphore: Optional[asyncio.Semaphore] = None,
+                          return_exceptions: bool = False) -> dict[str, Any]:
+        """
+        Çok sayıda ISBN'i toplu Books API ile çözer; {isbn: Book | None} döndürür (girdi sırası).
+        Önbellekte olan ISBN'ler ve toplu yanıtta eksik kalanlar (veya başarısız parçalar)
+        tekil `lookup_book` ile tamamlanır. Toplu ve tekil istekler aynı semaphore'dan
+        geçer: en fazla `concurrency` istek aynı anda uçuştadır. Birden fazla çağrı tek bir
+        bütçeyi paylaşacaksa (ör. toplu içe aktarma) ortak `semaphore` verilir.
+        return_exceptions True ise çekilemeyen ISBN'lerin değeri None yerine hatanın kendisidir.
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(concurrency, 1))
+        unique = list(dict.fromkeys(isbns))
+        missing = await self.cache.amissing(f"/isbn/{isbn}" for isbn in unique)
+        pending = [key.removeprefix("/isbn/") for key in missing]
+        found: dict[str, Any] = {}
+
+        async def batch(chunk: list[str]) -> dict[str, Book]:
+            async with semaphore:
+                return await self._fetch_batch(chunk)
+
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        for result in await asyncio.gather(*(batch(chunk) for chunk in chunks), return_exceptions=True):
+            if isinstance(result, dict):
+                found.update(result)
+            # Hata durumunda (ağ, 5xx, bozuk JSON) parçadaki ISBN'ler tekil yola düşer
+
+        rest = [isbn for isbn in unique if isbn not in found]
+
+        async def single(isbn: str) -> Optional[Book]:
+            async with semaphore:
+                return await self.lookup_book(isbn)
+
+        for isbn, book in zip(rest, await asyncio.gather(*(single(isbn) for isbn in rest),
+                                                          return_exceptions=True)):
+            if isinstance(book, (httpx.HTTPError, ValueError)):
+                if return_exceptions:
+                    found[isbn] = book
+            elif isinstance(book, BaseException):
+                raise book
+            elif book is not None:
+                found[isbn] = book
+        return {isbn: found.get(isbn) for isbn in unique}
+
+    # ---------- Senkron cephe ----------
+    def _settings(self) -> dict[str, Any]:
+        # İkiz istemci önbelleği, hız sınırını ve devre kesiciyi paylaşır
+        return {**super()._settings(), "cache": self.cache, "limiter": self.limiter,
+                "breaker": self.breaker, "retry": self.retry}
+
+    def fetch_books_sync(self, isbns: list[str], batch_size: int = BATCH_SIZE,
+                         concurrency: int = 8) -> dict[str, Optional[Book]]:
+        """fetch_books'un senkron karşılığı (CLI, önbellek ısıtma)."""
+        return self._run_sync(lambda client: client.fetch_books(isbns, batch_size=batch_size,
+                                                                concurrency=concurrency))
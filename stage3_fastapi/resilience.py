@@ -0,0 +1,163 @@
+"""
+Open Library istemcisi için koruma katmanları.
+
+TokenBucket    -> istemci taraflı hız sınırı (saniyede `rate` istek, `burst` kadar ani yük)
+CircuitBreaker -> pencere içindeki hata oranı eşiği aşınca devreyi açar; açıkken
+                  çağrılar beklemeden CircuitOpenError ile düşer, `reset_timeout`
+                  sonra tek bir deneme isteğine (half-open) izin verilir
+RetryPolicy    -> yalnızca idempotent GET'ler için jitter'lı üstel geri çekilme
+
+Nesneler thread-safe'tir; senkron cephenin açtığı istemciler (farklı event loop /
+thread) aynı limiter ve breaker'ı paylaşır.
+"""
+
+from __future__ import annotations
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import httpx
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Devre açıkken upstream'e gitmeden fırlatılır."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.throttled = 0          # token beklemek zorunda kalan istek sayısı
+        self.waited_seconds = 0.0   # toplam bekleme
+
+    def _take(self) -> float:
+        """Token alınabildiyse 0, aksi halde bir sonraki token için beklenecek süre."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> float:
+        """Bir token bekler; toplam bekleme süresini (saniye) döndürür."""
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if delay <= 0:
+                if waited:
+                    with self._lock:
+                        self.throttled += 1
+                        self.waited_seconds += waited
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rate": self.rate, "burst": self.burst, "throttled": self.throttled,
+                    "throttle_wait_seconds": round(self.waited_seconds, 3)}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_ratio: float = 0.5, min_calls: int = 10, window: float = 30.0,
+                 reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._calls: deque[tuple[float, bool]] = deque()  # (zaman, başarılı mı)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._opened_at = 0.0      # son açılış / başarısız deneme zamanı
+        self._outage_start = 0.0   # kesintinin başladığı an
+        self._probing = False
+        self.opened = 0            # kaç kez açıldı
+        self.rejected = 0          # açıkken hızlıca reddedilen çağrı
+        self._open_seconds = 0.0   # kapanmış açık dönemlerin toplam süresi
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = self._clock()
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state, self._probing = HALF_OPEN, False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            now = self._clock()
+            if self.state == HALF_OPEN:
+                if success:
+                    self._close(now)
+                else:
+                    self._open(now)
+                return
+            if self.state == OPEN:
+                return
+            self._calls.append((now, success))
+            while self._calls and self._calls[0][0] < now - self.window:
+                self._calls.popleft()
+            failures = sum(1 for _, ok in self._calls if not ok)
+            if len(self._calls) >= self.min_calls and failures / len(self._calls) >= self.failure_ratio:
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        if self.state == CLOSED:
+            self.opened += 1
+            self._outage_start = now
+        # half-open denemesi başarısızsa aynı kesinti sürer; yalnızca bekleme yeniden başlar
+        self._opened_at = now
+        self.state, self._probing = OPEN, False
+
+    def _close(self, now: float) -> None:
+        self._open_seconds += now - self._outage_start
+        self.state, self._probing = CLOSED, False
+        self._calls.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            open_seconds = self._open_seconds
+            if self.state != CLOSED:
+                open_seconds += self._clock() - self._outage_start
+            return {"state": self.state, "opened": self.opened, "rejected": self.rejected,
+                    "open_seconds": round(open_seconds, 3)}
+
+
+class RetryPolicy:
+    # Yeniden denenebilecek HTTP durumları (throttling + geçici upstream hataları)
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.5, max_delay: float = 8.0,
+                 rng: Optional[random.Random] = None) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = rng or random.Random()
+        self.retries = 0
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """attempt (0'dan başlar) için bekleme: Retry-After varsa o, yoksa full jitter."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
@@ -0,0 +1,130 @@
+"""
+Kitap araması için artımlı güncellenen ters (inverted) token indeksi.
+
+Başlık, yazarlar ve ISBN token'lara ayrılır; her token -> {isbn: ağırlık} tutulur.
+Sorgudaki her token önek (prefix) olarak eşleşir; sıralı sözlük (vocabulary)
+üzerinde bisect ile önek aralığı bulunur. Sonuçlar tüm sorgu token'larını içeren
+kitaplardır (AND) ve ağırlık toplamına göre sıralanır.
+"""
+
+from __future__ import annotations
+import re
+from bisect import bisect_left, insort
+from typing import Callable, Optional
+
+from stage3_fastapi.models import Book
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Alan ağırlıkları: ISBN eşleşmesi en belirleyici, sonra başlık, sonra yazar
+FIELD_WEIGHTS = {"isbn": 5.0, "title": 3.0, "author": 2.0}
+EXACT_MATCH_BONUS = 2.0  # token tam eşleşirse ağırlık çarpanı (önek eşleşmesine göre)
+
+
+def tokenize(text: str) -> list[str]:
+    """Metni büyük/küçük harf duyarsız kelime token'larına ayırır."""
+    return TOKEN_RE.findall(text.casefold())
+
+
+def book_tokens(book: Book) -> dict[str, float]:
+    """Bir kitabın token -> ağırlık haritası (aynı token için en yüksek ağırlık)."""
+    weights: dict[str, float] = {}
+
+    def add(tokens: list[str], weight: float) -> None:
+        for token in tokens:
+            if weights.get(token, 0.0) < weight:
+                weights[token] = weight
+
+    isbn = book.isbn.casefold()
+    add(tokenize(isbn) + [re.sub(r"\W+", "", isbn)], FIELD_WEIGHTS["isbn"])
+    add(tokenize(book.title), FIELD_WEIGHTS["title"])
+    for author in book.authors:
+        add(tokenize(author), FIELD_WEIGHTS["author"])
+    weights.pop("", None)
+    return weights
+
+
+class SearchIndex:
+    """Library tarafından ekleme/silme/güncellemede beslenen ters indeks."""
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, float]] = {}   # token -> {isbn: ağırlık}
+        self._vocabulary: list[str] = []                   # sıralı token listesi (önek araması)
+        self._doc_tokens: dict[str, dict[str, float]] = {} # isbn -> token haritası (silme için)
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._vocabulary.clear()
+        self._doc_tokens.clear()
+
+    def rebuild(self, books) -> None:
+        """Toplu yükleme: sözlüğü tek seferde sıralar."""
+        self.clear()
+        for book in books:
+            tokens = book_tokens(book)
+            self._doc_tokens[book.isbn] = tokens
+            for token, weight in tokens.items():
+                self._postings.setdefault(token, {})[book.isbn] = weight
+        self._vocabulary = sorted(self._postings)
+
+    def add(self, book: Book) -> None:
+        self.remove(book.isbn)
+        tokens = book_tokens(book)
+        self._doc_tokens[book.isbn] = tokens
+        for token, weight in tokens.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            posting[book.isbn] = weight
+
+    def remove(self, isbn: str) -> None:
+        tokens = self._doc_tokens.pop(isbn, None)
+        if not tokens:
+            return
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(isbn, None)
+            if not posting:
+                del self._postings[token]
+                i = bisect_left(self._vocabulary, token)
+                if i < len(self._vocabulary) and self._vocabulary[i] == token:
+                    del self._vocabulary[i]
+
+    def _prefix_scores(self, prefix: str) -> dict[str, float]:
+        """Öneki `prefix` olan tüm token'ların posting'lerini birleştirir (kitap başına en iyi skor)."""
+        scores: dict[str, float] = {}
+        i = bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            token = self._vocabulary[i]
+            bonus = EXACT_MATCH_BONUS if token == prefix else 1.0
+            for isbn, weight in self._postings[token].items():
+                score = weight * bonus
+                if scores.get(isbn, 0.0) < score:
+                    scores[isbn] = score
+            i += 1
+        return scores
+
+    def search(self, query: str, accept: Optional[Callable[[str], bool]] = None) -> list[tuple[float, str]]:
+        """
+        Sorguya uyan (skor, isbn) listesini skora göre azalan sırada döndürür.
+        accept: ISBN'i sonuçlara almadan önce çağrılan filtre (ör. kitap tipi).
+        """
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not terms:
+            return []
+        # En seçici (en uzun) terimle başla, diğerleriyle kesiştir
+        scores = self._prefix_scores(terms[0])
+        for term in terms[1:]:
+            if not scores:
+                break
+            other = self._prefix_scores(term)
+            scores = {isbn: score + other[isbn] for isbn, score in scores.items() if isbn in other}
+        results = [(score, isbn) for isbn, score in scores.items() if accept is None or accept(isbn)]
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return results
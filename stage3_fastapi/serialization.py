@@ -0,0 +1,91 @@
+"""
+Kitapları Pydantic doğrulamasından geçirmeden doğrudan JSON byte'larına çeviren hızlı yol.
+
+Her kitabın kodlanmış JSON parçası (fragment) ISBN'e göre önbelleğe alınır;
+Library kitap silindiğinde / güncellendiğinde parçayı geçersiz kılar. Liste
+yanıtı parçaların birleştirilmesiyle oluşur. Çıktı BookResponse ile aynı alan
+ve sıralamadadır; endpoint'ler response_model'i (OpenAPI şeması için) korur
+ama hazır bir Response döndürdükleri için FastAPI yeniden doğrulama yapmaz.
+"""
+
+from __future__ import annotations
+import json
+from typing import Any, Iterable, Optional
+
+from stage3_fastapi.models import Book
+
+def _dumps(value: Any) -> str:
+    # FastAPI JSONResponse ile aynı ayarlar
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def book_payload(book: Book) -> dict[str, Any]:
+    """BookResponse(**book.to_dict()).model_dump() ile aynı sözlük (alan sırası ve tip dönüşümleri dahil)."""
+    file_size = book.file_size_mb
+    duration = book.duration_minutes
+    return {
+        "isbn": book.isbn,
+        "title": book.title,
+        "authors": book.authors,
+        "is_borrowed": bool(book.is_borrowed),
+        "book_type": book.book_type,
+        "shelf_location": book.shelf_location,
+        "file_size_mb": None if file_size is None else float(file_size),
+        "file_format": book.file_format,
+        "duration_minutes": None if duration is None else int(duration),
+        "narrator": book.narrator,
+    }
+
+
+def encode_book(book: Book) -> bytes:
+    return _dumps(book_payload(book)).encode("utf-8")
+
+
+class FragmentCache:
+    """
+    ISBN -> kodlanmış JSON parçası; Library mutasyonlarda geçersiz kılar.
+    Parça kodlandığı Book nesnesiyle birlikte saklanır ve yalnızca aynı nesne için
+    kullanılır: Library kitapları yerinde değiştirmediğinden (güncelleme yeni nesnedir)
+    eski nesneyi tutan bir thread geçersiz kılmadan sonra eski parçayı önbelleğe koyamaz.
+    """
+
+    def __init__(self) -> None:
+        self._fragments: dict[str, tuple[Book, bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def get(self, book: Book) -> bytes:
+        entry = self._fragments.get(book.isbn)
+        if entry is None or entry[0] is not book:
+            self.misses += 1
+            fragment = encode_book(book)
+            self._fragments[book.isbn] = (book, fragment)
+            return fragment
+        self.hits += 1
+        return entry[1]
+
+    def invalidate(self, isbn: str) -> None:
+        self._fragments.pop(isbn, None)
+
+    def clear(self) -> None:
+        self._fragments.clear()
+
+    def encode_list(self, books: Iterable[Book], extra: Optional[str] = None) -> bytes:
+        """
+        Kitap listesini JSON dizisi olarak kodlar.
+        extra="author" ise her nesneye stage1 `author` alanı eklenir (arama yanıtı).
+        """
+        if extra is None:
+            return b"[" + b",".join(self.get(book) for book in books) + b"]"
+        parts = []
+        for book in books:
+            value = _dumps(getattr(book, extra)).encode("utf-8")
+            parts.append(self.get(book)[:-1] + b',"' + extra.encode("ascii") + b'":' + value + b"}")
+        return b"[" + b",".join(parts) + b"]"
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._fragments), "hits": self.hits, "misses": self.misses}
+
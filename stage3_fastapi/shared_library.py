@@ -0,0 +1,289 @@
+"""
+Birden fazla süreçte (uvicorn --workers N) aynı kataloğu paylaşan Library.
+
+SQLiteLibrary'nin üzerine kurulur: her worker kataloğu belleğinde tutar, ortak
+kopya tek bir SQLite dosyasıdır. books tablosundaki her INSERT / UPDATE / DELETE
+bir trigger ile `changes` günlüğüne (artan seq, isbn) yazılır ve satırın
+`version` sütununa o seq işlenir.
+
+- Yazma: her mutasyon `BEGIN IMMEDIATE` ile veritabanının yazma kilidini alır
+  (süreçler arası kilit), önce diğer worker'ların değişikliklerini uygular, sonra
+  bellekte uygular ve değişen satırları aynı transaction'da yazar. Eski bir
+  kopyaya dayanan yazım (ör. iki worker'ın aynı kitabı ödünç vermesi) olmaz.
+- Okuma: refresh() `PRAGMA data_version` ile başka bir bağlantının commit edip
+  etmediğine bakar; ettiyse günlükte son görülen seq'ten sonra değişen ISBN'leri
+  okur ve yalnızca onları günceller. Günlüğün gereken kısmı budanmışsa katalog
+  baştan yüklenir. API her istekten önce ve `poll_interval` saniyede bir, event
+  loop'u bloklamamak için bir thread'de çağırır.
+
+Katalog sürümü ve kitap sürümleri günlüğün seq değerleridir ve epoch veritabanında
+saklanır; ETag'ler ve değişiklik akışının id'leri tüm worker'larda aynıdır.
+
+Yazım, kilitle aynı blokta kalması için writer thread'ine devredilmez; mutasyonla
+birlikte senkron yapılır (WAL + synchronous=NORMAL ile commit fsync beklemez).
+Kilit başka bir worker yazarken `BUSY_TIMEOUT_MS`'e kadar beklenebildiği için
+asenkron yollarda (FastAPI handler'ları) tüm blok bir thread'de çalışır (_amutate).
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from stage3_fastapi.library import OPTIONAL_FIELDS
+from stage3_fastapi.models import Book
+from stage3_fastapi.sqlite_library import COLUMNS, INSERT_SQL, SQLiteLibrary, book_to_record, record_to_book
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BUSY_TIMEOUT_MS = 5000  # başka bir worker yazarken kilidi bekleme süresi
+
+DATA_COLUMNS = COLUMNS[1:]  # isbn dışındaki sütunlar
+UPDATE_SQL = f"UPDATE books SET {', '.join(f'{c} = ?' for c in DATA_COLUMNS)} WHERE isbn = ?"
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)}, version FROM books"
+BOOK_FIELDS = ("title", "authors", "is_borrowed", "book_type") + OPTIONAL_FIELDS
+
+SHARED_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, isbn TEXT NOT NULL)",
+    """CREATE TRIGGER IF NOT EXISTS books_log_insert AFTER INSERT ON books BEGIN
+        INSERT INTO changes (isbn) VALUES (NEW.isbn);
+        UPDATE books SET version = last_insert_rowid() WHERE isbn = NEW.isbn;
+    END""",
+    # Yalnızca veri sütunları: trigger'ın kendi version güncellemesi yeniden kayıt üretmez
+    f"""CREATE TRIGGER IF NOT EXISTS books_log_update AFTER UPDATE OF {', '.join(DATA_COLUMNS)} ON books BEGIN
+        INSERT INTO changes (isbn) VALUES (NEW.isbn);
+        UPDATE books SET version = last_insert_rowid() WHERE isbn = NEW.isbn;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_log_delete AFTER DELETE ON books BEGIN
+        INSERT INTO changes (isbn) VALUES (OLD.isbn);
+    END""",
+)
+
+
+class SharedLibrary(SQLiteLibrary):
+    """Süreçler arası kilit ve değişiklik günlüğüyle paylaşılan SQLite kataloğu."""
+
+    poll_interval = 0.5
+    changelog_keep = 10000  # günlükte saklanan en az kayıt (daha gerideki worker baştan yükler)
+
+    def __init__(self, filename: str = "library.db") -> None:
+        self._synced_seq = 0           # uygulanmış son günlük kaydı
+        self._data_version: Optional[int] = None
+        self._pruned_at = 0
+        self._pending: Optional[list[tuple[str, str, Optional[tuple]]]] = None  # yazılacak değişiklikler
+        self._mutating_thread: Optional[int] = None
+        self._applying: Optional[int] = None  # uygulanan uzak kaydın seq'i
+        super().__init__(filename)
+
+    # ---------- Bağlantı ----------
+    def _connect(self) -> sqlite3.Connection:
+        previous = self._conn
+        conn = super()._connect()
+        if conn is not previous:
+            conn.isolation_level = None  # transaction'lar elle yönetilir
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            self._prepare_schema(conn)
+        return conn
+
+    @staticmethod
+    def _prepare_schema(conn: sqlite3.Connection) -> None:
+        """Günlük tablosunu, trigger'ları ve ortak epoch'u oluşturur (aynı anda açılan worker'lar sıraya girer)."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(books)")}
+            if "version" not in columns:
+                conn.execute("ALTER TABLE books ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            for statement in SHARED_SCHEMA:
+                conn.execute(statement)
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (secrets.token_hex(4),))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ---------- Kalıcılık ----------
+    def load_books(self) -> None:
+        """Kataloğu tutarlı bir okuma transaction'ında baştan yükler."""
+        with self._db_lock:
+            conn = self._connect()
+            if self._mutating_thread == threading.get_ident():
+                self._load(conn)
+                return
+            conn.execute("BEGIN")
+            try:
+                self._load(conn)
+            finally:
+                conn.execute("COMMIT")
+
+    def _load(self, conn: sqlite3.Connection) -> None:
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        records = conn.execute(f"{SELECT_SQL} ORDER BY rowid").fetchall()
+        self._synced_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        self.epoch = conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+        with self._writing():
+            self._reset_index(record_to_book(record) for record in records)
+            self._book_versions = {record["isbn"]: record["version"] for record in records}
+
+    def save_books(self) -> None:
+        """Tüm kataloğu yeniden yazar; diğer worker'lar değişiklikleri günlükten alır."""
+        with self._mutation():
+            records = [book_to_record(b) for b in list(self._index.values())]
+            self._conn.execute("DELETE FROM books")
+            self._conn.executemany(INSERT_SQL, records)
+
+    def import_books(self, books: Iterable[Book]) -> int:
+        """Kitapları tek transaction'da ekler; var olan ISBN'leri atlar."""
+        with self._mutation():
+            return sum(1 for book in books if self._insert(book))
+
+    # Değişiklikler _mutation bloğunun sonunda, kilit altında yazılır
+    def _commit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        pass
+
+    def _commit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        pass
+
+    async def _acommit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        pass
+
+    async def _acommit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        pass
+
+    def _mutate(self, apply: Callable[[], T]) -> T:
+        with self._mutation():
+            return apply()
+
+    async def _amutate(self, apply: Callable[[], T]) -> T:
+        # BEGIN IMMEDIATE diğer worker'ın yazımını bekleyebilir: event loop yerine thread'de
+        return await asyncio.to_thread(self._mutate, apply)
+
+    # ---------- Süreçler arası senkronizasyon ----------
+    @contextmanager
+    def _mutation(self) -> Iterator[None]:
+        """
+        Yazma kilidini alır, diğer worker'ların değişikliklerini uygular; blok içindeki
+        bellek içi değişiklikler aynı transaction'da yazılır. Hata olursa geri alınır ve
+        bellek değiştiyse katalog veritabanından yeniden yüklenir.
+        """
+        if self._mutating_thread == threading.get_ident():  # iç içe: dıştaki blok yazar
+            yield
+            return
+        with super()._mutation(), self._db_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            self._mutating_thread = threading.get_ident()
+            start = None
+            try:
+                self._sync(conn)
+                start = self.catalog_version
+                self._pending = []
+                yield
+                self._write_pending(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._pending = None
+                self._mutating_thread = None
+                if start is not None and self.catalog_version != start:
+                    logger.warning("Mutation rolled back; reloading the catalog from the database")
+                    self.load_books()
+                raise
+            finally:
+                self._pending = None
+                self._mutating_thread = None
+
+    def _write_pending(self, conn: sqlite3.Connection) -> None:
+        for op, isbn, record in self._pending:
+            if op == "add":
+                conn.execute(INSERT_SQL, record)
+            elif op == "update":
+                conn.execute(UPDATE_SQL, record[1:] + (isbn,))
+            else:
+                conn.execute("DELETE FROM books WHERE isbn = ?", (isbn,))
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        if seq != self.catalog_version:
+            # Her bellek içi değişiklik tek bir satır yazar; tutmuyorsa (ör. save_books) baştan yükle
+            logger.info("Change log is ahead of memory; reloading the catalog")
+            self._load(conn)
+        self._synced_seq = seq
+        if seq - self._pruned_at >= self.changelog_keep:
+            conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - self.changelog_keep,))
+            self._pruned_at = seq
+
+    def _sync(self, conn: sqlite3.Connection) -> bool:
+        """Günlükte son uygulanan kayıttan sonra değişen kitapları veritabanından okur (transaction içinde)."""
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        rows = conn.execute("SELECT seq, isbn FROM changes WHERE seq > ? ORDER BY seq",
+                            (self._synced_seq,)).fetchall()
+        if not rows:
+            return False
+        if rows[0]["seq"] != self._synced_seq + 1:
+            # Gereken kayıtlar budanmış: katalog baştan yüklenir
+            self._load(conn)
+            return True
+        latest = {row["isbn"]: row["seq"] for row in rows}
+        records = [(isbn, seq, conn.execute(f"{SELECT_SQL} WHERE isbn = ?", (isbn,)).fetchone())
+                   for isbn, seq in sorted(latest.items(), key=lambda item: item[1])]
+        # Okuyanlar grubun tamamını ya da hiçbirini görür
+        with self._writing():
+            for isbn, seq, record in records:
+                self._applying = seq
+                try:
+                    self._apply_record(isbn, record)
+                finally:
+                    self._applying = None
+            self._synced_seq = self.catalog_version = rows[-1]["seq"]
+        self.changes.advance(self._synced_seq)
+        return True
+
+    def _apply_record(self, isbn: str, record: Optional[sqlite3.Row]) -> None:
+        book = self._index.get(isbn)
+        if record is None:
+            if book is not None:
+                self._delete(isbn)
+            return
+        fresh = record_to_book(record)
+        if book is None:
+            self._insert(fresh)
+            return
+        fields = {f: getattr(fresh, f) for f in BOOK_FIELDS if getattr(fresh, f) != getattr(book, f)}
+        if fields:
+            self._patch(book, fields)
+        else:
+            self._book_versions[isbn] = record["version"]
+
+    def refresh(self) -> bool:
+        """Başka worker'lar commit ettiyse yalnızca değişen kitapları günceller."""
+        with self._db_lock:
+            if self._mutating_thread == threading.get_ident():
+                return False
+            conn = self._connect()
+            if conn.execute("PRAGMA data_version").fetchone()[0] == self._data_version:
+                return False
+            conn.execute("BEGIN")
+            try:
+                return self._sync(conn)
+            finally:
+                conn.execute("COMMIT")
+
+    # ---------- Sürümler ----------
+    def _touch_all(self) -> None:
+        # Katalog sürümü günlüğün seq'idir (tüm worker'larda aynı)
+        self.catalog_version = self._base_version = self._synced_seq
+        self._book_versions = {}
+        self.changes.reset(self._synced_seq)
+
+    def _touch(self, isbn: str, op: str) -> None:
+        if self._applying is not None:
+            self.catalog_version = self._applying - 1
+        super()._touch(isbn, op)
+        if self._pending is not None:
+            book = self._index.get(isbn)
+            self._pending.append((op, isbn, None if op == "remove" else book_to_record(book)))
@@ -0,0 +1,63 @@
+"""
+Aynı anahtar için eşzamanlı işleri birleştiren yardımcılar (request coalescing).
+
+SingleFlight: aynı anahtarla gelen eşzamanlı çağrılar tek bir uçuştaki işi
+    bekler (ör. aynı ISBN ya da yazar için tek Open Library isteği).
+KeyedLock: anahtar başına asyncio.Lock (ör. aynı ISBN'in eklenmesini sıraya koymak).
+
+İkisi de iş bitince anahtarı bırakır; sözlükler yalnızca uçuştaki işleri tutar.
+Tek bir event loop içinde kullanılmak içindir.
+"""
+
+from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0  # başka bir çağrının sonucunu bekleyen çağrı sayısı
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Anahtar için uçuşta bir iş varsa onun sonucunu bekler, yoksa fn()'i başlatır.
+        Sonuç (ya da exception) tüm bekleyenlere iletilir. Bekleyenlerden biri iptal
+        edilirse paylaşılan iş iptal edilmez (shield).
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+class KeyedLock:
+    def __init__(self) -> None:
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
@@ -0,0 +1,301 @@
+"""
+Çökmeye dayanıklı katalog snapshot'ları.
+
+Biçim (tek JSON belgesi):
+    {"format": "library-snapshot", "version": 1, "generation": 7, "count": 2,
+     "checksum": "sha256:…", "books": [...]}
+
+checksum, `books` listesinin kompakt JSON gösteriminin SHA-256 özetidir; yükleyici
+listeyi yeniden serileştirip karşılaştırır. Eski düz liste biçimi (checksum'sız)
+de okunur.
+
+Yazım: geçici dosyaya yaz -> fsync -> eski nesilleri kaydır (library.json.1,
+library.json.2, ...) -> geçici dosyayı rename ile yerine koy -> dizini fsync et.
+Yükleme: mevcut dosya, geçici dosya ve eski nesiller arasından checksum'ı geçerli
+olan en yüksek nesli seçer. Hiçbiri geçerli değilse SnapshotError fırlatılır;
+katalog sessizce boşalmaz.
+
+Büyük dosyalar (STREAM_THRESHOLD üstü) akış halinde okunur: `books` dizisi parça
+parça çözülür, her satır tüketiciye tek tek verilir ve checksum satırlar
+geçerken hesaplanır. Böylece dosya metni ve tüm satır listesi aynı anda bellekte
+tutulmaz. Küçük dosyalar eskisi gibi tek seferde okunur.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TextIO, TypeVar
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "library-snapshot"
+SNAPSHOT_VERSION = 1
+DEFAULT_GENERATIONS = 3   # mevcut dosya + 2 eski nesil
+
+GENERATION_RE = re.compile(rb'"generation":\s*(\d+)')
+
+STREAM_THRESHOLD = 8 * 1024 * 1024   # bu boyutun üstündeki dosyalar akış halinde okunur
+CHUNK_SIZE = 1024 * 1024             # akış okumasında tek seferde okunan karakter sayısı
+
+T = TypeVar("T")
+
+
+class SnapshotError(ValueError):
+    """Hiçbir snapshot nesli okunamadığında fırlatılır."""
+
+
+def _books_json(rows: list[dict[str, Any]]) -> str:
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+
+
+def checksum(books_json: str) -> str:
+    return "sha256:" + hashlib.sha256(books_json.encode("utf-8")).hexdigest()
+
+
+def generation_path(path: Path, n: int) -> Path:
+    return path.with_name(f"{path.name}.{n}")
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(path.name + ".tmp")
+
+
+def _candidates(path: Path) -> list[Path]:
+    """Olası snapshot dosyaları: mevcut, yarım kalmış geçici dosya, eski nesiller."""
+    older = []
+    pattern = re.compile(re.escape(path.name) + r"\.(\d+)$")
+    if path.parent.exists():
+        for entry in path.parent.iterdir():
+            match = pattern.match(entry.name)
+            if match:
+                older.append((int(match.group(1)), entry))
+    return [path, _tmp_path(path)] + [entry for _, entry in sorted(older)]
+
+
+def _peek_generation(path: Path) -> int:
+    """Dosyanın başından nesil numarasını okur (tüm dosyayı parse etmeden)."""
+    try:
+        with open(path, "rb") as f:
+            match = GENERATION_RE.search(f.read(256))
+    except OSError:
+        return 0
+    return int(match.group(1)) if match else 0
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Rename'in kalıcı olması için dizin girdisi de fsync edilir (Windows'ta desteklenmez)
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(path: Path, rows: list[dict[str, Any]], generations: int = DEFAULT_GENERATIONS) -> int:
+    """Snapshot'ı atomik olarak yazar, `generations` nesil saklar; yazılan nesil numarasını döndürür."""
+    path = Path(path)
+    generation = max((_peek_generation(p) for p in _candidates(path) if p.exists()), default=0) + 1
+    books = _books_json(rows)
+    tmp = _tmp_path(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f'{{"format":"{SNAPSHOT_FORMAT}","version":{SNAPSHOT_VERSION},'
+                f'"generation":{generation},"count":{len(rows)},'
+                f'"checksum":"{checksum(books)}","books":{books}}}')
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Eski nesilleri kaydır: .{n-1} -> .{n}, ..., mevcut -> .1
+    if generations > 1:
+        for n in range(generations - 1, 1, -1):
+            older = generation_path(path, n - 1)
+            if older.exists():
+                os.replace(older, generation_path(path, n))
+        if path.exists():
+            os.replace(path, generation_path(path, 1))
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+    return generation
+
+
+def read_snapshot(path: Path) -> tuple[list[dict[str, Any]], Optional[int]]:
+    """
+    Tek bir dosyayı okur ve doğrular; (satırlar, nesil) döndürür.
+    Eski düz liste biçimi için nesil None'dır. Bozuk dosyada ValueError fırlatır.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, list):
+        return data, None
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a library snapshot")
+    books = data.get("books")
+    if not isinstance(books, list) or checksum(_books_json(books)) != data.get("checksum"):
+        raise ValueError(f"Checksum mismatch in {path}")
+    return books, int(data.get("generation", 0))
+
+
+class _StreamReader:
+    """Metin dosyası üzerinde kayan tampon; JSON değerlerini tek tek çözer."""
+
+    def __init__(self, f: TextIO, chunk_size: int) -> None:
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Tüketilmiş kısmı at ki tampon parça boyutu civarında kalsın
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Boşlukları atlar ve sıradaki karakteri döndürür (dosya sonunda "")."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of file'}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Sıradaki JSON değerini çözer; gerekirse tamponu doldurur."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # Yalnızca tamponun sonunda kesilen değer için daha fazla oku; gerçekten
+                # bozuk bir satır dosyanın kalanını belleğe çekmesin
+                truncated = e.pos >= len(self._buf) - 6 or e.msg.startswith("Unterminated string")
+                if truncated and self._fill():
+                    continue
+                raise
+            # Tamponun sonunda biten sayı/literal devam ediyor olabilir ("12" | "3")
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _stream_array(reader: _StreamReader, digest: Optional[Any]) -> Iterator[dict[str, Any]]:
+    """`[...]` dizisinin elemanlarını üretir; digest verilirse kompakt gösterimi özetlenir."""
+    reader.expect("[")
+    if digest is not None:
+        digest.update(b"[")
+    first = True
+    while reader.peek() != "]":
+        if not first:
+            reader.expect(",")
+        row = reader.value()
+        if digest is not None:
+            digest.update((("" if first else ",") + _books_json(row)).encode("utf-8"))
+        first = False
+        yield row
+    reader.expect("]")
+    if digest is not None:
+        digest.update(b"]")
+
+
+def stream_snapshot(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+    """
+    Tek bir dosyanın satırlarını sırayla üretir (read_snapshot'ın akış karşılığı).
+    Checksum son satırdan sonra doğrulanır; bozuk dosyada ValueError fırlatılır,
+    bu yüzden tüketici hata alırsa o ana kadar ürettiklerini atmalıdır.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _StreamReader(f, chunk_size)
+        if reader.peek() == "[":
+            # Eski düz liste biçimi: checksum yok
+            yield from _stream_array(reader, None)
+            return
+
+        header: dict[str, Any] = {}
+        digest = hashlib.sha256()
+        streamed = False
+        reader.expect("{")
+        while reader.peek() != "}":
+            if header or streamed:
+                reader.expect(",")
+            key = reader.value()
+            reader.expect(":")
+            if key == "books":
+                if header.get("format") != SNAPSHOT_FORMAT:
+                    raise ValueError(f"{path} is not a library snapshot")
+                yield from _stream_array(reader, digest)
+                streamed = True
+            else:
+                header[key] = reader.value()
+        reader.expect("}")
+
+    if header.get("format") != SNAPSHOT_FORMAT or not streamed:
+        raise ValueError(f"{path} is not a library snapshot")
+    if "sha256:" + digest.hexdigest() != header.get("checksum"):
+        raise ValueError(f"Checksum mismatch in {path}")
+
+
+def iter_snapshot(path: Path, stream_threshold: int = STREAM_THRESHOLD,
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+    """Küçük dosyaları tek seferde, büyükleri akış halinde okur."""
+    if os.path.getsize(path) <= stream_threshold:
+        yield from read_snapshot(path)[0]
+    else:
+        yield from stream_snapshot(path, chunk_size)
+
+
+def load_snapshot_with(path: Path, consume: Callable[[Iterator[dict[str, Any]]], T],
+                       stream_threshold: int = STREAM_THRESHOLD) -> T:
+    """
+    Nesilleri yeniden eskiye dener ve ilk geçerli olanın satırlarını `consume`'a verir.
+    `consume` her denemede baştan çağrılır: bir nesil yarıda bozuk çıkarsa ürettiği
+    sonuç atılır ve bir sonraki nesille yeniden kurulur. Hiç dosya yoksa
+    consume(boş iterator) döner; hiçbiri geçerli değilse SnapshotError fırlatılır.
+    """
+    path = Path(path)
+    existing = [candidate for candidate in _candidates(path) if candidate.exists()]
+    if not existing:
+        return consume(iter(()))
+    # Eski düz liste biçiminde nesil bilgisi yoktur (0): en düşük öncelik
+    existing.sort(key=_peek_generation, reverse=True)
+    errors = []
+    try:
+        for candidate in existing:
+            try:
+                return consume(iter_snapshot(candidate, stream_threshold))
+            except (OSError, ValueError) as e:
+                errors.append(f"{candidate.name}: {e}")
+    finally:
+        if errors:
+            logger.warning(f"Skipped unreadable snapshot files: {'; '.join(errors)}")
+    raise SnapshotError(f"No valid snapshot generation for {path}: {'; '.join(errors)}")
+
+
+def load_snapshot(path: Path) -> list[dict[str, Any]]:
+    """
+    Geçerli en yeni nesli yükler. Hiç dosya yoksa boş liste döner; dosyalar var ama
+    hiçbiri geçerli değilse SnapshotError fırlatır.
+    """
+    return load_snapshot_with(path, list)
@@ -0,0 +1,177 @@
+"""
+SQLite tabanlı Library.
+
+Public API (`load_books`, `add_book`, `remove_book`, `find_book`, `list_books`,
+`books`) Library ile aynıdır. Okumalar bellekteki ISBN indeksinden yapılır;
+her mutasyon yalnızca ilgili satırı yazar (INSERT / UPDATE / DELETE).
+"""
+
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from stage3_fastapi.library import Library, book_from_row, book_to_row, OPTIONAL_FIELDS
+from stage3_fastapi.models import Book
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    isbn             TEXT PRIMARY KEY,
+    title            TEXT NOT NULL,
+    author           TEXT NOT NULL,
+    authors          TEXT NOT NULL,      -- JSON listesi
+    is_borrowed      INTEGER NOT NULL DEFAULT 0,
+    book_type        TEXT NOT NULL DEFAULT 'Physical',
+    shelf_location   TEXT,
+    file_size_mb     REAL,
+    file_format      TEXT,
+    duration_minutes INTEGER,
+    narrator         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books(title);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books(author);
+CREATE INDEX IF NOT EXISTS idx_books_book_type ON books(book_type);
+CREATE INDEX IF NOT EXISTS idx_books_is_borrowed ON books(is_borrowed);
+"""
+
+COLUMNS = ("isbn", "title", "author", "authors", "is_borrowed", "book_type") + OPTIONAL_FIELDS
+INSERT_SQL = f"INSERT INTO books ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+
+
+def book_to_record(book: Book) -> tuple:
+    """Book'u `COLUMNS` sırasında bir SQLite satırına çevirir."""
+    row = book_to_row(book)
+    return (
+        row["isbn"],
+        row["title"],
+        row["author"],
+        json.dumps(row["authors"], ensure_ascii=False),
+        int(bool(row["is_borrowed"])),
+        row["book_type"],
+    ) + tuple(row.get(field) for field in OPTIONAL_FIELDS)
+
+
+def patch_to_columns(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Değişen alanları (patch payload'u) sütun değerlerine çevirir; book_to_record ile
+    aynı dönüşümler. Writer thread'inde çalıştığı için canlı indekse bakmaz.
+    """
+    columns: dict[str, Any] = {}
+    for field, value in payload.items():
+        if field == "authors":
+            authors = [value] if isinstance(value, str) else list(value or [])
+            columns["authors"] = json.dumps(authors, ensure_ascii=False)
+            columns["author"] = authors[0] if authors else "Unknown Author"
+        elif field == "is_borrowed":
+            columns[field] = int(bool(value))
+        elif field in ("title", "book_type"):
+            columns[field] = value
+        elif field in OPTIONAL_FIELDS:
+            columns[field] = value or None  # book_to_row boş değerleri yazmaz
+    return columns
+
+
+def record_to_book(record: sqlite3.Row) -> Book:
+    """SQLite satırını Book'a çevirir."""
+    row: dict[str, Any] = {
+        "isbn": record["isbn"],
+        "title": record["title"],
+        "authors": json.loads(record["authors"]),
+        "is_borrowed": bool(record["is_borrowed"]),
+        "book_type": record["book_type"],
+    }
+    for field in OPTIONAL_FIELDS:
+        if record[field] is not None:
+            row[field] = record[field]
+    return book_from_row(row)
+
+
+class SQLiteLibrary(Library):
+    """Kitapları WAL modundaki bir SQLite veritabanında saklayan Library."""
+
+    def __init__(self, filename: str = "library.db") -> None:
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_path: Optional[Path] = None
+        self._db_lock = threading.RLock()
+        super().__init__(filename)
+
+    # ---------- Bağlantı ----------
+    def _connect(self) -> sqlite3.Connection:
+        path = self._db_path
+        if self._conn is None or self._conn_path != path:
+            self.close()
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._conn_path = conn, path
+        return self._conn
+
+    def close(self) -> None:
+        """Veritabanı bağlantısını kapatır."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._conn_path = None
+
+    # ---------- Kalıcılık ----------
+    def load_books(self) -> None:
+        """Tüm satırları ekleme sırasıyla (rowid) belleğe yükler."""
+        with self._db_lock:
+            conn = self._connect()
+            records = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM books ORDER BY rowid").fetchall()
+        self._reset_index(record_to_book(record) for record in records)
+
+    def save_books(self) -> None:
+        """Bellekteki kataloğu tek transaction içinde veritabanına yazar (tam senkron)."""
+        records = [book_to_record(b) for b in list(self._index.values())]
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM books")
+                conn.executemany(INSERT_SQL, records)
+
+    def _commit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        """Sadece değişen satıra dokunur."""
+        self._commit_many([(op, isbn, payload)])
+
+    def _commit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        """Değişiklikleri tek transaction içinde uygular."""
+        if not changes:
+            return
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                for op, isbn, payload in changes:
+                    self._write_change(conn, op, isbn, payload)
+
+    def _write_change(self, conn: sqlite3.Connection, op: str, isbn: str,
+                      payload: Optional[dict[str, Any]]) -> None:
+        # Satır değişikliğin kendisinden (payload) kurulur: commit writer thread'inde
+        # sonradan çalışır, bu sırada kitap bellekte güncellenmiş ya da silinmiş olabilir
+        if op == "add":
+            conn.execute(INSERT_SQL, book_to_record(book_from_row(payload or {})))
+        elif op == "remove":
+            conn.execute("DELETE FROM books WHERE isbn = ?", (isbn,))
+        elif op == "patch" and payload:
+            columns = patch_to_columns(payload)
+            if columns:
+                assignments = ", ".join(f"{c} = ?" for c in columns)
+                conn.execute(f"UPDATE books SET {assignments} WHERE isbn = ?",
+                             list(columns.values()) + [isbn])
+
+    def import_books(self, books: Iterable[Book]) -> int:
+        """Kitapları tek transaction'da ekler; var olan ISBN'leri atlar. Eklenen sayısını döndürür."""
+        new_books = []
+        for book in books:
+            if self._insert(book):
+                new_books.append(book)
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(INSERT_SQL, [book_to_record(b) for b in new_books])
+        return len(new_books)
@@ -2,11 +2,22 @@
 const API_BASE = '';
 
 // Global variables
-let currentBooks = [];
+let currentBooks = [];   // only the page currently on screen
+let searchResultBooks = []; // latest /books/search results
 let currentFilter = 'all';
+let currentSort = '';    // '' = insertion order, or title / author / isbn
 let currentPage = 1;
 let pageSize = 15;
 let totalPages = 1;
+let totalBooksCount = 0;
+let catalogEtag = null;  // ETag of the last /books response (catalog version)
+let changeFeed = null;   // EventSource on /books/changes
+let refreshTimer = null;
+
+// Find a book among the loaded page or the latest search results
+function findLoadedBook(isbn) {
+    return currentBooks.find(b => b.isbn === isbn) || searchResultBooks.find(b => b.isbn === isbn);
+}
 
 // Toast notification function
 function showToast(message, type = 'success') {
@@ -49,15 +60,42 @@ async function checkApiStatus() {
     }
 }
 
-// Fetch and display books
+// Build the /books query for the current page, filter and sort
+function buildBooksQuery() {
+    const params = new URLSearchParams({
+        limit: pageSize,
+        offset: (currentPage - 1) * pageSize
+    });
+    if (currentSort) params.set('sort', currentSort);
+    switch(currentFilter) {
+        case 'available': params.set('is_borrowed', 'false'); break;
+        case 'borrowed': params.set('is_borrowed', 'true'); break;
+        case 'physical': params.set('book_type', 'Physical'); break;
+        case 'digital': params.set('book_type', 'Digital'); break;
+        case 'audio': params.set('book_type', 'Audio'); break;
+    }
+    return params.toString();
+}
+
+// Fetch and display the current page of books (server-side pagination)
 async function fetchBooks() {
     try {
-        const response = await fetch(`${API_BASE}/books`);
+        const response = await fetch(`${API_BASE}/books?${buildBooksQuery()}`);
         const books = await response.json();
+        totalBooksCount = parseInt(response.headers.get('X-Total-Count') || books.length, 10);
+        catalogEtag = response.headers.get('ETag') || catalogEtag;
+        
+        // Page emptied (e.g. last book on it deleted): step back to the last page
+        const lastPage = Math.max(1, Math.ceil(totalBooksCount / pageSize));
+        if (books.length === 0 && currentPage > lastPage) {
+            currentPage = lastPage;
+            return fetchBooks();
+        }
         
         currentBooks = books;
-        displayBooks(books, currentFilter);
-        updateStatistics(books);
+        displayBooks(books, totalBooksCount);
+        fetchStatistics();
+        connectChangeFeed();
         
     } catch (error) {
         document.getElementById('booksList').innerHTML = `
@@ -69,39 +107,120 @@ async function fetchBooks() {
     }
 }
 
-// Display books with pagination and filtering
-function displayBooks(books, filter = 'all') {
+// ---------- Live updates (Server-Sent Events) ----------
+// The server pushes add / update / remove deltas; the page on screen is patched
+// in place instead of re-downloading it after every change.
+function connectChangeFeed() {
+    if (changeFeed || !window.EventSource) return;
+    // Start from the catalog version of the list we already have
+    const since = catalogEtag ? `?since=${encodeURIComponent(catalogEtag)}` : '';
+    changeFeed = new EventSource(`${API_BASE}/books/changes${since}`);
+    ['add', 'update', 'remove'].forEach(op => {
+        changeFeed.addEventListener(op, event => applyBookChange(op, JSON.parse(event.data)));
+    });
+    // The server no longer has the changes we missed: reload the page
+    changeFeed.addEventListener('reset', () => fetchBooks());
+}
+
+function changeFeedLive() {
+    return changeFeed !== null && changeFeed.readyState === EventSource.OPEN;
+}
+
+// After a local add / borrow / edit / delete: the feed delivers the change itself
+function refreshAfterChange() {
+    if (changeFeedLive()) return;
+    fetchBooks();
+    checkApiStatus();
+    const searchQuery = document.getElementById('searchQuery')?.value?.trim();
+    if (searchQuery) {
+        searchBooks(searchQuery);
+    }
+}
+
+// Coalesce follow-up requests when many changes arrive at once
+function scheduleRefresh(reloadPage) {
+    if (refreshTimer && !reloadPage) return;
+    clearTimeout(refreshTimer);
+    refreshTimer = setTimeout(() => {
+        refreshTimer = null;
+        if (reloadPage) {
+            fetchBooks();  // also refreshes statistics
+        } else {
+            fetchStatistics();
+        }
+        checkApiStatus();
+    }, 250);
+}
+
+function matchesCurrentFilter(book) {
+    switch(currentFilter) {
+        case 'available': return !book.is_borrowed;
+        case 'borrowed': return book.is_borrowed;
+        case 'physical': return book.book_type === 'Physical';
+        case 'digital': return book.book_type === 'Digital';
+        case 'audio': return book.book_type === 'Audio';
+        default: return true;
+    }
+}
+
+// Key of a book in the current sorted view (mirrors the server's case-insensitive sort_key)
+function sortValue(book) {
+    switch(currentSort) {
+        case 'title': return (book.title || '').toLowerCase();
+        case 'author': return ((book.authors && book.authors[0]) || 'Unknown Author').toLowerCase();
+        default: return book.isbn;
+    }
+}
+
+function applyBookChange(op, change) {
+    const index = currentBooks.findIndex(b => b.isbn === change.isbn);
+    const matches = op !== 'remove' && matchesCurrentFilter(change.book);
+    let reloadPage = false;
+
+    if (index !== -1 && matches) {
+        // A new sort key can move the book elsewhere on this page or to another page
+        reloadPage = !!currentSort && sortValue(currentBooks[index]) !== sortValue(change.book);
+        currentBooks[index] = change.book;
+    } else if (index !== -1) {
+        // Removed or filtered out: books from the next page would shift into this one
+        currentBooks.splice(index, 1);
+        totalBooksCount = Math.max(0, totalBooksCount - 1);
+        reloadPage = currentPage < totalPages;
+    } else if (op === 'add' && matches && !currentSort) {
+        // Insertion order: a new book goes to the end of the last page
+        totalBooksCount += 1;
+        if (currentPage === totalPages && currentBooks.length < pageSize) {
+            currentBooks.push(change.book);
+        }
+    } else {
+        // Off-page change that may shift books across this page (removal, sorted or filtered view).
+        // The event carries only the new state, so in a sorted view any update may have moved
+        // the book into (or across) this page
+        reloadPage = op === 'remove' || (op === 'add' ? matches : currentFilter !== 'all' || !!currentSort);
+    }
+
+    if (reloadPage) {
+        scheduleRefresh(true);
+    } else {
+        displayBooks(currentBooks, totalBooksCount);
+        scheduleRefresh(false);
+    }
+
+    const searchQuery = document.getElementById('searchQuery')?.value?.trim();
+    if (searchQuery && (op === 'add' || searchResultBooks.some(b => b.isbn === change.isbn))) {
+        searchBooks(searchQuery);
+    }
+}
+
+// Display one page of books (already filtered and paginated by the server)
+function displayBooks(books, totalCount) {
     const booksList = document.getElementById('booksList');
     const bookCount = document.getElementById('bookCount');
     
-    // Filter books
-    let filteredBooks = books;
-    switch(filter) {
-        case 'available':
-            filteredBooks = books.filter(book => !book.is_borrowed);
-            break;
-        case 'borrowed':
-            filteredBooks = books.filter(book => book.is_borrowed);
-            break;
-        case 'physical':
-            filteredBooks = books.filter(book => (book.book_type || 'Physical') === 'Physical');
-            break;
-        case 'digital':
-            filteredBooks = books.filter(book => book.book_type === 'Digital');
-            break;
-        case 'audio':
-            filteredBooks = books.filter(book => book.book_type === 'Audio');
-            break;
-        default:
-            filteredBooks = books;
-    }
-    
-    updatePagination(filteredBooks.length);
-    const paginatedBooks = getPaginatedBooks(filteredBooks, currentPage, pageSize);
-    
-    bookCount.textContent = `${filteredBooks.length} books`;
+    updatePagination(totalCount);
+    bookCount.textContent = `${totalCount} books`;
     
-    if (filteredBooks.length === 0) {
+    if (books.length === 0) {
         booksList.innerHTML = `
             <div class="text-center text-muted py-5">
                 <i class="fas fa-book-open fa-3x mb-3"></i>
@@ -112,7 +231,7 @@ function displayBooks(books, filter = 'all') {
         return;
     }
 
-    const booksHtml = paginatedBooks.map((book, index) => {
+    const booksHtml = books.map((book, index) => {
         const globalIndex = (currentPage - 1) * pageSize + index;
         const bookType = book.book_type || 'Physical';
         
@@ -266,14 +385,8 @@ function toggleBooksSection() {
 }
 
 // Pagination functions
-function getPaginatedBooks(books, page, size) {
-    const startIndex = (page - 1) * size;
-    const endIndex = startIndex + size;
-    return books.slice(startIndex, endIndex);
-}
-
 function updatePagination(totalBooks) {
-    totalPages = Math.ceil(totalBooks / pageSize);
+    totalPages = Math.max(1, Math.ceil(totalBooks / pageSize));
     
     const pageInfo = document.getElementById('pageInfo');
     const paginationNav = document.getElementById('paginationNav');
@@ -372,12 +485,10 @@ function changePage(newPage) {
     const scrollPosition = window.pageYOffset;
     
     currentPage = newPage;
-    displayBooks(currentBooks, currentFilter);
-    
-    // Restore scroll position after a brief delay to let DOM update
-    setTimeout(() => {
+    fetchBooks().then(() => {
+        // Restore scroll position once the new page is rendered
         window.scrollTo(0, scrollPosition);
-    }, 50);
+    });
 }
 
 function changePageSize() {
@@ -386,7 +497,7 @@ function changePageSize() {
         const newSize = parseInt(pageSizeElement.value);
         pageSize = newSize;
         currentPage = 1;
-        displayBooks(currentBooks, currentFilter);
+        fetchBooks();
     }
 }
 
@@ -420,16 +531,37 @@ function filterBooks(filter) {
     const filterBtn = document.getElementById(`filter-${filter}`);
     if (filterBtn) filterBtn.classList.add('active');
     
-    displayBooks(currentBooks, filter);
+    fetchBooks();
+}
+
+function changeSort() {
+    const sortElement = document.getElementById('sortBy');
+    if (sortElement) {
+        currentSort = sortElement.value;
+        currentPage = 1;
+        fetchBooks();
+    }
+}
+
+// Fetch catalog-wide statistics (the page in currentBooks is not the whole catalog)
+async function fetchStatistics() {
+    try {
+        const response = await fetch(`${API_BASE}/statistics`);
+        if (response.ok) {
+            updateStatistics(await response.json());
+        }
+    } catch (error) {
+        console.error('Statistics error:', error);
+    }
 }
 
 // Update statistics
-function updateStatistics(books) {
-    const totalBooks = books.length;
-    const borrowedBooks = books.filter(book => book.is_borrowed).length;
-    const physicalBooks = books.filter(book => (book.book_type || 'Physical') === 'Physical').length;
-    const digitalBooks = books.filter(book => book.book_type === 'Digital').length;
-    const audioBooks = books.filter(book => book.book_type === 'Audio').length;
+function updateStatistics(stats) {
+    const totalBooks = stats.total_books;
+    const borrowedBooks = stats.borrowed_books;
+    const physicalBooks = stats.physical_books;
+    const digitalBooks = stats.digital_books;
+    const audioBooks = stats.audio_books;
     
     const totalBooksEl = document.getElementById('totalBooks');
     const borrowedBooksEl = document.getElementById('borrowedBooks');
@@ -466,8 +598,7 @@ async function addBook(isbn, bookType = 'Physical', extraData = {}) {
         if (response.ok) {
             const book = await response.json();
             showToast(`✅ Book added: ${book.title}`, 'success');
-            fetchBooks();
-            checkApiStatus();
+            refreshAfterChange();
         } else {
             const error = await response.json();
             showToast(`❌ Error: ${error.detail}`, 'danger');
@@ -495,8 +626,7 @@ async function addManualBook(bookData) {
         if (response.ok) {
             const book = await response.json();
             showToast(`✅ Manual book added: ${book.title}`, 'success');
-            fetchBooks();
-            checkApiStatus();
+            refreshAfterChange();
         } else {
             const errorText = await response.text();
             console.error('Manual book error:', response.status, errorText);
@@ -521,7 +651,7 @@ async function addManualBook(bookData) {
 async function borrowBook(isbn) {
     try {
         // Find the book to determine current status
-        const book = currentBooks.find(b => b.isbn === isbn);
+        const book = findLoadedBook(isbn);
         if (!book) {
             showToast('❌ Book not found', 'danger');
             return;
@@ -544,19 +674,8 @@ async function borrowBook(isbn) {
             const icon = action === 'borrow' ? '📚' : '📖';
             showToast(`${icon} Book ${actionText}: ${updatedBook.title}`, 'success');
             
-            // Refresh books and update search results if any
-            fetchBooks();
-            
-            // If there are search results, refresh them too
-            const searchQuery = document.getElementById('searchQuery')?.value?.trim();
-            if (searchQuery) {
-                // Small delay to ensure currentBooks is updated
-                setTimeout(() => {
-                    searchBooks(searchQuery);
-                }, 100);
-            }
-            
-            checkApiStatus();
+            // Refresh books and search results (unless the change feed delivers it)
+            refreshAfterChange();
         } else {
             const error = await response.json();
             showToast(`❌ Error: ${error.detail}`, 'danger');
@@ -581,18 +700,8 @@ async function returnBook(isbn) {
             const updatedBook = await response.json();
             showToast(`📖 Book returned: ${updatedBook.title}`, 'success');
             
-            // Refresh books and update search results if any
-            fetchBooks();
-            
-            // If there are search results, refresh them too
-            const searchQuery = document.getElementById('searchQuery')?.value?.trim();
-            if (searchQuery) {
-                setTimeout(() => {
-                    searchBooks(searchQuery);
-                }, 100);
-            }
-            
-            checkApiStatus();
+            // Refresh books and search results (unless the change feed delivers it)
+            refreshAfterChange();
         } else {
             const error = await response.json();
             showToast(`❌ Error: ${error.detail}`, 'danger');
@@ -605,7 +714,7 @@ async function returnBook(isbn) {
 // Edit book function - MODERN VERSION WITH MODAL
 function editBook(isbn) {
     // Find the book
-    const book = currentBooks.find(b => b.isbn === isbn);
+    const book = findLoadedBook(isbn);
     if (!book) {
         showToast('❌ Book not found', 'danger');
         return;
@@ -767,7 +876,7 @@ async function saveBookEdit() {
             modal.hide();
             
             // Refresh books list
-            fetchBooks();
+            refreshAfterChange();
         } else {
             const errorText = await response.text();
             console.error('Update error:', response.status, errorText);
@@ -801,8 +910,7 @@ async function deleteBook(isbn) {
 
         if (response.ok) {
             showToast('✅ Book deleted successfully', 'success');
-            fetchBooks();
-            checkApiStatus();
+            refreshAfterChange();
         } else {
             const error = await response.json();
             showToast(`❌ Error: ${error.detail}`, 'danger');
@@ -812,28 +920,18 @@ async function deleteBook(isbn) {
     }
 }
 
-// Search books (local search)
-function searchBooks(query) {
+// Search books (server-side, index-backed)
+async function searchBooks(query) {
     try {
-        if (!currentBooks || currentBooks.length === 0) {
-            const searchResults = document.getElementById('searchResults');
-            if (searchResults) {
-                searchResults.innerHTML = `
-                    <div class="alert alert-warning">
-                        <i class="fas fa-exclamation-triangle"></i>
-                        No books loaded. Please load books first.
-                    </div>
-                `;
-            }
-            return;
+        const params = new URLSearchParams({ query: query.trim(), limit: 60 });
+        const response = await fetch(`${API_BASE}/books/search?${params}`);
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail || response.status);
         }
-        
-        const searchQuery = query.toLowerCase().trim();
-        const matchedBooks = currentBooks.filter(book => 
-            book.title.toLowerCase().includes(searchQuery) ||
-            book.authors.some(author => author.toLowerCase().includes(searchQuery)) ||
-            book.isbn.includes(searchQuery)
-        );
+        const matchedBooks = await response.json();
+        const totalMatches = parseInt(response.headers.get('X-Total-Count') || matchedBooks.length, 10);
+        searchResultBooks = matchedBooks;
         
         const searchResults = document.getElementById('searchResults');
         if (searchResults) {
@@ -885,7 +983,7 @@ function searchBooks(query) {
                 
                 searchResults.innerHTML = `
                     <div class="alert alert-success mb-3">
-                        <i class="fas fa-check"></i> Found ${matchedBooks.length} book(s) matching "${query}"
+                        <i class="fas fa-check"></i> Found ${totalMatches} book(s) matching "${query}"${totalMatches > matchedBooks.length ? ` (showing top ${matchedBooks.length})` : ''}
                     </div>
                     <div class="row">
                         ${resultsHtml}
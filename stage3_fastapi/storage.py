@@ -0,0 +1,126 @@
+"""
+Depolama yapılandırması: ortam değişkenlerinden uygun Library backend'ini kurar.
+
+Öncelik sırası:
+    1. LIBRARY_URL   -> "json:///app/data/library.json", "journal:///tmp/lib.json",
+                        "sqlite:///app/data/library.db?...",
+                        "writebehind:///app/data/library.json?flush_interval_ms=50&durability=group",
+                        "binary:///app/data/library.bin",
+                        "shared:///app/data/library.db" (uvicorn --workers N için)
+                        (parametreler backend'e geçer)
+    2. LIBRARY_FILE  -> dosya yolu; backend LIBRARY_BACKEND'den ya da uzantıdan
+                        (.db / .sqlite / .sqlite3 -> sqlite, .bin -> binary) seçilir
+    3. Hiçbiri yoksa -> modül yanındaki library.json (LIBRARY_BACKEND=sqlite ise library.db,
+                        binary ise library.bin)
+
+`?columnar=true` (ya da LIBRARY_COLUMNAR=1) filtreli listeleme için numpy sütun
+deposunu açar (bkz. columnar.py); diğer parametreler backend'e geçer.
+
+URL'de "scheme://" sonrası dosya yoludur; "sqlite:///data/x.db" mutlak, "sqlite://x.db"
+göreli yoldur. Ortamdan gelen göreli yollar çalışma dizinine göre çözülür.
+"""
+
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Callable, Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from stage3_fastapi.library import Library
+from stage3_fastapi.binary_library import BinaryLibrary
+from stage3_fastapi.journal import JournalLibrary
+from stage3_fastapi.shared_library import SharedLibrary
+from stage3_fastapi.sqlite_library import SQLiteLibrary
+from stage3_fastapi.write_behind import WriteBehindLibrary
+
+LibraryFactory = Callable[..., Library]
+
+# scheme -> factory(filename, **options)
+BACKENDS: dict[str, LibraryFactory] = {
+    "json": Library,
+    "journal": JournalLibrary,
+    "sqlite": SQLiteLibrary,
+    "writebehind": WriteBehindLibrary,
+    "binary": BinaryLibrary,
+    "shared": SharedLibrary,
+}
+
+DEFAULT_FILENAMES = {"sqlite": "library.db", "binary": "library.bin", "shared": "library.db"}
+# LIBRARY_BACKEND verilmediğinde dosya uzantısından seçilen backend
+SUFFIX_BACKENDS = {".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite", ".bin": "binary"}
+
+
+def register_backend(scheme: str, factory: LibraryFactory) -> None:
+    """Yeni bir depolama şeması ekler (ör. testler veya harici backend'ler için)."""
+    BACKENDS[scheme.lower()] = factory
+
+
+def _coerce(value: str):
+    """URL parametrelerini int/float/bool'a çevirmeye çalışır."""
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_storage_url(url: str) -> tuple[str, str, dict]:
+    """"scheme://path?opt=1" -> (scheme, path, options)."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{scheme}' in LIBRARY_URL (known: {', '.join(sorted(BACKENDS))})")
+    path = parts.netloc + parts.path
+    if not path:
+        raise ValueError(f"Storage URL '{url}' has no file path")
+    options = {key: _coerce(value) for key, value in parse_qsl(parts.query)}
+    return scheme, path, options
+
+
+def _prepare_path(path: str) -> str:
+    """Yolu mutlak hale getirir ve üst dizini (ör. mount edilmemiş volume) oluşturur."""
+    # Library göreli isimleri modül dizinine göre çözer; ortamdan gelen yollar ise CWD'ye göredir
+    resolved = Path(path).expanduser().resolve()
+    resolved.parent.mkdir(parents=True, exist_ok=True)
+    return str(resolved)
+
+
+def create_library(url: Optional[str] = None, env: Optional[Mapping[str, str]] = None) -> Library:
+    """Verilen URL'ye ya da ortam değişkenlerine göre Library örneği oluşturur."""
+    env = os.environ if env is None else env
+    columnar = _coerce(env.get("LIBRARY_COLUMNAR", "false")) in (True, 1)
+    url = url or env.get("LIBRARY_URL")
+    if url:
+        scheme, path, options = parse_storage_url(url)
+        columnar = options.pop("columnar", columnar)
+        return _with_options(BACKENDS[scheme](_prepare_path(path), **options), columnar)
+
+    backend = env.get("LIBRARY_BACKEND", "").lower()
+    library_file = env.get("LIBRARY_FILE")
+    if library_file:
+        if not backend:
+            backend = SUFFIX_BACKENDS.get(Path(library_file).suffix.lower(), "json")
+        filename = _prepare_path(library_file)
+    else:
+        backend = backend or "json"
+        filename = DEFAULT_FILENAMES.get(backend, "library.json")
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LIBRARY_BACKEND '{backend}' (known: {', '.join(sorted(BACKENDS))})")
+    return _with_options(BACKENDS[backend](filename), columnar)
+
+
+def _with_options(library: Library, columnar: bool) -> Library:
+    if columnar:
+        library.enable_columnar()
+    return library
+
+
+def describe_storage(library: Library) -> dict[str, str]:
+    """Health çıktısı için aktif backend ve dosya yolu."""
+    backend = next((scheme for scheme, factory in BACKENDS.items() if type(library) is factory), type(library).__name__)
+    return {"backend": backend, "path": str(library._db_path)}
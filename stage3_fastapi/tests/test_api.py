@@ -4,6 +4,8 @@ Stage 3 FastAPI Tests
 
 import pytest
 import httpx
+import asyncio
+import json
 from fastapi.testclient import TestClient
 from pathlib import Path
 import tempfile
@@ -13,6 +15,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from api import app
 from library import Library
+from stage3_fastapi.openlibrary import OpenLibraryClient
+from stage3_fastapi.snapshot import load_snapshot
 
 # Test client
 client = TestClient(app)
@@ -32,6 +36,18 @@ class FakeResponse:
             request = httpx.Request("GET", self.url)
             raise httpx.HTTPStatusError("HTTP error", request=request, response=self)
 
+def use_fake_openlibrary(monkeypatch, fake_get):
+    """Route the library's async Open Library client through a fake_get(url, ...) function."""
+    from api import library
+
+    def handler(request):
+        fake = fake_get(str(request.url), timeout=10.0, follow_redirects=True)
+        return httpx.Response(fake.status_code, json=fake._data, request=request)
+
+    client = OpenLibraryClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(library, "openlibrary", client)
+    return client
+
 @pytest.fixture
 def temp_library(monkeypatch, tmp_path):
     """Create a temporary library for testing"""
@@ -93,7 +109,7 @@ def test_add_book_by_isbn_success(temp_library, monkeypatch):
             return FakeResponse(200, {"name": "Roald Dahl"})
         return FakeResponse(404, {})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     response = client.post("/books", json={"isbn": isbn})
     
@@ -111,7 +127,7 @@ def test_add_book_invalid_isbn(temp_library, monkeypatch):
     def fake_get(url, timeout=10.0, follow_redirects=True):
         return FakeResponse(404, {})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     response = client.post("/books", json={"isbn": isbn})
     
@@ -130,7 +146,7 @@ def test_add_duplicate_book(temp_library, monkeypatch):
             })
         return FakeResponse(200, {"name": "Test Author"})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     # Add book first time
     response1 = client.post("/books", json={"isbn": isbn})
@@ -153,7 +169,7 @@ def test_get_book_by_isbn(temp_library, monkeypatch):
             })
         return FakeResponse(200, {"name": "Test Author"})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     # First add a book
     client.post("/books", json={"isbn": isbn})
@@ -183,7 +199,7 @@ def test_delete_book_success(temp_library, monkeypatch):
             })
         return FakeResponse(200, {"name": "Test Author"})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     # First add a book
     client.post("/books", json={"isbn": isbn})
@@ -222,7 +238,7 @@ def test_list_books_with_data(temp_library, monkeypatch):
             return FakeResponse(200, {"name": "Author Two"})
         return FakeResponse(404, {})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     # Add some books
     client.post("/books", json={"isbn": "9780140328721"})
@@ -250,7 +266,7 @@ def test_api_workflow(temp_library, monkeypatch):
             })
         return FakeResponse(200, {"name": "Workflow Author"})
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     # 1. Start with empty library
     response = client.get("/books")
@@ -298,8 +314,286 @@ def test_network_error_handling(temp_library, monkeypatch):
     def fake_get(url, timeout=10.0, follow_redirects=True):
         raise httpx.RequestError("Network error", request=httpx.Request("GET", url))
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    use_fake_openlibrary(monkeypatch, fake_get)
 
     response = client.post("/books", json={"isbn": "9780140328721"})
     assert response.status_code == 400
     assert "Failed to add book" in response.json()["detail"]
+
+def add_manual_books(count, **extra):
+    """Add simple manual books with predictable titles (Book 00, Book 01, ...)."""
+    for i in range(count):
+        response = client.post("/books/manual", json={
+            "isbn": f"isbn-{i:02d}",
+            "title": f"Book {count - 1 - i:02d}",
+            "authors": [f"Author {i % 3}"],
+            **extra,
+        })
+        assert response.status_code == 201
+
+def test_list_books_limit_offset_and_total(temp_library):
+    """Test server-side pagination with limit/offset"""
+    add_manual_books(5)
+
+    response = client.get("/books", params={"limit": 2, "offset": 2})
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "5"
+    assert [b["isbn"] for b in response.json()] == ["isbn-02", "isbn-03"]
+
+def test_list_books_sorted_cursor_pagination(temp_library):
+    """Test walking all pages with an opaque cursor while sorting by title"""
+    add_manual_books(5)
+
+    seen = []
+    params = {"limit": 2, "sort": "title"}
+    while True:
+        response = client.get("/books", params=params)
+        assert response.status_code == 200
+        seen.extend(b["title"] for b in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "sort": "title", "cursor": cursor}
+    assert seen == [f"Book {i:02d}" for i in range(5)]
+
+    response = client.get("/books", params={"limit": 2, "sort": "title", "order": "desc"})
+    assert [b["title"] for b in response.json()] == ["Book 04", "Book 03"]
+
+def test_list_books_cursor_survives_inserts(temp_library):
+    """A cursor continues after the last seen key even if earlier rows are added"""
+    add_manual_books(4)
+    first = client.get("/books", params={"limit": 2, "sort": "isbn"})
+    client.post("/books/manual", json={"isbn": "isbn-00a", "title": "Late", "authors": ["X"]})
+
+    second = client.get("/books", params={"limit": 2, "sort": "isbn", "cursor": first.headers["X-Next-Cursor"]})
+    assert [b["isbn"] for b in second.json()] == ["isbn-02", "isbn-03"]
+    assert second.headers["X-Total-Count"] == "5"
+
+def test_list_books_unsorted_cursor_survives_deletes(temp_library):
+    """An insertion-order cursor resumes after the last seen book even if it was deleted"""
+    add_manual_books(5)
+    first = client.get("/books", params={"limit": 2})
+    assert [b["isbn"] for b in first.json()] == ["isbn-00", "isbn-01"]
+    client.delete("/books/isbn-00")
+    client.delete("/books/isbn-01")
+
+    second = client.get("/books", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [b["isbn"] for b in second.json()] == ["isbn-02", "isbn-03"]
+    third = client.get("/books", params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]})
+    assert [b["isbn"] for b in third.json()] == ["isbn-04"]
+    assert "X-Next-Cursor" not in third.headers
+
+def test_list_books_unsorted_cursor_rejected_after_reload(temp_library):
+    """An insertion-order cursor from before a catalog reload is rejected, not misapplied"""
+    add_manual_books(6)
+    client.delete("/books/isbn-00")
+    client.delete("/books/isbn-01")
+    first = client.get("/books", params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    assert [b["isbn"] for b in client.get("/books", params={"limit": 2, "cursor": cursor}).json()] == \
+        ["isbn-04", "isbn-05"]
+
+    temp_library.load_books()
+    response = client.get("/books", params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert "first page" in response.json()["detail"]
+
+def test_list_books_filters_and_invalid_cursor(temp_library):
+    """Test book_type / is_borrowed filters and cursor validation"""
+    add_manual_books(3)
+    client.post("/books/manual", json={"isbn": "audio-1", "title": "Audio", "authors": ["N"], "book_type": "Audio"})
+    client.post("/books/isbn-01/borrow", json={"action": "borrow"})
+
+    response = client.get("/books", params={"book_type": "Audio"})
+    assert [b["isbn"] for b in response.json()] == ["audio-1"]
+    assert response.headers["X-Total-Count"] == "1"
+
+    response = client.get("/books", params={"is_borrowed": True})
+    assert [b["isbn"] for b in response.json()] == ["isbn-01"]
+
+    assert client.get("/books", params={"cursor": "not-a-cursor"}).status_code == 400
+    cursor = client.get("/books", params={"limit": 1, "sort": "title"}).headers["X-Next-Cursor"]
+    assert client.get("/books", params={"limit": 1, "sort": "author", "cursor": cursor}).status_code == 400
+
+def test_search_endpoint_is_reachable(temp_library):
+    """/books/search must not be shadowed by /books/{isbn}"""
+    client.post("/books/manual", json={"isbn": "1", "title": "Python Tricks", "authors": ["Dan Bader"], "book_type": "Digital"})
+    client.post("/books/manual", json={"isbn": "2", "title": "Fluent Python", "authors": ["Luciano Ramalho"]})
+    client.post("/books/manual", json={"isbn": "3", "title": "Dune", "authors": ["Frank Herbert"]})
+
+    response = client.get("/books/search", params={"query": "pyth"})
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "2"
+    assert {b["isbn"] for b in response.json()} == {"1", "2"}
+    assert response.json()[0]["author"]
+
+    response = client.get("/books/search", params={"query": "python", "book_type": "Digital"})
+    assert [b["isbn"] for b in response.json()] == ["1"]
+
+    response = client.get("/books/search", params={"query": "python", "limit": 1, "offset": 1})
+    assert len(response.json()) == 1
+
+def test_bulk_import_streams_results_and_commits_once(temp_library, monkeypatch):
+    """Test POST /books/bulk with NDJSON streaming and a single batched save"""
+    titles = {f"97800000000{i:02d}": f"Bulk Book {i}" for i in range(5)}
+
+    def fake_get(url, timeout=10.0, follow_redirects=True):
+        for isbn, title in titles.items():
+            if url.endswith(f"/isbn/{isbn}.json"):
+                return FakeResponse(200, {"title": title, "by_statement": "Various"})
+        return FakeResponse(404, {})
+
+    use_fake_openlibrary(monkeypatch, fake_get)
+    saves = []
+    original_save = type(temp_library).save_books
+    monkeypatch.setattr(type(temp_library), "save_books", lambda self: (saves.append(1), original_save(self)))
+
+    payload = [{"isbn": isbn, "book_type": "Digital"} for isbn in titles]
+    payload += [{"isbn": "9780000000000"}, {"isbn": "9789999999999"}, {"isbn": "123"}]
+    response = client.post("/books/bulk?concurrency=3", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    summary = lines.pop()["summary"]
+    assert summary == {"total": 8, "added": 5, "exists": 1, "not_found": 1, "invalid": 1}
+    added = [line for line in lines if line["status"] == "added"]
+    assert {line["book"]["book_type"] for line in added} == {"Digital"}
+    assert len(saves) == 1
+    assert len(load_snapshot(temp_library._db_path)) == 5
+
+    # NDJSON gövde + tek JSON yanıt
+    body = "\n".join(json.dumps({"isbn": isbn}) for isbn in list(titles)[:2])
+    response = client.post("/books/bulk?stream=false", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.json()["summary"] == {"total": 2, "exists": 2}
+
+def test_statistics_and_health_use_counters(temp_library):
+    """Test /statistics and /health counts after mutations"""
+    add_manual_books(3)
+    client.post("/books/isbn-01/borrow", json={"action": "borrow"})
+    client.put("/books/isbn-02", json={"book_type": "Digital", "file_format": "PDF"})
+    client.delete("/books/isbn-00")
+
+    stats = client.get("/statistics").json()
+    assert stats["total_books"] == 2 and stats["borrowed_books"] == 1 and stats["available_books"] == 1
+    assert (stats["physical_books"], stats["digital_books"], stats["audio_books"]) == (1, 1, 0)
+    assert stats["by_file_format"] == {"PDF": 1}
+    assert client.get("/health").json()["total_books"] == 2
+
+def test_conditional_get_with_etags(temp_library):
+    """Test 304 on If-None-Match and new ETags after mutations"""
+    add_manual_books(2)
+    listing = client.get("/books")
+    book = client.get("/books/isbn-00")
+    stats = client.get("/statistics")
+    assert listing.headers["Cache-Control"] == "no-cache"
+
+    for path, first in (("/books", listing), ("/books/isbn-00", book), ("/statistics", stats)):
+        response = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert response.status_code == 304 and response.content == b""
+        assert response.headers["ETag"] == first.headers["ETag"]
+
+    client.post("/books/isbn-01/borrow", json={"action": "borrow"})
+    # Another book changed: this book keeps its ETag, the listing gets a new one
+    assert client.get("/books/isbn-00", headers={"If-None-Match": book.headers["ETag"]}).status_code == 304
+    changed = client.get("/books", headers={"If-None-Match": listing.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != listing.headers["ETag"]
+    assert client.get("/statistics", headers={"If-None-Match": stats.headers["ETag"]}).json()["borrowed_books"] == 1
+
+def test_if_match_rejects_stale_updates(temp_library):
+    """Test optimistic concurrency with If-Match on PUT and borrow"""
+    add_manual_books(1)
+    etag = client.get("/books/isbn-00").headers["ETag"]
+
+    updated = client.put("/books/isbn-00", json={"title": "First"}, headers={"If-Match": etag})
+    assert updated.status_code == 200 and updated.headers["ETag"] != etag
+
+    stale = client.put("/books/isbn-00", json={"title": "Second"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.post("/books/isbn-00/borrow", json={"action": "borrow"},
+                       headers={"If-Match": etag}).status_code == 412
+    assert client.get("/books/isbn-00").json()["title"] == "First"
+
+    borrowed = client.post("/books/isbn-00/borrow", json={"action": "borrow"},
+                           headers={"If-Match": updated.headers["ETag"]})
+    assert borrowed.status_code == 200 and borrowed.json()["is_borrowed"] is True
+
+def read_events(stream, count):
+    """Collect `count` SSE events (skipping retry/keepalive lines) from change_stream."""
+    async def collect():
+        events = []
+        async for chunk in stream:
+            fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n") if ": " in line)
+            if "event" in fields:
+                events.append((fields["event"], fields["id"], json.loads(fields["data"])))
+                if len(events) == count:
+                    break
+        await stream.aclose()
+        return events
+    return asyncio.run(asyncio.wait_for(collect(), 5))
+
+def test_change_stream_resumes_from_last_event_id(temp_library):
+    """Test the SSE feed replays missed changes, coalescing repeated ones"""
+    from api import change_stream
+    add_manual_books(1)
+    [(event, ready_id, data)] = read_events(change_stream(None), 1)
+    assert event == "ready"
+
+    client.put("/books/isbn-00", json={"title": "Renamed"})
+    client.post("/books/manual", json={"isbn": "isbn-01", "title": "Other", "authors": ["B"]})
+    client.post("/books/isbn-01/borrow", json={"action": "borrow"})
+    client.delete("/books/isbn-00")
+
+    events = read_events(change_stream(ready_id), 2)
+    assert [(e, d["isbn"]) for e, _, d in events] == [("update", "isbn-01"), ("remove", "isbn-00")]
+    assert events[0][2]["book"]["is_borrowed"] is True
+    assert int(events[1][1].rsplit("-", 1)[1]) == data["version"] + 4
+
+    # Unknown epoch: the client has to reload
+    assert read_events(change_stream("other-1"), 1)[0][0] == "reset"
+
+def test_change_stream_pushes_live_changes(temp_library):
+    """Test a waiting SSE client is woken up by a mutation"""
+    from api import change_stream, library
+    from library import Book
+
+    async def scenario():
+        stream = change_stream(None)
+        await anext(stream)  # retry
+        await anext(stream)  # ready
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        await library.aadd_book(Book("live-1", "Live", ["A"]))
+        chunk = await asyncio.wait_for(pending, 5)
+        await stream.aclose()
+        return chunk.decode()
+
+    chunk = asyncio.run(scenario())
+    assert "event: add" in chunk and '"title":"Live"' in chunk
+
+def test_durability_header_group_waits_for_flush(monkeypatch, tmp_path):
+    """Test X-Durability: group responds after the group commit is on disk, async right away"""
+    import api as api_module
+    from stage3_fastapi.write_behind import WriteBehindLibrary
+
+    path = tmp_path / "write_behind.json"
+    monkeypatch.setattr(WriteBehindLibrary, "_db_path", property(lambda self: path))
+    library = WriteBehindLibrary(flush_interval_ms=500, flush_max_pending=1000)
+    monkeypatch.setattr(api_module, "library", library)
+    try:
+        response = client.post("/books/manual", json={"isbn": "wb-1", "title": "Grouped", "authors": ["A"]},
+                               headers={"X-Durability": "async"})
+        assert response.status_code == 201
+        # async: the response does not wait for the (500 ms) group commit
+        assert library.stats()["pending"] == 1 and not path.exists()
+
+        response = client.post("/books/wb-1/borrow", json={"action": "borrow"},
+                               headers={"X-Durability": "group"})
+        assert response.status_code == 200
+        # group: by the time the response arrives both mutations are on disk
+        assert library.stats()["pending"] == 0
+        assert [(r["isbn"], r["is_borrowed"]) for r in load_snapshot(path)] == [("wb-1", True)]
+    finally:
+        library.close()
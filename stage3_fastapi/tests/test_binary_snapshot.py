@@ -0,0 +1,111 @@
+"""
+İkili snapshot biçimi, JSON dönüştürücü ve tembel yüklenen BinaryLibrary testleri
+"""
+
+import json
+
+import pytest
+
+from stage3_fastapi.binary_library import BinaryLibrary
+from stage3_fastapi.binary_snapshot import (BinarySnapshot, binary_to_json, json_to_binary,
+                                            write_binary_snapshot)
+from stage3_fastapi.library import book_to_row
+from stage3_fastapi.models import Book
+from stage3_fastapi.snapshot import load_snapshot
+from stage3_fastapi.storage import create_library
+
+
+@pytest.fixture
+def bin_path(tmp_path, monkeypatch):
+    path = tmp_path / "lib.bin"
+    monkeypatch.setattr(BinaryLibrary, "_db_path", property(lambda self: path))
+    return path
+
+
+def sample_books():
+    return [
+        Book("222", "Dune", ["Frank Herbert"], shelf_location="A-1"),
+        Book("111", "Çalıkuşu", ["Reşat Nuri"], is_borrowed=True, book_type="Digital",
+             file_size_mb=2.5, file_format="EPUB"),
+        Book("333", "Duo", ["A", "B"], book_type="Audio", duration_minutes=90, narrator="N"),
+        Book("444", "Nobody", []),
+    ]
+
+
+def test_roundtrip_preserves_rows_and_order(tmp_path):
+    path = tmp_path / "lib.bin"
+    rows = [book_to_row(b) for b in sample_books()]
+    assert write_binary_snapshot(path, rows) == 4
+
+    snapshot = BinarySnapshot(path)
+    snapshot.verify()
+    assert list(snapshot.rows()) == rows
+    assert snapshot.find("333") == 2 and snapshot.find("999") is None
+    assert snapshot.book(1).author == "Reşat Nuri"
+    snapshot.close()
+
+
+def test_truncated_or_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "lib.bin"
+    write_binary_snapshot(path, [book_to_row(b) for b in sample_books()])
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        BinarySnapshot(path)
+    path.write_text("[]", encoding="utf-8")
+    with pytest.raises(ValueError):
+        BinarySnapshot(path)
+
+
+def test_converter_handles_stage1_layout(tmp_path):
+    stage1 = tmp_path / "stage1.json"
+    stage1.write_text(json.dumps([{"title": "S1", "author": "Solo", "isbn": "1", "is_borrowed": True}]),
+                      encoding="utf-8")
+    binary, back = tmp_path / "lib.bin", tmp_path / "back.json"
+
+    assert json_to_binary(stage1, binary) == 1
+    assert binary_to_json(binary, back) == 1
+    assert load_snapshot(back) == [{"isbn": "1", "title": "S1", "authors": ["Solo"], "author": "Solo",
+                                    "is_borrowed": True, "book_type": "Physical"}]
+
+
+def test_library_decodes_books_lazily(bin_path):
+    write_binary_snapshot(bin_path, [book_to_row(b) for b in sample_books()])
+    lib = BinaryLibrary()
+
+    assert lib.count_books() == 4
+    assert lib._index._decoded == {}
+    assert lib.find_book("333").narrator == "N"
+    assert [b.isbn for b in lib.query_books(offset=1, limit=1)] == ["111"]
+    assert set(lib._index._decoded) == {1, 2}
+    # Sıralı indeks kitapları saklamadan kurulur; yalnızca dönen sayfa çözülür
+    assert [b.isbn for b in lib.query_books(sort="title", limit=1)] == ["222"]
+    assert set(lib._index._decoded) == {0, 1, 2}
+    assert [b.isbn for b in lib.search_books("dune")[0]] == ["222"]
+
+    # Ekleme sırası cursor'ı ISBN tablosundan kurulur, atlanan kitaplar çözülmez
+    assert [b.isbn for b in lib.query_books(after=(lib.order_key(lib.find_book("111"), None), "111"))] == \
+        ["333", "444"]
+    assert set(lib._index._decoded) == {0, 1, 2, 3}
+
+
+def test_library_mutations_persist(bin_path):
+    write_binary_snapshot(bin_path, [book_to_row(b) for b in sample_books()])
+    lib = BinaryLibrary()
+    lib.add_book(Book("555", "New", ["Z"]))
+    lib.borrow_book("222")
+    lib.update_book("333", title="Aaa")
+    assert lib.remove_book("444") is True
+    assert [b.isbn for b in lib.query_books(sort="title")] == ["333", "222", "555", "111"]
+
+    reloaded = BinaryLibrary()
+    assert [b.isbn for b in reloaded.list_books()] == ["222", "111", "333", "555"]
+    assert reloaded.find_book("222").is_borrowed is True
+    assert reloaded.find_book("333").title == "Aaa"
+    assert reloaded.find_book("444") is None
+
+
+def test_bin_extension_selects_binary_backend(tmp_path):
+    lib = create_library(env={"LIBRARY_FILE": str(tmp_path / "library.bin")})
+    assert isinstance(lib, BinaryLibrary)
+    lib.add_book(Book("1", "T", ["A"]))
+    assert BinaryLibrary(str(tmp_path / "library.bin")).find_book("1").title == "T"
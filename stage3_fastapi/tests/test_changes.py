@@ -0,0 +1,37 @@
+"""
+ChangeFeed: sürüm aralıkları, kayıp kayıtlar ve bekleyenlerin uyandırılması
+"""
+
+import asyncio
+import threading
+
+from stage3_fastapi.changes import ChangeFeed
+
+
+def test_since_returns_missed_changes_or_none_after_gap():
+    feed = ChangeFeed(maxlen=3)
+    feed.reset(10)
+    for version in range(11, 16):
+        feed.record(version, "update", str(version))
+
+    assert feed.version == 15
+    assert feed.since(15) == []
+    assert [v for v, _, _ in feed.since(13)] == [14, 15]
+    assert [v for v, _, _ in feed.since(12)] == [13, 14, 15]
+    assert feed.since(11) is None   # 12 artık saklanmıyor
+    assert feed.since(99) is None   # başka bir akışın sürümü
+
+    feed.reset(20)
+    assert feed.since(15) is None and feed.since(20) == []
+
+
+def test_wait_is_woken_from_another_thread():
+    feed = ChangeFeed()
+
+    async def scenario():
+        assert await feed.wait(0, timeout=0.01) is False
+        threading.Timer(0.05, feed.record, (1, "add", "x")).start()
+        return await feed.wait(0, timeout=5)
+
+    assert asyncio.run(scenario()) is True
+    assert feed.stats() == {"version": 1, "retained": 1, "subscribers": 0}
@@ -0,0 +1,84 @@
+"""
+Sütun deposu (BookStore) ve Library.enable_columnar testleri
+"""
+
+import random
+
+import pytest
+
+from stage3_fastapi.columnar import BookStore
+from stage3_fastapi.library import Library
+from stage3_fastapi.models import Book
+from stage3_fastapi.storage import create_library
+
+TYPES = ("Physical", "Digital", "Audio")
+
+
+@pytest.fixture
+def lib(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    monkeypatch.setattr(Library, "_db_path", property(lambda self: path))
+    return Library()
+
+
+def test_store_masks_follow_mutations():
+    store = BookStore([Book("1", "A", "X"), Book("2", "B", "Y", book_type="Digital", file_format="PDF")])
+    store.add(Book("3", "C", "X", is_borrowed=True, book_type="Audio"))
+    store.remove("2")
+    store.update(Book("1", "A", "Z", is_borrowed=True))
+
+    assert len(store) == 2
+    assert store.isbns(store.mask(is_borrowed=True)) == ["1", "3"]
+    assert store.isbns(store.mask(book_type="Digital")) == []
+    assert store.isbns(store.mask(book_type="Unknown")) == []
+    assert store.isbns(store.mask(book_type="Audio", is_borrowed=True)) == ["3"]
+    # Sayfa numpy'de dilimlenir: tersten sıra ve offset / limit
+    assert store.isbns(store.mask(), descending=True) == ["3", "1"]
+    assert store.isbns(store.mask(), descending=True, offset=1, limit=5) == ["1"]
+    assert store.isbns(store.mask(), offset=0, limit=1) == ["1"]
+
+
+def test_store_compaction_keeps_insertion_order():
+    store = BookStore(Book(str(i), "T", "A", book_type=TYPES[i % 3]) for i in range(3000))
+    for i in range(3000):
+        if i % 3:
+            store.remove(str(i))
+    store.add(Book("1", "Back", "A", book_type="Audio"))
+
+    assert store._dead < 2000
+    assert store.isbns(store.mask())[:3] == ["0", "3", "6"]
+    assert store.isbns(store.mask())[-1] == "1"
+    assert store.isbns(store.mask(book_type="Audio")) == ["1"]
+    assert len(store.isbns(store.mask(book_type="Physical"))) == 1000
+
+
+def test_columnar_library_matches_object_scans(lib):
+    rng = random.Random(3)
+    for i in range(300):
+        lib.add_book(Book(str(i), f"T{i}", "A", book_type=rng.choice(TYPES)))
+    for i in range(0, 300, 7):
+        lib.borrow_book(str(i))
+    for i in range(0, 300, 11):
+        lib.remove_book(str(i))
+    lib.update_book("1", book_type="Audio")
+
+    expected = {(t, b): lib.count_books(book_type=t, is_borrowed=b) for t in (None,) + TYPES for b in (None, True, False)}
+    pages = [lib.query_books(book_type="Digital", offset=5, limit=10, descending=d) for d in (False, True)]
+    counts = lib.book_counts()
+
+    lib.enable_columnar()
+    assert {key: lib.count_books(book_type=key[0], is_borrowed=key[1]) for key in expected} == expected
+    assert [lib.query_books(book_type="Digital", offset=5, limit=10, descending=d) for d in (False, True)] == pages
+    assert lib.book_counts() == counts
+
+    lib.return_book("7")
+    lib.add_book(Book("new", "N", "A", book_type="Digital", is_borrowed=True))
+    assert lib.count_books(is_borrowed=True) == expected[(None, True)]
+    assert lib.count_books(book_type="Digital") == expected[("Digital", None)] + 1
+
+
+def test_columnar_storage_option(tmp_path):
+    lib = create_library(env={"LIBRARY_URL": f"json://{tmp_path}/lib.json?columnar=true"})
+    assert isinstance(lib._columns, BookStore)
+    assert create_library(env={"LIBRARY_FILE": str(tmp_path / "b.json"), "LIBRARY_COLUMNAR": "1"})._columns is not None
+    assert create_library(env={"LIBRARY_FILE": str(tmp_path / "c.json")})._columns is None
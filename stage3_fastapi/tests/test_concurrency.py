@@ -0,0 +1,144 @@
+"""
+Eşzamanlılık stres testleri: thread'ler ve asyncio görevleri aynı Library'yi kullanırken
+sayaçlar taramayla tutarlı kalır, bir kitap iki kez ödünç verilmez ve journal'daki
+yazım sırası bellekteki sırayla aynıdır (yeniden yüklenen katalog aynı durumdadır)
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from stage3_fastapi.journal import JournalLibrary
+from stage3_fastapi.models import Book
+
+ISBNS = [f"isbn-{i:02d}" for i in range(12)]
+
+
+@pytest.fixture
+def lib(tmp_path):
+    library = JournalLibrary(str(tmp_path / "lib.json"))
+    for i, isbn in enumerate(ISBNS):
+        library.add_book(Book(isbn, f"Title {i}", [f"Author {i % 3}"], book_type=("Physical", "Digital")[i % 2]))
+    yield library
+    library.close()
+
+
+def borrow_or_return(library, isbn, rng, done: Counter) -> None:
+    action = rng.choice(("borrow", "return"))
+    try:
+        book = (library.borrow_book if action == "borrow" else library.return_book)(isbn)
+    except ValueError:
+        return
+    assert book.is_borrowed is (action == "borrow")
+    done[isbn, action] += 1
+
+
+def check_reads(library, errors: list, stop: threading.Event) -> None:
+    """Kilitsiz okumalar hiçbir zaman yarım bir değişiklik görmemeli."""
+    while not stop.is_set():
+        try:
+            counts = library.book_counts()
+            assert counts["total"] == len(ISBNS) and 0 <= counts["borrowed"] <= len(ISBNS)
+            assert sum(counts["book_type"].values()) == len(ISBNS)
+            page = library.query_books(sort="title")
+            assert sorted(b.isbn for b in page) == ISBNS
+            assert all(b.is_borrowed for b in library.query_books(is_borrowed=True))
+            assert library.search_books("title")[1] == len(ISBNS)
+            assert all(library.find_book(isbn) is not None for isbn in ISBNS)
+        except Exception as e:  # pragma: no cover - yalnızca hata ayıklama için
+            errors.append(e)
+            return
+        time.sleep(0.001)  # sürekli CPU kullanan okuyucu GIL yüzünden yazarları yavaşlatır
+
+
+def assert_invariants(library, done: Counter, path) -> None:
+    books = list(library.list_books())
+    for book in books:
+        # Başarılı ödünç / iade işlemleri birbirini izlemeli: fark 0 ya da 1
+        assert done[book.isbn, "borrow"] - done[book.isbn, "return"] == int(book.is_borrowed)
+    assert library.count_books(is_borrowed=True) == sum(b.is_borrowed for b in books)
+    assert library.count_books(book_type="Digital") == sum(b.book_type == "Digital" for b in books)
+    assert library.book_counts()["borrowed"] == sum(b.is_borrowed for b in books)
+
+    reloaded = JournalLibrary(str(path))
+    assert {b.isbn: b.is_borrowed for b in reloaded.list_books()} == {b.isbn: b.is_borrowed for b in books}
+    reloaded.close()
+
+
+def test_threads_borrow_and_return_concurrently(lib, tmp_path):
+    done: Counter = Counter()
+    errors: list = []
+    stop = threading.Event()
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        local: Counter = Counter()
+        try:
+            for _ in range(150):
+                borrow_or_return(lib, rng.choice(ISBNS), rng, local)
+        except Exception as e:
+            errors.append(e)
+        with lock:
+            done.update(local)
+
+    lock = threading.Lock()
+    readers = [threading.Thread(target=check_reads, args=(lib, errors, stop)) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(seed,)) for seed in range(8)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert sum(done.values()) > 0
+    assert_invariants(lib, done, tmp_path / "lib.json")
+
+
+def test_tasks_and_threads_share_library(lib, tmp_path):
+    done: Counter = Counter()
+
+    async def task(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(100):
+            isbn, action = rng.choice(ISBNS), rng.choice(("borrow", "return"))
+            try:
+                book = await (lib.aborrow_book if action == "borrow" else lib.areturn_book)(isbn)
+            except ValueError:
+                continue
+            assert book.is_borrowed is (action == "borrow")
+            done[isbn, action] += 1
+
+    threaded: Counter = Counter()
+
+    def thread_writer() -> None:
+        rng = random.Random(99)
+        for _ in range(150):
+            borrow_or_return(lib, rng.choice(ISBNS), rng, threaded)
+
+    async def main() -> None:
+        thread = threading.Thread(target=thread_writer)
+        thread.start()
+        await asyncio.gather(*(task(seed) for seed in range(8)))
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    done.update(threaded)
+    assert_invariants(lib, done, tmp_path / "lib.json")
+
+
+def test_patch_replaces_book_instead_of_mutating(lib):
+    before = lib.find_book("isbn-00")
+    after = lib.borrow_book("isbn-00")
+    # Eski referansı tutan okuyucu tutarlı (eski) hali görmeye devam eder
+    assert before.is_borrowed is False and after.is_borrowed is True
+    assert lib.find_book("isbn-00") is after
+    updated = lib.update_book("isbn-00", title="Renamed")
+    assert updated.title == "Renamed" and after.title == "Title 0"
+    assert [b.isbn for b in lib.query_books(sort="title")][0] == "isbn-00"
@@ -0,0 +1,117 @@
+"""
+JournalLibrary testleri: append-only kayıt, replay ve compaction
+"""
+
+import json
+
+import pytest
+
+from stage3_fastapi.journal import JournalLibrary
+from stage3_fastapi.models import Book
+from stage3_fastapi.snapshot import load_snapshot
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    monkeypatch.setattr(JournalLibrary, "_db_path", property(lambda self: path))
+    return path
+
+
+def read_journal(path):
+    journal = path.with_name(path.name + ".journal")
+    return [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+
+
+def test_mutations_append_records_without_snapshot(db_path):
+    lib = JournalLibrary()
+    lib.add_book(Book("111", "First", ["A"]))
+    lib.add_book(Book("222", "Second", ["B"]))
+    lib.update_book("111", title="First (2nd ed.)")
+    lib.borrow_book("222")
+    lib.remove_book("111")
+    lib.close()
+
+    assert not db_path.exists()
+    records = read_journal(db_path)
+    assert [r["op"] for r in records] == ["add", "add", "patch", "patch", "remove"]
+    assert records[2]["data"] == {"title": "First (2nd ed.)"}
+
+
+def test_replay_snapshot_plus_journal(db_path):
+    db_path.write_text(json.dumps([{"isbn": "1", "title": "Snap", "author": "Old Author"}]), encoding="utf-8")
+
+    lib = JournalLibrary()
+    lib.add_book(Book("2", "Journaled", ["B"]))
+    lib.update_book("1", title="Patched")
+    lib.close()
+
+    reloaded = JournalLibrary()
+    assert [b.isbn for b in reloaded.list_books()] == ["1", "2"]
+    assert reloaded.find_book("1").title == "Patched"
+    assert reloaded.find_book("1").authors == ["Old Author"]
+    reloaded.close()
+
+
+def test_torn_tail_is_truncated(db_path):
+    lib = JournalLibrary()
+    lib.add_book(Book("1", "Kept", ["A"]))
+    lib.close()
+    journal = db_path.with_name(db_path.name + ".journal")
+    with open(journal, "ab") as f:
+        f.write(b'{"op":"add","isbn":"2","da')
+
+    reloaded = JournalLibrary()
+    assert [b.isbn for b in reloaded.list_books()] == ["1"]
+    reloaded.add_book(Book("3", "After crash", ["C"]))
+    reloaded.close()
+
+    assert [b.isbn for b in JournalLibrary().list_books()] == ["1", "3"]
+
+
+def test_compaction_folds_journal_into_snapshot(db_path):
+    lib = JournalLibrary(compact_threshold=200)
+    for i in range(10):
+        lib.add_book(Book(str(i), f"Book {i}", ["A"]))
+    lib.wait_for_compaction()
+    lib.compact()
+    lib.close()
+
+    assert len(load_snapshot(db_path)) == 10
+    assert not db_path.with_name(db_path.name + ".journal").exists()
+    assert not db_path.with_name(db_path.name + ".journal.old").exists()
+    assert len(list(JournalLibrary().list_books())) == 10
+
+
+def test_interrupted_compaction_keeps_rotated_records(db_path):
+    lib = JournalLibrary()
+    lib.add_book(Book("1", "Rotated", ["A"]))
+    lib.close()
+    journal = db_path.with_name(db_path.name + ".journal")
+    journal.rename(db_path.with_name(db_path.name + ".journal.old"))
+
+    lib = JournalLibrary()
+    lib.add_book(Book("2", "Fresh", ["B"]))
+    lib.compact()
+    lib.close()
+
+    assert [b.isbn for b in JournalLibrary().list_books()] == ["1", "2"]
+
+
+def test_commit_many_appends_batch_with_one_fsync(db_path, monkeypatch):
+    import stage3_fastapi.journal as journal_mod
+
+    fsyncs = []
+    real_fsync = journal_mod.os.fsync
+    monkeypatch.setattr(journal_mod.os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+
+    lib = JournalLibrary()
+    books = [Book(f"b-{i}", f"Batch {i}", ["A"]) for i in range(3)]
+    for book in books:
+        lib._insert(book)
+    lib._commit_many([("add", b.isbn, {"isbn": b.isbn, "title": b.title, "authors": b.authors}) for b in books])
+    lib.close()
+
+    assert len(fsyncs) == 1
+    assert [r["isbn"] for r in read_journal(db_path)] == ["b-0", "b-1", "b-2"]
+    assert [b.isbn for b in JournalLibrary().list_books()] == ["b-0", "b-1", "b-2"]
@@ -0,0 +1,352 @@
+"""
+Stage 3 Library çekirdek testleri (indeks, güncelleme, kalıcılık)
+"""
+
+import json
+
+import pytest
+
+import stage3_fastapi.library as libmod
+from stage3_fastapi import models
+from stage3_fastapi.insertion_order import StaleCursorError
+from stage3_fastapi.library import Library
+from stage3_fastapi.models import Book
+from stage3_fastapi.snapshot import load_snapshot
+
+
+@pytest.fixture
+def lib(tmp_path, monkeypatch):
+    monkeypatch.setattr(libmod.Library, "_db_path", property(lambda self: tmp_path / "lib.json"))
+    return Library()
+
+
+def test_isbn_index_lookup_and_order(lib):
+    for i in range(5):
+        assert lib.add_book(Book(f"isbn-{i}", f"Title {i}", f"Author {i}")) is True
+
+    assert lib.add_book(Book("isbn-2", "Dup", "Someone")) is False
+    assert lib.find_book("isbn-3").title == "Title 3"
+    assert lib.find_book("missing") is None
+
+    assert lib.remove_book("isbn-1") is True
+    assert lib.remove_book("isbn-1") is False
+    assert [b.isbn for b in lib.list_books()] == ["isbn-0", "isbn-2", "isbn-3", "isbn-4"]
+
+
+def test_index_rebuilt_on_load(tmp_path, lib):
+    lib.add_book(Book("111", "First", ["A"]))
+    lib.add_book(Book("222", "Second", ["B"]))
+
+    reloaded = Library()
+    assert reloaded.find_book("222").title == "Second"
+    assert [b.isbn for b in reloaded.list_books()] == ["111", "222"]
+
+
+def test_load_keeps_first_duplicate(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    path.write_text(json.dumps([
+        {"isbn": "1", "title": "Original", "author": "Stage1 Author"},
+        {"isbn": "1", "title": "Shadowed", "authors": ["X"]},
+    ]), encoding="utf-8")
+    monkeypatch.setattr(libmod.Library, "_db_path", property(lambda self: path))
+
+    lib = Library()
+    assert len(list(lib.list_books())) == 1
+    assert lib.find_book("1").title == "Original"
+    assert lib.find_book("1").authors == ["Stage1 Author"]
+
+
+def test_update_book_fields(lib):
+    lib.add_book(Book("111", "Old", ["A"]))
+
+    book = lib.update_book("111", title="New", is_borrowed=True, unknown="ignored")
+    assert book.title == "New" and book.is_borrowed is True
+    assert not hasattr(book, "unknown")
+    assert lib.find_book("111") is book
+    assert Library().find_book("111").title == "New"
+    assert lib.update_book("missing", title="x") is None
+
+
+def test_assigning_books_list_rebuilds_index(lib):
+    lib.add_book(Book("111", "Old", ["A"]))
+    lib._books = [Book("999", "Fresh", ["Z"])]
+    assert lib.find_book("111") is None
+    assert lib.find_book("999").title == "Fresh"
+
+
+def test_sorted_indexes_follow_mutations(lib):
+    lib.add_book(Book("3", "banana", ["Zed"]))
+    lib.add_book(Book("1", "Apple", ["Young"]))
+    lib.add_book(Book("2", "cherry", ["Xavier"]))
+
+    assert [b.isbn for b in lib.query_books(sort="title")] == ["1", "3", "2"]
+    assert [b.isbn for b in lib.query_books(sort="author")] == ["2", "1", "3"]
+
+    lib.update_book("2", title="Aardvark", authors=["Zoe"])
+    lib.remove_book("1")
+    assert [b.isbn for b in lib.query_books(sort="title")] == ["2", "3"]
+    assert [b.isbn for b in lib.query_books(sort="author", descending=True)] == ["2", "3"]
+    assert lib._sorted["title"] == [("aardvark", "2"), ("banana", "3")]
+
+
+def test_query_books_cursor_offset_and_filters(lib):
+    for i in range(6):
+        lib.add_book(Book(f"{i}", f"T{i}", ["A"], book_type="Digital" if i % 2 else "Physical"))
+
+    assert [b.isbn for b in lib.query_books(sort="isbn", after=("2", "2"), limit=2)] == ["3", "4"]
+    assert [b.isbn for b in lib.query_books(sort="isbn", descending=True, after=("2", "2"))] == ["1", "0"]
+    assert [b.isbn for b in lib.query_books(offset=1, limit=2, book_type="Digital")] == ["3", "5"]
+    assert [b.isbn for b in lib.query_books(descending=True, limit=2)] == ["5", "4"]
+    assert [b.isbn for b in lib.query_books(sort="title", offset=2, limit=2)] == ["2", "3"]
+    assert [b.isbn for b in lib.query_books(sort="title", descending=True, offset=4)] == ["1", "0"]
+    assert lib.count_books(book_type="Digital") == 3
+    assert lib.count_books() == 6
+
+
+def test_insertion_order_cursor_survives_deletes(lib):
+    for i in range(6):
+        lib.add_book(Book(f"{i}", f"T{i}", ["A"]))
+    page = lib.query_books(limit=2)
+    after = (lib.order_key(page[-1], None), page[-1].isbn)
+    back = lib.query_books(descending=True, offset=2, limit=1)[0]
+    before = (lib.order_key(back, None), back.isbn)
+
+    # Son görülen kitap ve öncesi silinse de sayfa kaldığı yerden devam eder
+    lib.remove_book("0")
+    lib.remove_book("1")
+    lib.remove_book("3")
+    lib.add_book(Book("late", "Late", ["A"]))
+    assert [b.isbn for b in lib.query_books(after=after, limit=2)] == ["2", "4"]
+    assert [b.isbn for b in lib.query_books(after=after, offset=2)] == ["5", "late"]
+    assert [b.isbn for b in lib.query_books(descending=True, after=before)] == ["2"]
+
+
+def test_insertion_order_cursor_rejected_after_reload(lib):
+    for i in range(6):
+        lib.add_book(Book(f"{i}", f"T{i}", ["A"]))
+    lib.remove_book("0")
+    lib.remove_book("1")
+    page = lib.query_books(limit=2)
+    after = (lib.order_key(page[-1], None), page[-1].isbn)
+    assert [b.isbn for b in lib.query_books(after=after, limit=2)] == ["4", "5"]
+
+    # Yeniden yüklenen katalog sıra numaralarını baştan verir: cursor sessizce
+    # yanlış konumdan devam etmek yerine reddedilir
+    reloaded = Library()
+    with pytest.raises(StaleCursorError):
+        reloaded.query_books(after=after, limit=2)
+    # ISBN'i cursor'daki seq ile tutmayan (elle değiştirilmiş) cursor da reddedilir
+    with pytest.raises(StaleCursorError):
+        lib.query_books(after=(lib.order_key(page[-1], None), page[0].isbn))
+
+
+def test_async_operations_persist_through_writer(lib, tmp_path):
+    import asyncio
+
+    async def scenario():
+        assert await lib.aadd_book(Book("a-1", "Async", ["Writer"])) is True
+        assert await lib.aadd_book(Book("a-1", "Dup", ["Writer"])) is False
+        await lib.aborrow_book("a-1")
+        await lib.aupdate_book("a-1", title="Async Renamed")
+        await lib.aclose()
+
+    asyncio.run(scenario())
+    rows = load_snapshot(tmp_path / "lib.json")
+    assert rows[0]["title"] == "Async Renamed"
+    assert rows[0]["is_borrowed"] is True
+
+
+def test_concurrent_adds_of_same_isbn_write_once(lib, monkeypatch):
+    import asyncio
+
+    import httpx
+
+    from stage3_fastapi.openlibrary import OpenLibraryClient
+
+    upstream, commits = [], []
+
+    async def handler(request):
+        upstream.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"title": "Once", "by_statement": "Someone"}, request=request)
+
+    monkeypatch.setattr(lib, "openlibrary", OpenLibraryClient(transport=httpx.MockTransport(handler)))
+    original_commit = lib._commit
+    monkeypatch.setattr(lib, "_commit", lambda *args: (commits.append(args[0]), original_commit(*args)))
+
+    async def scenario():
+        results = await asyncio.gather(*(lib.aadd_book_by_isbn("555") for _ in range(4)))
+        await lib.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+    assert sum(result is not None for result in results) == 1
+    assert upstream == ["/isbn/555.json"]
+    assert commits == ["add"]
+    assert len(lib._adding) == 0
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_bulk_import_commits_each_chunk_in_order(tmp_path, backend):
+    import asyncio
+
+    from stage3_fastapi.storage import create_library
+
+    url = f"{backend}://{tmp_path}/lib.{'db' if backend == 'sqlite' else 'json'}"
+    lib = create_library(env={"LIBRARY_URL": url})
+
+    async def fetch(isbns, concurrency=8, **kwargs):
+        return {isbn: Book(isbn, f"Title {isbn}", ["A"]) for isbn in isbns}
+
+    lib.afetch_books_from_api = fetch
+
+    async def scenario():
+        stream = lib.aimport_isbns([(f"b-{i}", "Physical", {}) for i in range(3)], concurrency=1, batch_size=1)
+        first = await stream.__anext__()
+        assert first["status"] == "added"
+        # Akış sürerken silinen kitap, sonraki parçaların commit'iyle geri gelmemeli
+        assert await lib.aremove_book(first["isbn"]) is True
+        rest = [result async for result in stream]
+        await lib.aclose()
+        return [first] + rest
+
+    results = asyncio.run(scenario())
+    assert [r["status"] for r in results] == ["added"] * 3
+    lib.close()
+    reloaded = create_library(env={"LIBRARY_URL": url})
+    assert sorted(b.isbn for b in reloaded.list_books()) == ["b-1", "b-2"]
+    reloaded.close()
+
+
+def test_bulk_import_reports_failed_chunks_and_ends(lib):
+    import asyncio
+
+    async def fetch(isbns, concurrency=8, **kwargs):
+        return {isbn: Book(isbn, "T", ["A"]) for isbn in isbns}
+
+    def broken_insert(book):
+        raise RuntimeError("index failure")
+
+    lib.afetch_books_from_api = fetch
+    lib._insert = broken_insert
+
+    async def scenario():
+        stream = lib.aimport_isbns([(f"b-{i}", "Physical", {}) for i in range(3)], concurrency=2, batch_size=2)
+        return await asyncio.wait_for(collect(stream), timeout=5)
+
+    async def collect(stream):
+        return [result async for result in stream]
+
+    results = asyncio.run(scenario())
+    assert sorted(r["isbn"] for r in results) == ["b-0", "b-1", "b-2"]
+    assert {r["status"] for r in results} == {"error"}
+
+
+def test_bulk_import_shares_request_budget_and_reports_upstream_errors(lib):
+    import asyncio
+
+    import httpx
+
+    from stage3_fastapi.metadata_cache import MetadataCache
+    from stage3_fastapi.openlibrary import OpenLibraryClient
+    from stage3_fastapi.resilience import CircuitBreaker, RetryPolicy, TokenBucket
+
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        path = request.url.path
+        if path == "/api/books":
+            return httpx.Response(200, json={}, request=request)  # hepsi tekil yola düşer
+        if path.startswith("/isbn/ok-"):
+            return httpx.Response(200, json={"title": "Found", "by_statement": "A"}, request=request)
+        if path.startswith("/isbn/down-"):
+            return httpx.Response(503, request=request)
+        return httpx.Response(404, request=request)
+
+    lib.openlibrary = OpenLibraryClient(transport=httpx.MockTransport(handler), cache=MetadataCache(),
+                                        limiter=TokenBucket(1000, burst=1000),
+                                        breaker=CircuitBreaker(min_calls=1000),
+                                        retry=RetryPolicy(max_retries=0))
+    items = [(f"{kind}-{i}", "Physical", {}) for i in range(4) for kind in ("ok", "down", "gone")]
+
+    async def scenario():
+        try:
+            return [result async for result in lib.aimport_isbns(items, concurrency=2, batch_size=2)]
+        finally:
+            await lib.openlibrary.aclose()
+
+    statuses = {r["isbn"]: r["status"] for r in asyncio.run(scenario())}
+    # Çekilemeyen ISBN "error", gerçekten olmayan "not_found"
+    assert {isbn for isbn, status in statuses.items() if status == "error"} == {f"down-{i}" for i in range(4)}
+    assert {isbn for isbn, status in statuses.items() if status == "not_found"} == {f"gone-{i}" for i in range(4)}
+    assert lib.count_books() == 4
+    # Paralel parçalar tek bütçeyi paylaşır: toplu + tekil istekler en fazla concurrency
+    assert state["peak"] <= 2
+
+
+def test_book_is_slotted_and_shares_author_tuples():
+    a = Book("1", "A", "Same Author", shelf_location="A-1")
+    b = Book("2", "B", ["Same " + "Author"], book_type="Audio", narrator="N", duration_minutes=90)
+
+    assert not hasattr(a, "__dict__")
+    assert a._authors is b._authors
+    assert a.author == "Same Author" and a.authors == ["Same Author"]
+    assert a._extra == ("shelf_location", "A-1") and a.narrator is None
+    assert (b.narrator, b.duration_minutes, b.file_format) == ("N", 90, None)
+
+    b.narrator = None
+    b.authors = ["X", "Y"]
+    assert b._extra == ("duration_minutes", 90) and b.author == "X"
+    assert b == Book("2", "B", ["X", "Y"], book_type="Audio", duration_minutes=90)
+
+
+def test_author_table_drops_unused_entries():
+    import threading
+
+    kept = [Book(f"k{i}", "T", [f"Kept {i}"]) for i in range(100)]
+    for round_ in range(5):
+        # Eklenip silinen kitapların yazar listeleri tabloda birikmemeli
+        churn = [Book(str(i), "T", [f"Churn {round_}-{i}"]) for i in range(3000)]
+        del churn
+    assert not any(name.startswith("Churn") for key in list(models._AUTHOR_LISTS.keys()) for name in key)
+    assert all(models._AUTHOR_LISTS[book._authors.names] is book._authors for book in kept)
+    assert Book("x", "T", ["Kept 0"])._authors is kept[0]._authors
+
+    # Farklı thread'lerden aynı anda oluşturulan kitaplar da aynı listeyi paylaşır
+    made = []
+
+    def create():
+        made.extend(Book(str(i), "T", [f"Shared {i % 50}"]) for i in range(2000))
+
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(book._authors) for book in made}) == 50
+
+
+def test_counters_follow_mutations_without_scans(lib):
+    lib.add_book(Book("1", "A", "X", shelf_location="A-1"))
+    lib.add_book(Book("2", "B", "Y", book_type="Digital", file_format="PDF"))
+    lib.add_book(Book("3", "C", "Z", book_type="Audio"))
+    lib.borrow_book("1")
+    lib.update_book("2", book_type="Audio", file_format="EPUB")
+    lib.update_book("3", shelf_location="A-1")
+    lib.remove_book("1")
+
+    class NoScan(dict):
+        def values(self):
+            pytest.fail("catalog scanned")
+
+    # Sayımlar kitapları gezmemeli
+    lib._index = NoScan(lib._index)
+    assert lib.count_books() == 2
+    assert lib.count_books(book_type="Audio", is_borrowed=False) == 2
+    assert lib.count_books(is_borrowed=True) == 0
+    assert lib.book_counts() == {"total": 2, "borrowed": 0, "book_type": {"Audio": 2},
+                                 "shelf_location": {"A-1": 1}, "file_format": {"EPUB": 1}}
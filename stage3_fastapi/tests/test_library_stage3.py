@@ -1,6 +1,9 @@
 from pathlib import Path
+import functools
 import httpx
 
+from stage3_fastapi.openlibrary import OpenLibraryClient
+
 class FakeResponse:
     def __init__(self, status_code=200, data=None, url="https://example.com"):
         self.status_code = status_code
@@ -16,6 +19,16 @@ class FakeResponse:
             request = httpx.Request("GET", self.url)
             raise httpx.HTTPStatusError("HTTP error", request=request, response=self)
 
+def use_mock_get(monkeypatch, libmod, mock_get):
+    """mock_get(url, ...) fonksiyonunu Library'nin Open Library istemcisine transport olarak bağlar."""
+    def handler(request):
+        fake = mock_get(str(request.url), timeout=10.0, follow_redirects=True)
+        data = fake.json() if fake.status_code < 400 else None
+        return httpx.Response(fake.status_code, json=data, request=request)
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(libmod, "OpenLibraryClient", functools.partial(OpenLibraryClient, transport=transport))
+
 def test_stage1_compatibility(tmp_path, monkeypatch):
     """Test Stage 1 compatibility - manual book addition"""
     import stage2_api.library as libmod
@@ -81,7 +94,7 @@ def test_stage2_api_functionality(tmp_path, monkeypatch):
                     raise httpx.HTTPStatusError("404", request=None, response=self)
             return MockResponse()
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     lib = Library()
     assert list(lib.list_books()) == []
@@ -109,7 +122,7 @@ def test_api_book_not_found(tmp_path, monkeypatch, capsys):
                 raise httpx.HTTPStatusError("404", request=None, response=self)
         return MockResponse()
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     from stage2_api.library import Library
     
@@ -129,7 +142,7 @@ def test_api_network_error(tmp_path, monkeypatch, capsys):
     def mock_get(url, timeout=10.0, follow_redirects=True):
         raise httpx.RequestError("Network error")
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     from stage2_api.library import Library
     
@@ -155,7 +168,7 @@ def test_api_malformed_json(tmp_path, monkeypatch, capsys):
                 pass
         return BadResponse()
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     from stage2_api.library import Library
     
@@ -177,7 +190,7 @@ def test_api_missing_title(tmp_path, monkeypatch, capsys):
             return FakeResponse(200, {"authors": [{"key": "/authors/OL34184A"}]})
         return FakeResponse(200, {"name": "Test Author"})
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     from stage2_api.library import Library
     
@@ -197,7 +210,7 @@ def test_api_empty_response(tmp_path, monkeypatch, capsys):
     def mock_get(url, timeout=10.0, follow_redirects=True):
         return FakeResponse(200, {})
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     from stage2_api.library import Library
     
@@ -225,7 +238,7 @@ def test_mixed_operations(tmp_path, monkeypatch):
             })
         return FakeResponse(200, {"name": "API Author"})
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     lib = Library()
     
@@ -260,7 +273,7 @@ def test_duplicate_isbn_different_sources(tmp_path, monkeypatch, capsys):
             })
         return FakeResponse(200, {"name": "API Author"})
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     lib = Library()
     
@@ -297,7 +310,7 @@ def test_api_author_fetch_failure(tmp_path, monkeypatch):
             # Author fetch fails
             raise httpx.RequestError("Author fetch failed")
     
-    monkeypatch.setattr(httpx, "get", mock_get)
+    use_mock_get(monkeypatch, libmod, mock_get)
 
     lib = Library()
     result = lib.add_book("9780140328721")
@@ -0,0 +1,119 @@
+"""
+Open Library metadata önbelleği testleri (LRU, TTL, negatif önbellek, disk katmanı)
+"""
+
+import asyncio
+import threading
+
+import httpx
+
+from stage3_fastapi.metadata_cache import MISSING, MetadataCache
+from stage3_fastapi.openlibrary import OpenLibraryClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_ttl_and_negative_entries():
+    clock = Clock()
+    cache = MetadataCache(max_entries=2, edition_ttl=10, author_ttl=100, negative_ttl=5, clock=clock)
+
+    assert cache.get("/isbn/1") is MISSING
+    cache.put("/isbn/1", {"title": "One"})
+    cache.put("/authors/OL1A", {"name": "Ann"})
+    cache.put("/isbn/404", None)
+    assert cache.get("/isbn/1") is MISSING           # LRU: en eski kayıt atıldı
+    assert cache.get("/isbn/404") is None            # negatif kayıt
+    assert cache.get("/authors/OL1A") == {"name": "Ann"}
+
+    clock.now += 6                                   # negatif TTL doldu, yazar TTL'i dolmadı
+    assert cache.get("/isbn/404") is MISSING
+    assert cache.get("/authors/OL1A") == {"name": "Ann"}
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["negative_hits"] == 1
+    assert stats["misses"] == 3 and stats["evictions"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "cache.db"
+    first = MetadataCache(path)
+    first.put("/authors/OL1A", {"name": "Ünlü Yazar"})
+    first.put("/isbn/404", None)
+    first.close()
+
+    second = MetadataCache(path)
+    assert second.get("/authors/OL1A") == {"name": "Ünlü Yazar"}
+    assert second.get("/isbn/404") is None
+    assert second.stats()["disk_hits"] == 2
+    second.close()
+
+
+def test_client_reuses_cached_editions_and_authors():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.startswith("/isbn/1"):
+            return httpx.Response(200, json={"title": f"Book {request.url.path}",
+                                             "authors": [{"key": "/authors/OL1A"}],
+                                             "covers": [1, 2, 3]}, request=request)
+        if request.url.path == "/authors/OL1A.json":
+            return httpx.Response(200, json={"name": "Shared Author"}, request=request)
+        return httpx.Response(404, request=request)
+
+    client = OpenLibraryClient(transport=httpx.MockTransport(handler), cache=MetadataCache())
+    for isbn in ("10", "11", "10", "999", "999"):
+        client.fetch_book_sync(isbn)
+
+    assert calls == ["/isbn/10.json", "/authors/OL1A.json", "/isbn/11.json", "/isbn/999.json"]
+    assert "covers" not in client.cache.get("/isbn/10")   # yalnızca gerekli alanlar saklanır
+
+
+def test_async_paths_keep_disk_io_off_the_loop(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = MetadataCache(path)
+    disk_threads = []
+    for name in ("_disk_get", "_disk_put"):
+        original = getattr(cache, name)
+
+        def traced(*args, _original=original):
+            disk_threads.append(threading.get_ident())
+            return _original(*args)
+
+        setattr(cache, name, traced)
+
+    def handler(request):
+        if request.url.path == "/isbn/10.json":
+            return httpx.Response(200, json={"title": "Ten", "authors": [{"key": "/authors/OL1A"}]},
+                                  request=request)
+        if request.url.path == "/authors/OL1A.json":
+            return httpx.Response(200, json={"name": "Ann"}, request=request)
+        return httpx.Response(404, request=request)
+
+    client = OpenLibraryClient(transport=httpx.MockTransport(handler), cache=cache)
+
+    async def scenario():
+        try:
+            books = await client.fetch_books(["10", "999"])
+            # İkinci tur bellekten gelir: diske hiç gidilmez
+            before = len(disk_threads)
+            assert (await client.fetch_book("10")).authors == ["Ann"]
+            assert len(disk_threads) == before
+            return books, threading.get_ident()
+        finally:
+            await client.aclose()
+
+    books, loop_thread = asyncio.run(scenario())
+    assert books["10"].title == "Ten" and books["999"] is None
+    assert disk_threads and loop_thread not in disk_threads
+    cache.close()
+
+    reopened = MetadataCache(path)
+    assert reopened.get("/authors/OL1A") == {"name": "Ann"} and reopened.get("/isbn/999") is None
+    reopened.close()
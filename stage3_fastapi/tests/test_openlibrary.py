@@ -0,0 +1,179 @@
+"""
+Open Library istemcisi testleri (havuzlu AsyncClient, paralel yazar çözümü)
+"""
+
+import asyncio
+
+import httpx
+
+from stage3_fastapi.metadata_cache import MetadataCache
+from stage3_fastapi.openlibrary import OpenLibraryClient
+
+AUTHORS = {f"/authors/OL{i}A": f"Author {i}" for i in range(4)}
+
+
+def make_transport(state):
+    async def handler(request):
+        path = request.url.path
+        if path == "/isbn/123.json":
+            keys = [{"key": key} for key in AUTHORS] + [{"key": "/authors/OL0A"}]
+            return httpx.Response(200, json={"title": "Many Hands", "authors": keys}, request=request)
+        key = path.removesuffix(".json")
+        if key in AUTHORS:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            state["calls"] += 1
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            return httpx.Response(200, json={"name": AUTHORS[key]}, request=request)
+        return httpx.Response(404, request=request)
+
+    return httpx.MockTransport(handler)
+
+
+def test_authors_resolved_concurrently_in_order():
+    state = {"in_flight": 0, "peak": 0, "calls": 0}
+    client = OpenLibraryClient(transport=make_transport(state))
+
+    async def scenario():
+        try:
+            return await client.fetch_book("123")
+        finally:
+            await client.aclose()
+
+    book = asyncio.run(scenario())
+    assert book.title == "Many Hands"
+    assert book.authors == ["Author 0", "Author 1", "Author 2", "Author 3"]
+    assert state["calls"] == 4          # tekrar eden yazar anahtarı bir kez istenir
+    assert state["peak"] == 4           # hepsi aynı anda uçuşta
+
+
+def test_sync_facade_and_missing_isbn():
+    state = {"in_flight": 0, "peak": 0, "calls": 0}
+    client = OpenLibraryClient(transport=make_transport(state), author_timeout=2.0)
+
+    assert client.fetch_book_sync("123").authors[0] == "Author 0"
+    assert client.fetch_book_sync("999") is None
+    assert client._client is None       # senkron cephe paylaşılan istemciyi açmaz
+
+
+class StubOpenLibrary:
+    """Yerel HTTP stub: toplu Books API + tekil edition/yazar uçları."""
+
+    BATCH = {
+        "ISBN:111": {"title": "Batch One", "authors": [
+            {"url": "https://openlibrary.org/authors/OL1A/Ann_Author", "name": "Ann Author"}]},
+        "ISBN:222": {"title": "Batch Two", "authors": [], "by_statement": "Editors"},
+    }
+
+    def __init__(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+
+        self.paths = []
+        self.peers = set()  # istemci tarafı (host, port): açılan bağlantılar
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                stub.paths.append(url.path)
+                stub.peers.add(self.client_address)
+                body = None
+                if url.path == "/api/books":
+                    keys = parse_qs(url.query)["bibkeys"][0].split(",")
+                    body = {key: stub.BATCH[key] for key in keys if key in stub.BATCH}
+                elif url.path == "/isbn/333.json":
+                    body = {"title": "Only Single", "authors": [{"key": "/authors/OL1A"}]}
+                elif url.path == "/authors/OL1A.json":
+                    body = {"name": "Ann Author"}
+                payload = json.dumps(body).encode() if body is not None else b"{}"
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_batch_resolver_against_local_stub():
+    stub = StubOpenLibrary()
+    try:
+        client = OpenLibraryClient(base_url=stub.url)
+        books = client.fetch_books_sync(["111", "222", "333", "404", "111"], batch_size=2)
+
+        assert list(books) == ["111", "222", "333", "404"]
+        assert books["111"].authors == ["Ann Author"]
+        assert books["222"].authors == ["Editors"]
+        assert books["333"].title == "Only Single"
+        assert books["404"] is None
+        # 2 toplu istek, yalnızca eksikler tekil yola düştü (yazar önbellekten geldi)
+        assert stub.paths.count("/api/books") == 2
+        assert "/isbn/111.json" not in stub.paths and "/authors/OL1A.json" not in stub.paths
+        assert {"/isbn/333.json", "/isbn/404.json"} <= set(stub.paths)
+
+        # Toplu yanıttan doldurulan önbellek tekil yola da hizmet eder
+        stub.paths.clear()
+        assert client.fetch_book_sync("111").authors == ["Ann Author"]
+        assert client.fetch_books_sync(["111", "404"])["111"].title == "Batch One"
+        assert stub.paths == []
+    finally:
+        stub.close()
+
+
+def test_sync_facade_reuses_pooled_connection():
+    stub = StubOpenLibrary()
+    try:
+        client = OpenLibraryClient(base_url=stub.url, cache=MetadataCache())
+        assert client.fetch_book_sync("333").authors == ["Ann Author"]
+        assert client.fetch_book_sync("404") is None
+        assert client.fetch_books_sync(["111"])["111"].title == "Batch One"
+
+        # Çağrılar aynı ikiz istemciyi ve aynı keep-alive bağlantısını kullanır
+        assert len(stub.paths) == 4 and len(stub.peers) == 1
+        pooled = client._sync_client
+        client.close()
+        assert client._sync_client is None and pooled._client is None
+    finally:
+        stub.close()
+
+
+def test_concurrent_lookups_share_one_request():
+    state = {"in_flight": 0, "peak": 0, "calls": 0}
+    edition_calls = []
+
+    async def handler(request):
+        if request.url.path.startswith("/isbn/"):
+            edition_calls.append(request.url.path)
+            await asyncio.sleep(0.01)
+        return await make_transport(state).handle_async_request(request)
+
+    client = OpenLibraryClient(transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        try:
+            return await asyncio.gather(*(client.fetch_book("123") for _ in range(5)))
+        finally:
+            await client.aclose()
+
+    books = asyncio.run(scenario())
+    assert {tuple(book.authors) for book in books} == {("Author 0", "Author 1", "Author 2", "Author 3")}
+    assert edition_calls == ["/isbn/123.json"]
+    assert state["calls"] == 4                  # her yazar bir kez
+    assert client._flights.coalesced == 4 + 4 * 4    # 4 bekleyen edition + her yazar için 4 bekleyen
+    assert len(client._flights) == 0
@@ -0,0 +1,84 @@
+"""
+Open Library koruma katmanı testleri (hız sınırı, devre kesici, yeniden deneme)
+"""
+
+import asyncio
+
+import httpx
+
+from stage3_fastapi.metadata_cache import MetadataCache
+from stage3_fastapi.openlibrary import OpenLibraryClient
+from stage3_fastapi.resilience import CircuitBreaker, RetryPolicy, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_throttles_after_burst():
+    bucket = TokenBucket(rate=200.0, burst=2)
+
+    async def scenario():
+        return [await bucket.acquire() for _ in range(4)]
+
+    waits = asyncio.run(scenario())
+    assert waits[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in waits[2:])
+    assert bucket.stats()["throttled"] == 2
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_ratio=0.5, min_calls=4, window=10, reset_timeout=5, clock=clock)
+    for ok in (True, False, False, True):
+        assert breaker.allow()
+        breaker.record(ok)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now += 5
+    assert breaker.allow()              # tek half-open denemesi
+    assert not breaker.allow()
+    breaker.record(False)               # deneme başarısız: yeniden açık
+    assert breaker.state == "open"
+
+    clock.now += 5
+    assert breaker.allow()
+    breaker.record(True)
+    stats = breaker.stats()
+    assert stats["state"] == "closed" and stats["opened"] == 1
+    assert stats["open_seconds"] == 10 and stats["rejected"] == 2
+
+
+def test_client_retries_transient_errors_then_fails_fast():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path == "/isbn/1.json" and len(calls) < 3:
+            return httpx.Response(503, request=request)
+        if request.url.path == "/isbn/1.json":
+            return httpx.Response(200, json={"title": "Third Time", "by_statement": "X"}, request=request)
+        raise httpx.ConnectError("upstream down", request=request)
+
+    breaker = CircuitBreaker(min_calls=4, reset_timeout=60)
+    client = OpenLibraryClient(transport=httpx.MockTransport(handler), cache=MetadataCache(),
+                               breaker=breaker, retry=RetryPolicy(max_retries=2, base_delay=0))
+
+    assert client.fetch_book_sync("1").title == "Third Time"
+    assert calls == ["/isbn/1.json"] * 3
+
+    calls.clear()
+    assert client.fetch_book_sync("2") is None        # ilk bağlantı hatası eşiği aşar, retry reddedilir
+    assert breaker.state == "open"
+    sent = len(calls)
+    assert client.fetch_book_sync("3") is None        # upstream'e gitmeden düşer
+    assert len(calls) == sent
+
+    stats = client.stats()
+    assert stats["retries"] == 3
+    assert stats["circuit"]["state"] == "open" and stats["circuit"]["rejected"] == 2
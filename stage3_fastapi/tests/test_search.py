@@ -0,0 +1,77 @@
+"""
+Ters token indeksi (SearchIndex) ve Library.search_books testleri
+"""
+
+import pytest
+
+import stage3_fastapi.library as libmod
+from stage3_fastapi.library import Library
+from stage3_fastapi.models import Book
+from stage3_fastapi.search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def lib(tmp_path, monkeypatch):
+    monkeypatch.setattr(libmod.Library, "_db_path", property(lambda self: tmp_path / "lib.json"))
+    lib = Library()
+    lib.add_book(Book("978-0345339683", "The Hobbit", ["J.R.R. Tolkien"]))
+    lib.add_book(Book("978-0618640157", "The Lord of the Rings", ["J.R.R. Tolkien"], book_type="Audio"))
+    lib.add_book(Book("978-0062316097", "Sapiens", ["Yuval Noah Harari"], book_type="Digital"))
+    lib.add_book(Book("111", "Tolkien: A Biography", ["Humphrey Carpenter"]))
+    return lib
+
+
+def isbns(result):
+    books, _ = result
+    return [b.isbn for b in books]
+
+
+def test_tokenize():
+    assert tokenize("J.R.R. Tolkien's HOBBIT") == ["j", "r", "r", "tolkien", "s", "hobbit"]
+
+
+def test_prefix_and_multi_term_search(lib):
+    assert isbns(lib.search_books("hob")) == ["978-0345339683"]
+    assert set(isbns(lib.search_books("tolk"))) == {"978-0345339683", "978-0618640157", "111"}
+    assert isbns(lib.search_books("tolkien lord")) == ["978-0618640157"]
+    assert isbns(lib.search_books("harari sapiens")) == ["978-0062316097"]
+    assert isbns(lib.search_books("nothing-here")) == []
+    assert isbns(lib.search_books("   ")) == []
+
+
+def test_relevance_prefers_title_and_exact_matches(lib):
+    # "Tolkien" başlıkta (ağırlık 3) > yazar alanında (ağırlık 2)
+    assert isbns(lib.search_books("tolkien"))[0] == "111"
+
+
+def test_isbn_search_with_and_without_dashes(lib):
+    assert isbns(lib.search_books("9780062316097")) == ["978-0062316097"]
+    assert isbns(lib.search_books("978-0062")) == ["978-0062316097"]
+
+
+def test_book_type_filter_and_pagination(lib):
+    assert isbns(lib.search_books("tolkien", book_type="Audio")) == ["978-0618640157"]
+    page, total = lib.search_books("tolkien", offset=1, limit=1)
+    assert total == 3 and len(page) == 1
+
+
+def test_index_follows_mutations(lib):
+    lib.update_book("978-0062316097", title="Homo Deus")
+    assert isbns(lib.search_books("sapiens")) == []
+    assert isbns(lib.search_books("homo")) == ["978-0062316097"]
+
+    lib.remove_book("111")
+    assert "111" not in isbns(lib.search_books("tolkien"))
+    assert "biography" not in lib._search._postings
+    assert "biography" not in lib._search._vocabulary
+
+
+def test_rebuild_matches_incremental():
+    books = [Book(str(i), f"Title {i}", [f"Author {i % 2}"]) for i in range(20)]
+    incremental = SearchIndex()
+    for book in books:
+        incremental.add(book)
+    bulk = SearchIndex()
+    bulk.rebuild(books)
+    assert incremental._postings == bulk._postings
+    assert incremental._vocabulary == bulk._vocabulary
@@ -0,0 +1,53 @@
+"""
+Hızlı JSON serileştirme yolu: BookResponse ile aynı çıktı ve önbellek geçersizleştirme
+"""
+
+import json
+
+import pytest
+
+from stage3_fastapi.library import Library
+from stage3_fastapi.models import Book, BookResponse
+from stage3_fastapi.serialization import FragmentCache, encode_book
+
+BOOKS = [
+    Book("1", "Çalıkuşu \"quoted\"", ["Reşat Nuri", "X"], shelf_location="A-1"),
+    Book("2", "Digital", [], is_borrowed=True, book_type="Digital", file_size_mb=5, file_format="PDF"),
+    Book("3", "Audio", "Solo", book_type="Audio", duration_minutes=90, narrator="N"),
+]
+
+
+@pytest.fixture
+def lib(tmp_path, monkeypatch):
+    monkeypatch.setattr(Library, "_db_path", property(lambda self: tmp_path / "lib.json"))
+    return Library()
+
+
+@pytest.mark.parametrize("book", BOOKS, ids=lambda b: b.book_type)
+def test_fragment_matches_pydantic_path(book):
+    expected = BookResponse(**book.to_dict()).model_dump_json().encode("utf-8")
+    assert encode_book(book) == expected
+
+
+def test_list_with_author_field():
+    cache = FragmentCache()
+    data = json.loads(cache.encode_list(BOOKS, extra="author"))
+    assert [item["author"] for item in data] == ["Reşat Nuri", "Unknown Author", "Solo"]
+    assert data[1] == {**BookResponse(**BOOKS[1].to_dict()).model_dump(), "author": "Unknown Author"}
+    assert json.loads(cache.encode_list([])) == []
+
+
+def test_library_invalidates_fragments_on_mutation(lib):
+    lib.add_book(Book("1", "Old", ["A"]))
+    lib.add_book(Book("2", "Other", ["B"]))
+    first = lib.fragments.get(lib.find_book("1"))
+    assert lib.fragments.get(lib.find_book("1")) is first
+
+    lib.update_book("1", title="New")
+    lib.borrow_book("2")
+    assert json.loads(lib.fragments.get(lib.find_book("1")))["title"] == "New"
+    assert json.loads(lib.fragments.get(lib.find_book("2")))["is_borrowed"] is True
+
+    lib.remove_book("1")
+    lib.add_book(Book("1", "Readded", ["C"]))
+    assert json.loads(lib.fragments.get(lib.find_book("1")))["title"] == "Readded"
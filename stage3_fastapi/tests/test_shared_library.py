@@ -0,0 +1,148 @@
+"""
+Çok süreçli SharedLibrary testleri: aynı veritabanını açan örnekler ayrı worker'ları temsil eder
+"""
+
+import asyncio
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from stage3_fastapi.library import VersionConflictError
+from stage3_fastapi.models import Book
+from stage3_fastapi.shared_library import SharedLibrary
+from stage3_fastapi.storage import create_library
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "shared.db")
+
+
+def test_workers_apply_each_others_changes(db_path):
+    a, b = SharedLibrary(db_path), SharedLibrary(db_path)
+    a.add_book(Book("1", "Title", ["A"]))
+    assert b.find_book("1") is None
+    assert b.refresh() is True and b.refresh() is False
+    assert b.find_book("1").title == "Title"
+
+    b.update_book("1", title="Renamed", book_type="Digital", file_format="PDF")
+    a.refresh()
+    assert a.find_book("1").title == "Renamed"
+    assert a.count_books(book_type="Digital") == 1
+    # Sürümler veritabanı günlüğünden gelir: ETag'ler worker'lar arasında aynıdır
+    assert (a.epoch, a.catalog_version, a.book_version("1")) == (b.epoch, b.catalog_version, b.book_version("1"))
+    fresh = SharedLibrary(db_path)
+    assert (fresh.catalog_version, fresh.book_version("1")) == (a.catalog_version, a.book_version("1"))
+
+    b.remove_book("1")
+    a.refresh()
+    assert a.find_book("1") is None and a.count_books() == 0
+
+
+def test_stale_worker_cannot_overwrite(db_path):
+    a, b = SharedLibrary(db_path), SharedLibrary(db_path)
+    a.add_book(Book("1", "Title", ["A"]))
+    b.refresh()
+    a.borrow_book("1")
+
+    # b henüz yenilemedi ama mutasyon önce diğer worker'ın yazdıklarını uygular
+    with pytest.raises(ValueError):
+        b.borrow_book("1")
+    assert b.find_book("1").is_borrowed is True
+    assert b.add_book(Book("1", "Duplicate", ["B"])) is False
+    assert b.find_book("1").title == "Title"
+
+
+def test_version_precondition_checked_after_sync(db_path):
+    a, b = SharedLibrary(db_path), SharedLibrary(db_path)
+    a.add_book(Book("1", "Title", ["A"]))
+    a.add_book(Book("2", "Other", ["A"]))
+    b.refresh()
+    seen = b.book_version("1")
+    a.update_book("1", title="Renamed")
+
+    async def scenario():
+        # b'nin bellekteki sürümü hâlâ `seen`; koşul a'nın yazımı uygulandıktan sonra denetlenir
+        with pytest.raises(VersionConflictError):
+            await b.aupdate_book("1", lambda version: version == seen, title="Lost update")
+        a.remove_book("2")
+        # Kitap mutasyon başında silinmiş çıkarsa sonuç None (API'de 404)
+        return await b.aborrow_book("2", lambda version: True)
+
+    assert asyncio.run(scenario()) is None
+    assert b.find_book("1").title == "Renamed"
+    assert SharedLibrary(db_path).find_book("1").title == "Renamed"
+
+
+def test_pruned_change_log_reloads_catalog(db_path):
+    a, b = SharedLibrary(db_path), SharedLibrary(db_path)
+    a.changelog_keep = 2
+    for i in range(6):
+        a.add_book(Book(str(i), f"T{i}", ["A"]))
+
+    assert b.refresh() is True
+    assert [book.isbn for book in b.list_books()] == [str(i) for i in range(6)]
+    assert b.catalog_version == a.catalog_version
+
+
+def test_async_mutation_waits_for_lock_off_the_loop(db_path):
+    library = SharedLibrary(db_path)
+    library.add_book(Book("1", "Title", ["A"]))
+    other = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")  # başka bir worker yazıyor
+
+    async def scenario():
+        borrow = asyncio.create_task(library.aborrow_book("1"))
+        started = asyncio.get_running_loop().time()
+        for _ in range(5):
+            await asyncio.sleep(0.02)
+        # Kilit beklenirken event loop diğer işleri yürütmeye devam eder
+        assert asyncio.get_running_loop().time() - started < 1 and not borrow.done()
+        other.execute("COMMIT")
+        return await borrow
+
+    assert asyncio.run(scenario()).is_borrowed is True
+    assert SharedLibrary(db_path).find_book("1").is_borrowed is True
+    other.close()
+
+
+def _worker(path, worker, results):
+    library = SharedLibrary(path)
+    for i in range(20):
+        library.add_book(Book(f"{worker}-{i}", f"Book {i}", ["A"]))
+        try:
+            library.borrow_book("common")
+            results.put(worker)
+        except ValueError:
+            pass
+        if i % 2 == 0:
+            library.borrow_book(f"{worker}-{i}")
+    library.close()
+
+
+def test_concurrent_processes_do_not_lose_writes(db_path):
+    SharedLibrary(db_path).add_book(Book("common", "Common", ["A"]))
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(db_path, w, results)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    # Ortak kitabı yalnızca bir worker ödünç alabilir
+    winners = []
+    while not results.empty():
+        winners.append(results.get())
+    assert len(winners) == 1
+
+    library = SharedLibrary(db_path)
+    assert library.count_books() == 81
+    assert library.count_books(is_borrowed=True) == 1 + 4 * 10
+
+
+def test_shared_storage_url(tmp_path):
+    library = create_library(env={"LIBRARY_URL": f"shared://{tmp_path}/lib.db"})
+    assert isinstance(library, SharedLibrary) and library.poll_interval
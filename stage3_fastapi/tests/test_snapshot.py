@@ -0,0 +1,128 @@
+"""
+Snapshot testleri: atomik yazım, nesiller, checksum doğrulama ve geri düşme
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+from stage3_fastapi.library import Library
+from stage3_fastapi.models import Book
+from stage3_fastapi.snapshot import (SnapshotError, generation_path, load_snapshot, read_snapshot,
+                                     stream_snapshot, write_snapshot)
+
+
+def rows(*isbns):
+    return [{"isbn": isbn, "title": f"T{isbn}", "authors": ["A"]} for isbn in isbns]
+
+
+def test_generations_rotate_and_are_capped(tmp_path):
+    path = tmp_path / "lib.json"
+    for i in range(1, 5):
+        assert write_snapshot(path, rows(*map(str, range(i))), generations=3) == i
+
+    assert read_snapshot(path) == (rows("0", "1", "2", "3"), 4)
+    assert read_snapshot(generation_path(path, 1))[1] == 3
+    assert read_snapshot(generation_path(path, 2))[1] == 2
+    assert not generation_path(path, 3).exists()
+    assert not path.with_name("lib.json.tmp").exists()
+
+
+def test_truncated_current_falls_back_to_previous_generation(tmp_path):
+    path = tmp_path / "lib.json"
+    write_snapshot(path, rows("1"))
+    write_snapshot(path, rows("1", "2"))
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 2])          # yazım ortasında çökme
+
+    assert load_snapshot(path) == rows("1")
+
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    path = tmp_path / "lib.json"
+    write_snapshot(path, rows("1"))
+    write_snapshot(path, rows("1", "2"))
+    tampered = json.loads(path.read_text(encoding="utf-8"))
+    tampered["books"][0]["title"] = "Flipped"
+    path.write_text(json.dumps(tampered), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        read_snapshot(path)
+    assert load_snapshot(path) == rows("1")
+
+
+def test_interrupted_rotation_recovers_from_tmp(tmp_path):
+    path = tmp_path / "lib.json"
+    write_snapshot(path, rows("1"))
+    write_snapshot(path, rows("1", "2"))
+    # tmp yazılıp fsync edilmiş, fakat rename öncesi çökülmüş: mevcut dosya kaydırılmış
+    path.replace(path.with_name("lib.json.tmp"))
+    assert load_snapshot(path) == rows("1", "2")
+
+
+def test_library_refuses_to_start_empty_on_corruption(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    monkeypatch.setattr(Library, "_db_path", property(lambda self: path))
+    path.write_text('[{"isbn": "1", "title": "Half', encoding="utf-8")
+    with pytest.raises(SnapshotError):
+        Library()
+
+    path.unlink()
+    lib = Library()
+    lib.add_book(Book("9", "Saved", ["A"]))
+    assert [b.isbn for b in Library().list_books()] == ["9"]
+
+
+def test_stream_matches_full_read_across_chunk_boundaries(tmp_path):
+    path = tmp_path / "lib.json"
+    books = [{"isbn": str(i), "title": f'Çağ "{i}" \\ é', "authors": ["Ö", "a\nb"],
+              "file_size_mb": 1.5 * i, "duration_minutes": 12345} for i in range(40)]
+    write_snapshot(path, books)
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps(books, indent=2), encoding="utf-8")
+
+    for chunk_size in (1, 2, 3, 7, 64):
+        assert list(stream_snapshot(path, chunk_size)) == books
+        assert list(stream_snapshot(legacy, chunk_size)) == books
+
+
+def test_stream_detects_checksum_mismatch_after_last_row(tmp_path):
+    path = tmp_path / "lib.json"
+    write_snapshot(path, rows("1", "2"))
+    tampered = json.loads(path.read_text(encoding="utf-8"))
+    tampered["books"][1]["title"] = "Flipped"
+    path.write_text(json.dumps(tampered), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Checksum"):
+        list(stream_snapshot(path, 16))
+
+
+def test_stream_memory_is_bounded_by_chunk_size(tmp_path):
+    path = tmp_path / "lib.json"
+    write_snapshot(path, rows(*map(str, range(30000))))
+    assert path.stat().st_size > 1_000_000
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in stream_snapshot(path, chunk_size=16 * 1024))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert count == 30000
+    assert peak < 256 * 1024
+
+
+def test_library_streams_large_files_and_falls_back(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    monkeypatch.setattr(Library, "_db_path", property(lambda self: path))
+    monkeypatch.setattr("stage3_fastapi.snapshot.STREAM_THRESHOLD", 0)
+    write_snapshot(path, rows("1"))
+    write_snapshot(path, rows("1", "2", "3"))
+    data = path.read_bytes()
+    path.write_bytes(data[:-40])                      # son satırlar yarım
+
+    lib = Library()
+    assert [b.isbn for b in lib.list_books()] == ["1"]
+    assert lib.load_stats["rows"] == 1
+    assert lib.load_stats["rows_per_sec"] > 0
@@ -0,0 +1,102 @@
+"""
+SQLiteLibrary ve JSON -> SQLite migrator testleri
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from stage3_fastapi.migrate import migrate_json_files
+from stage3_fastapi.models import Book
+from stage3_fastapi.sqlite_library import SQLiteLibrary
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "lib.db"
+    monkeypatch.setattr(SQLiteLibrary, "_db_path", property(lambda self: path))
+    return path
+
+
+def rows(path, sql="SELECT isbn, title, is_borrowed FROM books ORDER BY rowid"):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_crud_roundtrip(db_path):
+    lib = SQLiteLibrary()
+    assert list(lib.list_books()) == []
+
+    assert lib.add_book(Book("111", "The Hobbit", "J.R.R. Tolkien")) is True
+    assert lib.add_book(Book("111", "Dup", "X")) is False
+    lib.add_book(Book("222", "Audio", ["A", "B"], book_type="Audio", narrator="N", duration_minutes=90))
+    lib.update_book("111", title="The Hobbit (Annotated)")
+    lib.borrow_book("222")
+    lib.close()
+
+    assert rows(db_path) == [("111", "The Hobbit (Annotated)", 0), ("222", "Audio", 1)]
+
+    reloaded = SQLiteLibrary()
+    audio = reloaded.find_book("222")
+    assert audio.authors == ["A", "B"] and audio.narrator == "N" and audio.duration_minutes == 90
+    assert audio.is_borrowed is True
+    assert reloaded.remove_book("111") is True
+    assert [b.isbn for b in reloaded.list_books()] == ["222"]
+    reloaded.close()
+    assert rows(db_path, "SELECT isbn FROM books") == [("222",)]
+
+
+def test_schema_indexes_and_wal(db_path):
+    SQLiteLibrary().close()
+    indexes = {name for (name,) in rows(db_path, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_books_title", "idx_books_author", "idx_books_book_type", "idx_books_is_borrowed"} <= indexes
+    assert rows(db_path, "PRAGMA journal_mode") == [("wal",)]
+
+
+def test_patch_authors_updates_primary_author(db_path):
+    lib = SQLiteLibrary()
+    lib.add_book(Book("1", "T", ["Old"]))
+    lib.update_book("1", authors=["New", "Second"])
+    lib.close()
+    assert rows(db_path, "SELECT author, authors FROM books") == [("New", '["New", "Second"]')]
+
+
+def test_commit_does_not_read_live_index(db_path):
+    # Writer thread'i commit'i çalıştırdığında kitap bellekte çoktan silinmiş olabilir
+    lib = SQLiteLibrary()
+    row = {"isbn": "111", "title": "Old", "authors": ["A", "B"], "is_borrowed": False, "book_type": "Physical"}
+    lib._commit_many([
+        ("add", "111", row),
+        ("patch", "111", {"title": "New", "authors": ["C"], "is_borrowed": True, "shelf_location": "B-2"}),
+        ("add", "222", {**row, "isbn": "222"}),
+        ("remove", "222", None),
+    ])
+    assert lib.find_book("111") is None
+    lib.close()
+
+    assert rows(db_path, "SELECT isbn, title, author, authors, is_borrowed, shelf_location FROM books") == [
+        ("111", "New", "C", '["C"]', 1, "B-2")]
+
+
+def test_migrate_stage_files(tmp_path):
+    stage1 = tmp_path / "stage1.json"
+    stage1.write_text(json.dumps([{"title": "S1", "author": "Solo", "isbn": "1", "is_borrowed": True}]), encoding="utf-8")
+    stage3 = tmp_path / "stage3.json"
+    stage3.write_text(json.dumps([
+        {"isbn": "1", "title": "Duplicate", "authors": ["X"]},
+        {"isbn": "2", "title": "S3", "authors": ["Y"], "book_type": "Digital", "file_format": "PDF"},
+    ]), encoding="utf-8")
+    db = tmp_path / "out.db"
+
+    result = migrate_json_files(db, [stage1, tmp_path / "missing.json", stage3])
+    assert result == {str(stage1): 1, str(stage3): 1}
+    assert migrate_json_files(db, [stage1, stage3]) == {str(stage1): 0, str(stage3): 0}
+
+    lib = SQLiteLibrary(str(db))
+    assert lib.find_book("1").authors == ["Solo"] and lib.find_book("1").is_borrowed is True
+    assert lib.find_book("2").file_format == "PDF"
+    lib.close()
@@ -0,0 +1,53 @@
+"""
+Depolama yapılandırması (LIBRARY_URL / LIBRARY_FILE / LIBRARY_BACKEND) testleri
+"""
+
+import pytest
+
+from stage3_fastapi.journal import JournalLibrary
+from stage3_fastapi.library import Library
+from stage3_fastapi.models import Book
+from stage3_fastapi.sqlite_library import SQLiteLibrary
+from stage3_fastapi.storage import create_library, describe_storage, parse_storage_url
+
+
+def test_library_file_is_honored(tmp_path):
+    target = tmp_path / "data" / "library.json"
+    lib = create_library(env={"LIBRARY_FILE": str(target)})
+
+    assert type(lib) is Library
+    assert lib._db_path == target
+    lib.add_book(Book("1", "Mounted", ["A"]))
+    assert target.exists()
+
+
+def test_library_file_extension_selects_sqlite(tmp_path):
+    lib = create_library(env={"LIBRARY_FILE": str(tmp_path / "library.db")})
+    assert isinstance(lib, SQLiteLibrary)
+    assert describe_storage(lib) == {"backend": "sqlite", "path": str(tmp_path / "library.db")}
+    lib.close()
+
+
+def test_library_file_with_explicit_backend(tmp_path):
+    lib = create_library(env={"LIBRARY_FILE": str(tmp_path / "lib.json"), "LIBRARY_BACKEND": "journal"})
+    assert isinstance(lib, JournalLibrary)
+    lib.close()
+
+
+def test_storage_url_with_options(tmp_path):
+    url = f"journal://{tmp_path}/nested/lib.json?compact_threshold=1024"
+    lib = create_library(env={"LIBRARY_URL": url, "LIBRARY_FILE": "ignored.json"})
+
+    assert isinstance(lib, JournalLibrary)
+    assert lib._db_path == tmp_path / "nested" / "lib.json"
+    assert lib.compact_threshold == 1024
+    lib.close()
+
+
+def test_parse_storage_url():
+    assert parse_storage_url("sqlite:///app/data/library.db") == ("sqlite", "/app/data/library.db", {})
+    assert parse_storage_url("json://library.json?x=true") == ("json", "library.json", {"x": True})
+    with pytest.raises(ValueError):
+        parse_storage_url("redis://localhost/0")
+    with pytest.raises(ValueError):
+        create_library(env={"LIBRARY_BACKEND": "nope"})
@@ -0,0 +1,74 @@
+"""
+WriteBehindLibrary testleri: group commit, dayanıklılık seviyeleri
+"""
+
+import asyncio
+
+import pytest
+
+from stage3_fastapi.models import Book
+from stage3_fastapi.snapshot import load_snapshot
+from stage3_fastapi.storage import create_library
+from stage3_fastapi.write_behind import WriteBehindLibrary, durability_override
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    monkeypatch.setattr(WriteBehindLibrary, "_db_path", property(lambda self: path))
+    return path
+
+
+def read_isbns(path):
+    return [row["isbn"] for row in load_snapshot(path)]
+
+
+def test_many_mutations_collapse_into_one_write(db_path):
+    lib = WriteBehindLibrary(flush_interval_ms=200, flush_max_pending=1000)
+    for i in range(20):
+        lib.add_book(Book(f"wb-{i}", f"Title {i}", ["A"]))
+    lib.borrow_book("wb-3")
+    assert not db_path.exists()          # henüz yazılmadı
+
+    assert lib.flush(timeout=5)
+    assert lib.flushes == 1
+    assert read_isbns(db_path) == [f"wb-{i}" for i in range(20)]
+    lib.close()
+    assert WriteBehindLibrary().find_book("wb-3").is_borrowed is True
+
+
+def test_pending_threshold_triggers_flush(db_path):
+    lib = WriteBehindLibrary(flush_interval_ms=60_000, flush_max_pending=3)
+    for i in range(3):
+        lib.add_book(Book(f"t-{i}", "T", ["A"]))
+    assert lib.flush(timeout=5)          # aralık çok uzun olsa da eşik flush'ı tetikler
+    assert read_isbns(db_path) == ["t-0", "t-1", "t-2"]
+    lib.close()
+
+
+def test_group_durability_waits_for_commit(db_path):
+    lib = WriteBehindLibrary(flush_interval_ms=20)
+
+    async def scenario():
+        await lib.aadd_book(Book("g-1", "Grouped", ["A"]))   # varsayılan "async": beklemez
+        token = durability_override.set("group")
+        try:
+            await lib.aborrow_book("g-1")
+            # group commit tamamlandı: dosya mutasyonu içeriyor
+            return load_snapshot(db_path)
+        finally:
+            durability_override.reset(token)
+            await lib.aclose()
+
+    rows = asyncio.run(scenario())
+    assert rows == [{**rows[0], "isbn": "g-1", "is_borrowed": True}]
+    assert lib.stats()["pending"] == 0
+
+
+def test_storage_url_and_validation(tmp_path):
+    lib = create_library(env={"LIBRARY_URL": f"writebehind://{tmp_path}/lib.json?flush_interval_ms=5&durability=group"})
+    assert isinstance(lib, WriteBehindLibrary)
+    assert lib.flush_interval == 0.005 and lib.durability == "group"
+    lib.close()
+    with pytest.raises(ValueError):
+        WriteBehindLibrary(str(tmp_path / "x.json"), durability="eventually")
@@ -0,0 +1,62 @@
+"""
+Open Library metadata önbelleğini önceden doldurur (ör. yeni bir şube katalog
+listesi içe aktarılmadan önce).
+
+Kullanım:
+    OPENLIBRARY_CACHE=data/openlibrary-cache.db python -m stage3_fastapi.warm_cache isbns.txt
+    cat isbns.txt | python -m stage3_fastapi.warm_cache -
+
+Dosyalarda satır başına bir ISBN beklenir (virgül/boşlukla ayrılmış da olabilir).
+ISBN'ler toplu Books API ile çözülür; eksikler tekil yola düşer.
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterable
+
+from stage3_fastapi.metadata_cache import MetadataCache
+from stage3_fastapi.openlibrary import BATCH_SIZE, OpenLibraryClient
+
+
+def read_isbns(lines: Iterable[str]) -> list[str]:
+    """Satırlardan ISBN listesi; '#' ile başlayan satırlar yorumdur."""
+    isbns = []
+    for line in lines:
+        line = line.split("#", 1)[0]
+        isbns.extend(part for part in line.replace(",", " ").split() if part)
+    return list(dict.fromkeys(isbns))
+
+
+def warm_cache(isbns: list[str], client: OpenLibraryClient, batch_size: int = BATCH_SIZE) -> dict[str, int]:
+    """ISBN'leri çözüp önbelleğe yazar; bulunan / bulunamayan sayılarını döndürür."""
+    results = client.fetch_books_sync(isbns, batch_size=batch_size)
+    found = sum(1 for book in results.values() if book is not None)
+    return {"requested": len(results), "found": found, "missing": len(results) - found}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-fill the Open Library metadata cache")
+    parser.add_argument("sources", nargs="+", help="Files with ISBNs ('-' for stdin)")
+    parser.add_argument("--cache", type=Path, help="SQLite cache file (default: $OPENLIBRARY_CACHE)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="ISBNs per batch request")
+    args = parser.parse_args()
+
+    lines: list[str] = []
+    for source in args.sources:
+        if source == "-":
+            lines.extend(sys.stdin)
+        else:
+            lines.extend(Path(source).read_text(encoding="utf-8").splitlines())
+
+    cache = MetadataCache(args.cache) if args.cache else MetadataCache.from_env()
+    if cache.path is None:
+        print("Warning: no --cache / OPENLIBRARY_CACHE given, results are kept in memory only.")
+    stats = warm_cache(read_isbns(lines), OpenLibraryClient(cache=cache), batch_size=args.batch_size)
+    print(f"Requested: {stats['requested']}  found: {stats['found']}  missing: {stats['missing']}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Write-behind (geride yazan) JSON kalıcılığı ve group commit.
+
+Mutasyonlar dosyaya hemen yazılmaz; Library "kirli" işaretlenir ve arka plandaki
+flusher thread'i en geç `flush_interval_ms` sonra ya da `flush_max_pending`
+mutasyon biriktiğinde kataloğun tamamını tek bir atomik yazımla (geçici dosya,
+fsync, rename) kaydeder. Böylece N hızlı mutasyon tek bir dosya yazımına iner.
+
+Dayanıklılık (durability) seviyeleri:
+    "async" -> istek mutasyon bellekte uygulanınca döner; kayıt bir sonraki grupla yazılır
+    "group" -> istek, mutasyonunu içeren group commit diske yazılana kadar bekler
+
+Varsayılan seviye kurucudan gelir; istek başına `durability_override` (API'de
+`X-Durability` header'ı) ile değiştirilebilir.
+"""
+
+from __future__ import annotations
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from stage3_fastapi.library import Library, book_to_row
+from stage3_fastapi.snapshot import write_snapshot
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_LEVELS = ("async", "group")
+
+# İstek başına dayanıklılık seviyesi (None: Library varsayılanı)
+durability_override: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "durability_override", default=None)
+
+
+class WriteBehindLibrary(Library):
+    """Mutasyonları gruplayıp arka planda atomik snapshot olarak yazan Library."""
+
+    def __init__(self, filename: str = "library.json", flush_interval_ms: int = 50,
+                 flush_max_pending: int = 100, durability: str = "async") -> None:
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability '{durability}' (known: {', '.join(DURABILITY_LEVELS)})")
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_pending = flush_max_pending
+        self.durability = durability
+        self._cond = threading.Condition()
+        self._seq = 0              # son mutasyonun sıra numarası
+        self._flushed_seq = 0      # diske yazılmış son sıra numarası
+        self._dirty_since: Optional[float] = None
+        self._waiters: list[tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._flusher: Optional[threading.Thread] = None
+        self._stopping = False
+        self.flushes = 0
+        super().__init__(filename)
+
+    # ---------- Kalıcılık ----------
+    def _commit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        self._mark_dirty(1)
+
+    def _commit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        if changes:
+            self._mark_dirty(len(changes))
+
+    def _mark_dirty(self, count: int) -> int:
+        """Mutasyonu kaydeder, flusher'ı uyandırır ve mutasyonun sıra numarasını döndürür."""
+        with self._cond:
+            self._seq += count
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self._ensure_flusher()
+            self._cond.notify_all()
+            return self._seq
+
+    def save_books(self) -> None:
+        """Bekleyen her şeyi hemen (senkron) yazar."""
+        with self._cond:
+            seq = self._seq
+        self._write(seq)
+
+    def _write(self, seq: int) -> None:
+        rows = [book_to_row(b) for b in list(self._index.values())]
+        write_snapshot(self._db_path, rows, self.snapshot_generations)
+        with self._cond:
+            self.flushes += 1
+            if seq > self._flushed_seq:
+                self._flushed_seq = seq
+            if self._flushed_seq >= self._seq:
+                self._dirty_since = None
+            self._cond.notify_all()
+            ready = [w for w in self._waiters if w[0] <= self._flushed_seq]
+            self._waiters = [w for w in self._waiters if w[0] > self._flushed_seq]
+        for _, loop, future in ready:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    # ---------- Flusher thread'i ----------
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._stopping = False
+            self._flusher = threading.Thread(target=self._flush_loop, name="library-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    pending = self._seq - self._flushed_seq
+                    if pending == 0:
+                        if self._stopping:
+                            return
+                        self._cond.wait()
+                        continue
+                    due = self._dirty_since + self.flush_interval
+                    remaining = due - time.monotonic()
+                    if self._stopping or pending >= self.flush_max_pending or remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                seq = self._seq
+            try:
+                self._write(seq)
+            except Exception as e:
+                # Yazım başarısızsa kayıtlar kirli kalır; bir sonraki turda yeniden denenir
+                logger.error(f"Group commit failed: {e}")
+                time.sleep(self.flush_interval)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Şu ana kadarki mutasyonlar diske yazılana kadar bekler."""
+        with self._cond:
+            seq = self._seq
+            if seq > self._flushed_seq:
+                self._ensure_flusher()
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._flushed_seq >= seq, timeout)
+
+    def close(self) -> None:
+        """Bekleyenleri yazar ve flusher thread'ini durdurur."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join()
+        self._flusher = None
+
+    # ---------- Asenkron API ----------
+    async def _wait_durable(self, seq: int) -> None:
+        level = durability_override.get() or self.durability
+        if level != "group":
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            if self._flushed_seq >= seq:
+                return
+            self._waiters.append((seq, loop, future))
+        await future
+
+    async def _acommit(self, op: str, isbn: str, payload: Optional[dict[str, Any]] = None) -> None:
+        # Dosya yazımı flusher'da; burada yalnızca kirli işaretlenir (gerekirse grup beklenir)
+        await self._wait_durable(self._mark_dirty(1))
+
+    async def _acommit_many(self, changes: list[tuple[str, str, Optional[dict[str, Any]]]]) -> None:
+        if changes:
+            await self._wait_durable(self._mark_dirty(len(changes)))
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await asyncio.to_thread(self.close)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {"pending": self._seq - self._flushed_seq, "flushes": self.flushes,
+                    "durability": self.durability}
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)